@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from keywordcontrol import fetch_page, analyze_page_content
+from html_encoding import response_charset
+import metrics
+
+# Ağ beklemeleri thread'lerde, HTML ayrıştırma ayrı süreçlerde yapılır
+FETCH_WORKERS = 16
+# Aynı anda bellekte tutulan en fazla sayfa sayısı
+CHUNK_SIZE = 200
+
+
+def _analyze_chunk(chunk, io_pool, cpu_pool, results):
+    parse_futures = {}
+    fetch_futures = {io_pool.submit(fetch_page, url): (index, keyword) for index, url, keyword in chunk}
+
+    for future in as_completed(fetch_futures):
+        index, keyword = fetch_futures[future]
+        try:
+            response = future.result()
+        except Exception as e:
+            results[index] = {"keyword": keyword, "error": str(e)}
+            continue
+        # Süreçler arasında yalnızca ham baytlar ve Content-Type'taki charset taşınır;
+        # requests'in text/* için varsaydığı ISO-8859-1 (response.encoding) kullanılmaz
+        parse_futures[cpu_pool.submit(analyze_page_content, response.content, response_charset(response), keyword, response.url)] = (index, keyword)
+
+    for future in as_completed(parse_futures):
+        index, keyword = parse_futures[future]
+        try:
+            results[index] = future.result()
+        except Exception as e:
+            results[index] = {"keyword": keyword, "error": str(e)}
+
+
+def analyze_keywords_batch(items, processes=None, fetch_workers=FETCH_WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    (url, keyword) çiftlerini toplu analiz eder ve sonuçları giriş sırasıyla döndürür.
+    Sayfa indirme ana süreçte thread'lerle, HTML ayrıştırma/regex/textstat işleri
+    ise çekirdek sayısı kadar süreçte paralel çalışır.
+    """
+    items = [(index, url, keyword) for index, (url, keyword) in enumerate(items)]
+    results = [None] * len(items)
+
+    with metrics.span("batch_keyword_analysis"), \
+            ThreadPoolExecutor(max_workers=fetch_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as cpu_pool:
+        for start in range(0, len(items), chunk_size):
+            _analyze_chunk(items[start:start + chunk_size], io_pool, cpu_pool, results)
+
+    return [{"url": url, **result} for (_, url, _), result in zip(items, results)]
+
+
+def _read_items(path):
+    """Her satırı 'url,anahtar kelime' olan dosyayı okur"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                url, _, keyword = line.partition(",")
+                yield url.strip(), keyword.strip()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Toplu anahtar kelime analizi")
+    parser.add_argument("input", help="Her satırı 'url,anahtar kelime' olan dosya")
+    parser.add_argument("--processes", type=int, default=None, help="Ayrıştırma süreci sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS, help="Eşzamanlı sayfa indirme sayısı")
+    args = parser.parse_args()
+
+    for result in analyze_keywords_batch(list(_read_items(args.input)), args.processes, args.fetch_workers):
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
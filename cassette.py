@@ -0,0 +1,176 @@
+import os
+import gzip
+import json
+import time
+import base64
+import hashlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# SEO_HTTP_MODE=record|replay ile dış çağrılar kaydedilir veya kayıttan oynatılır
+MODE_ENV = "SEO_HTTP_MODE"
+DIR_ENV = "SEO_CASSETTE_DIR"
+LATENCY_ENV = "SEO_REPLAY_LATENCY"
+DEFAULT_DIR = "cassettes"
+
+# Kasetlere yazılmayan ve anahtar hesabına katılmayan parametreler
+SECRET_PARAMS = {"key", "api_key"}
+
+_overrides = {}
+
+
+class CassetteMissError(LookupError):
+    """Replay modunda istenen çağrı için kayıt bulunamadığında fırlatılır"""
+
+
+def configure(mode=None, directory=None, latency=None):
+    """Ortam değişkenlerini programatik olarak geçersiz kılar (None değerler dokunulmaz)"""
+    for name, value in (("mode", mode), ("directory", directory), ("latency", latency)):
+        if value is not None:
+            _overrides[name] = value
+
+
+def mode():
+    return str(_overrides.get("mode", os.getenv(MODE_ENV, "off"))).strip().lower()
+
+
+def recording():
+    return mode() == "record"
+
+
+def replaying():
+    return mode() == "replay"
+
+
+def _directory():
+    return _overrides.get("directory", os.getenv(DIR_ENV, DEFAULT_DIR))
+
+
+def _public_params(params):
+    return {k: v for k, v in sorted((params or {}).items()) if k not in SECRET_PARAMS}
+
+
+def _path(api, parts):
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return os.path.join(_directory(), f"{api}_{digest[:20]}.json.gz")
+
+
+def _write(path, entry):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    if not os.path.exists(path):
+        raise CassetteMissError(f"Kaset bulunamadı: {path}")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _simulate_latency(recorded_seconds):
+    latency = str(_overrides.get("latency", os.getenv(LATENCY_ENV, "0"))).strip().lower()
+    if latency == "recorded":
+        delay = recorded_seconds or 0
+    else:
+        try:
+            delay = float(latency)
+        except ValueError:
+            delay = 0
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _http_parts(method, url, params, headers):
+    parts = [method, url, _public_params(params)]
+    # Aynı URL'ye yapılan kısmi (Range) istekler ayrı kaydedilir
+    range_header = (headers or {}).get("Range")
+    if range_header:
+        parts.append(range_header)
+    return parts
+
+
+def record_http(api, url, params, response, elapsed, method="GET", headers=None):
+    """Bir HTTP yanıtını sıkıştırılmış kaset dosyasına yazar"""
+    _write(_path(api, _http_parts(method, url, params, headers)), {
+        "api": api,
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "elapsed": round(elapsed, 4),
+        "request": {"method": method, "url": url, "params": _public_params(params)},
+        "response": serialize_response(response),
+    })
+
+
+def replay_http(api, url, params, method="GET", headers=None):
+    """Kayıtlı HTTP yanıtını gerçek bir requests.Response olarak döndürür"""
+    entry = _read(_path(api, _http_parts(method, url, params, headers)))
+    _simulate_latency(entry.get("elapsed"))
+
+    return deserialize_response(entry["response"], url)
+
+
+def serialize_response(response):
+    """requests.Response'u JSON'a yazılabilir sözlüğe çevirir (kaset ve paylaşılan önbellek ortak biçimi)"""
+    return {
+        "status_code": response.status_code,
+        "url": response.url,
+        "headers": dict(response.headers),
+        "content": base64.b64encode(response.content).decode("ascii"),
+    }
+
+
+def deserialize_response(recorded, url=None):
+    """serialize_response çıktısından gerçek bir requests.Response oluşturur"""
+    response = requests.Response()
+    response.status_code = recorded["status_code"]
+    response.url = recorded.get("url") or url
+    response.headers = CaseInsensitiveDict(recorded.get("headers", {}))
+    # Gövde zaten açılmış olarak kaydedildiği için sıkıştırma başlığını kaldır
+    response.headers.pop("Content-Encoding", None)
+    response._content = base64.b64decode(recorded["content"])
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def _gemini_path(model_name, prompt):
+    return _path("gemini", [model_name, prompt])
+
+
+def generate_content(model, model_name, prompt, **kwargs):
+    """
+    model.generate_content çağrısını kayıt/oynatma moduna göre sarar.
+    Kaset anahtarı istemci nesnesinden değil yapılandırılmış model_name'den üretilir; böylece
+    API anahtarı olmadan (model None) yapılan oynatma da kayıtları bulur.
+    Yanıt .text ve .usage_metadata alanlarıyla döner.
+    """
+    path = _gemini_path(model_name, prompt)
+    if replaying():
+        entry = _read(path)
+        _simulate_latency(entry.get("elapsed"))
+        usage = entry.get("usage_metadata")
+        return SimpleNamespace(
+            text=entry["text"],
+            usage_metadata=SimpleNamespace(**usage) if usage else None,
+        )
+
+    start = time.perf_counter()
+    response = model.generate_content(prompt, **kwargs)
+    if recording():
+        usage = getattr(response, "usage_metadata", None)
+        _write(path, {
+            "api": "gemini",
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "elapsed": round(time.perf_counter() - start, 4),
+            "text": response.text,
+            "usage_metadata": {
+                "prompt_token_count": getattr(usage, "prompt_token_count", None),
+                "candidates_token_count": getattr(usage, "candidates_token_count", None),
+                "total_token_count": getattr(usage, "total_token_count", None),
+            } if usage is not None else None,
+        })
+    return response
@@ -0,0 +1,138 @@
+import os
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from domain_matcher import DomainMatcher
+from keywordcontrol import analyze_keywords, fetch_page
+
+# Karşılaştırılacak rakip sayısı (0 = rakip modu kapalı)
+COMPETITORS_ENV = "SEO_COMPETITORS"
+DEFAULT_TOP_N = 5
+MAX_WORKERS = 8
+
+# Yan yana tabloda gösterilen sayısal alanlar
+COMPARED_FIELDS = (
+    "keyword_density_percent", "keyword_count", "total_words",
+    "title_length", "meta_description_length", "readability_score", "on_page_score",
+)
+
+
+def competitor_count(requested=None):
+    """Açıkça istenen sayı yoksa SEO_COMPETITORS ortam değişkenini kullanır"""
+    if requested is not None:
+        return max(0, int(requested))
+    try:
+        return max(0, int(os.getenv(COMPETITORS_ENV, "0")))
+    except ValueError:
+        return 0
+
+
+def select_competitors(serp_data, domain, top_n=DEFAULT_TOP_N):
+    """SERP yanıtındaki organik sonuçlardan kendi domain'imiz dışındaki ilk top_n sonucu seçer"""
+    own = DomainMatcher([domain]) if domain else None
+    selected = []
+    for result in (serp_data or {}).get("organic_results") or []:
+        link = result.get("link") or ""
+        if not link or (own and own.match(link)):
+            continue
+        selected.append(result)
+        if len(selected) >= top_n:
+            break
+    return selected
+
+
+def _analyze_competitor(url, keyword):
+    """Rakip sayfayı indirir; hata sayfalarını analiz etmeden hata olarak döndürür"""
+    try:
+        response = fetch_page(url)
+    except Exception as e:
+        return {"error": str(e)}
+    if response.status_code >= 400:
+        return {"error": f"HTTP {response.status_code}"}
+    return analyze_keywords(url, keyword, response=response)
+
+
+def _summarize(analysis):
+    """Anahtar kelime analizinden karşılaştırma satırını çıkarır"""
+    if "error" in analysis:
+        return {"error": analysis["error"]}
+    on_page = analysis.get("on_page") or {}
+    return {
+        "title": on_page.get("title", ""),
+        "title_length": on_page.get("title_length"),
+        "meta_description_length": on_page.get("meta_description_length"),
+        "keyword_density_percent": analysis.get("keyword_density_percent"),
+        "keyword_count": analysis.get("keyword_count"),
+        "total_words": analysis.get("total_words"),
+        "in_title": analysis.get("in_title"),
+        "in_meta_description": analysis.get("in_meta_description"),
+        "readability_score": analysis.get("readability_score"),
+        "on_page_score": analysis.get("on_page_score"),
+    }
+
+
+def _averages(rows):
+    averages = {}
+    for field in COMPARED_FIELDS:
+        values = [row[field] for row in rows if isinstance(row.get(field), (int, float))]
+        averages[field] = round(sum(values) / len(values), 2) if values else None
+    return averages
+
+
+def compare_competitors(serp_data, keyword, domain, own_keyword_data=None, top_n=DEFAULT_TOP_N):
+    """
+    Mevcut SERP yanıtını (yeni API çağrısı yapmadan) kullanarak ilk top_n rakip sayfayı
+    eşzamanlı indirir, anahtar kelime analizinden geçirir ve yan yana karşılaştırır.
+    """
+    try:
+        if not serp_data or "error" in serp_data:
+            return {"error": "SERP verisi yok, rakipler belirlenemedi"}
+
+        selected = select_competitors(serp_data, domain, top_n)
+        if not selected:
+            return {"keyword": keyword, "competitors": [], "average": _averages([])}
+
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(selected))) as executor:
+            # Süre bütçesi ve metrik bağlamı her indirmeye taşınır
+            futures = [
+                executor.submit(contextvars.copy_context().run, _analyze_competitor, result["link"], keyword)
+                for result in selected
+            ]
+            competitors = [
+                {"position": result.get("position"), "url": result["link"], **_summarize(future.result())}
+                for result, future in zip(selected, futures)
+            ]
+
+        comparison = {
+            "keyword": keyword,
+            "competitors": competitors,
+            "average": _averages([c for c in competitors if "error" not in c]),
+        }
+        if own_keyword_data and "error" not in own_keyword_data:
+            comparison["own"] = _summarize(own_keyword_data)
+        return comparison
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def format_table(comparison):
+    """Karşılaştırmayı (kendi sayfa, rakipler, ortalama) yan yana Markdown tablosu olarak döndürür"""
+    rows = [("Siz", comparison["own"])] if comparison.get("own") else []
+    rows += [(f"#{c.get('position')} {c.get('url')}", c) for c in comparison.get("competitors", [])]
+    rows.append(("Rakip ortalaması", comparison.get("average") or {}))
+
+    table = (
+        "| Sayfa | Yoğunluk % | Kelime | Başlık Uzunluğu | Meta Uzunluğu | Okunabilirlik | On-Page |\n"
+        "|---|---|---|---|---|---|---|\n"
+    )
+    for name, row in rows:
+        if "error" in row:
+            table += f"| {name} | ❌ {row['error']} | | | | | |\n"
+            continue
+        table += (
+            f"| {name} | {row.get('keyword_density_percent', 'N/A')} | {row.get('total_words', 'N/A')} "
+            f"| {row.get('title_length', 'N/A')} | {row.get('meta_description_length', 'N/A')} "
+            f"| {row.get('readability_score', 'N/A')} | {row.get('on_page_score', 'N/A')} |\n"
+        )
+    return table
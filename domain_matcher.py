@@ -0,0 +1,154 @@
+import os
+from functools import lru_cache
+from urllib.parse import urlparse
+
+# Tam Public Suffix List dosyası (public_suffix_list.dat) verilirse gömülü liste yerine o kullanılır
+PSL_FILE_ENV = "SEO_PSL_FILE"
+
+# Gömülü kısa liste: yaygın genel uzantılar ve Türkiye başta olmak üzere ikinci seviye uzantılar
+BUILTIN_RULES = """
+com net org info biz io co ai app dev xyz online site shop store blog me tv eu
+tr com.tr net.tr org.tr gov.tr edu.tr mil.tr k12.tr bel.tr pol.tr gen.tr web.tr av.tr dr.tr bbs.tr name.tr tel.tr tv.tr info.tr biz.tr
+uk co.uk org.uk me.uk ac.uk gov.uk ltd.uk plc.uk net.uk
+de fr nl es it be ch at se no dk fi pl cz pt gr ie ru ua az
+us ca mx br com.br net.br org.br ar com.ar
+au com.au net.au org.au edu.au gov.au nz co.nz
+jp co.jp ne.jp or.jp ac.jp cn com.cn net.cn org.cn in co.in net.in org.in
+kr co.kr sg com.sg hk com.hk za co.za
+github.io gitlab.io herokuapp.com netlify.app vercel.app pages.dev blogspot.com wordpress.com web.app firebaseapp.com
+*.ck !www.ck
+"""
+
+
+class PublicSuffixTrie:
+    """
+    Public Suffix List kurallarını ters çevrilmiş etiketler üzerinde bir trie'ye derler.
+    Joker (*.) ve istisna (!) kuralları PSL algoritmasına göre uygulanır.
+    """
+
+    def __init__(self, rules):
+        self._root = {}
+        for rule in rules:
+            rule = rule.strip().lower()
+            if not rule or rule.startswith("//"):
+                continue
+            rule = rule.split()[0]
+            exception = rule.startswith("!")
+            node = self._root
+            for label in reversed(rule.lstrip("!").split(".")):
+                node = node.setdefault(label, {})
+            node["!" if exception else "$"] = True
+
+    def public_suffix_length(self, labels):
+        """Ters çevrilmiş etiketlerin kaçının public suffix olduğunu döndürür (bilinmeyen uzantı: 1)"""
+        node = self._root
+        length = 1
+        for depth, label in enumerate(labels, start=1):
+            wildcard = node.get("*")
+            if label in node:
+                node = node[label]
+                if node.get("!"):
+                    return depth - 1
+                if node.get("$"):
+                    length = depth
+            elif wildcard is not None:
+                return depth
+            else:
+                break
+        return length
+
+    def registrable_domain(self, host):
+        """'blog.example.com.tr' -> 'example.com.tr'; host bir public suffix ise None"""
+        host = host.strip(".").lower()
+        if not host:
+            return None
+        labels = host.split(".")
+        suffix_length = self.public_suffix_length(labels[::-1])
+        if len(labels) <= suffix_length:
+            return None
+        return ".".join(labels[-(suffix_length + 1):])
+
+
+def _load_rules():
+    path = os.getenv(PSL_FILE_ENV)
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return [line for line in f if line.strip() and not line.startswith("//")]
+    return BUILTIN_RULES.split()
+
+
+@lru_cache(maxsize=1)
+def default_trie():
+    """Süreç başına bir kez derlenen public suffix trie'si"""
+    return PublicSuffixTrie(_load_rules())
+
+
+def parse_target(value):
+    """URL ya da 'domain/yol' biçimindeki hedefi (host, yol öneki) olarak ayrıştırır"""
+    value = value.strip()
+    parsed = urlparse(value if "//" in value else f"//{value}")
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/")
+    return host, path
+
+
+def registrable_domain(value):
+    """URL ya da host'un kayıt edilebilir alan adı (ör. 'https://www.shop.example.co.uk/x' -> 'example.co.uk')"""
+    host, _ = parse_target(value)
+    return default_trie().registrable_domain(host) if host else None
+
+
+class DomainMatcher:
+    """
+    Bir domain kümesini kayıt edilebilir alan adına göre hash tablosunda tutar.
+    Her sonuç URL'si bir kez ayrıştırılır ve tek sözlük aramasıyla eşleştirilir.
+
+    Hedef biçimleri:
+    - 'example.com'          -> example.com ve tüm alt alan adları
+    - 'blog.example.com'     -> yalnızca bu alt alan adı (ve altındakiler)
+    - 'example.com/tr'       -> example.com altında /tr yolu ile başlayan sayfalar
+    """
+
+    def __init__(self, targets, trie=None):
+        self.trie = trie or default_trie()
+        self.targets = []
+        self._by_domain = {}
+        for target in dict.fromkeys(t.strip() for t in targets if t and t.strip()):
+            host, path = parse_target(target)
+            domain = self.trie.registrable_domain(host)
+            if domain is None:
+                continue
+            self.targets.append(target)
+            # Kayıt edilebilir alan adının kendisi verildiyse tüm alt alan adları kapsanır
+            scope_host = None if host == domain else host
+            self._by_domain.setdefault(domain, []).append((target, scope_host, path))
+
+    def match(self, url):
+        """URL'nin eşleştiği hedeflerin listesi"""
+        host, path = parse_target(url)
+        candidates = self._by_domain.get(self.trie.registrable_domain(host)) if host else None
+        if not candidates:
+            return []
+        matched = []
+        for target, scope_host, scope_path in candidates:
+            if scope_host and host != scope_host and not host.endswith("." + scope_host):
+                continue
+            if scope_path and path != scope_path and not path.startswith(scope_path + "/"):
+                continue
+            matched.append(target)
+        return matched
+
+    def ranks(self, organic_results):
+        """Her hedefin organik sonuçlardaki ilk sırası {hedef: (sıra, link) | None}; tek geçişte"""
+        found = dict.fromkeys(self.targets)
+        remaining = len(found)
+        for result in organic_results:
+            for target in self.match(result.get("link") or ""):
+                if found[target] is None:
+                    found[target] = (result.get("position"), result.get("link"))
+                    remaining -= 1
+            if not remaining:
+                break
+        return found
@@ -1,9 +1,14 @@
 import os
 import gradio as gr
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 import json
-from datetime import datetime
 from dotenv import load_dotenv
-from seo_crew_simple import run_seo_analysis
+import competitors
+import job_client
+import job_server
+import ui_assets
 
 # .env dosyasını yükle
 load_dotenv()
@@ -52,61 +57,127 @@ def format_seo_report(result):
     except Exception as e:
         return f"❌ Rapor formatlanırken hata oluştu: {str(e)}"
 
-def analyze_seo(url, keyword, domain, progress=gr.Progress()):
-    """SEO analizi yapar ve sonucu döndürür"""
+# Kısmi raporda bölümlerin gösterim sırası (genellikle bu sırayla tamamlanırlar)
+STAGE_SECTIONS = [
+    ("keyword_analysis", "🔍 Anahtar Kelime Metrikleri"),
+    ("serp", "📈 SERP Sıralaması"),
+    ("page_weight", "🧪 Sayfa Ağırlığı (yerel tahmin)"),
+    ("pagespeed", "⚡ PageSpeed Metrikleri"),
+    ("links", "🔗 Link Kontrolü"),
+    ("images", "🖼️ Görsel Denetimi"),
+]
+COMPETITOR_SECTION = ("competitors", "🥊 Rakip Karşılaştırması")
+
+def format_partial_report(stage_results, sections=STAGE_SECTIONS):
+    """Analiz sürerken tamamlanan aşamaların verisini Markdown olarak döndürür"""
+    formatted = "# 📊 SEO Analiz Raporu\n\n*⏳ Analiz sürüyor, tamamlanan bölümler hazır oldukça gösterilir...*\n\n"
+    
+    for stage, title in sections:
+        formatted += f"## {title}\n"
+        data = stage_results.get(stage)
+        if data is None:
+            formatted += "⏳ Bekleniyor...\n\n"
+        elif isinstance(data, dict) and data.get("missing"):
+            formatted += f"⏱️ Eksik bölüm: {data.get('error')}\n\n"
+        elif stage == "competitors" and isinstance(data, dict) and "error" not in data:
+            formatted += competitors.format_table(data) + "\n"
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                # Organik sonuç listesi gibi iç içe veriler tam raporda yer alır
+                if isinstance(value, (list, dict)):
+                    continue
+                formatted += f"- **{key.replace('_', ' ').title()}**: {value}\n"
+            formatted += "\n"
+        else:
+            formatted += f"{data}\n\n"
+    
+    formatted += "## 🤖 Kapsamlı Rapor\n⏳ Rapor hazırlanıyor...\n"
+    return formatted
+
+def analyze_seo(url, keyword, domain, profile=False, competitor_count=None, premium=False, progress=gr.Progress()):
+    """SEO analizi yapar; aşamalar tamamlandıkça kısmi raporu, en sonda tam raporu döndürür"""
     
     # API anahtarlarını kontrol et
     keys_ok, message = check_api_keys()
     if not keys_ok:
-        return message, None, "❌ API Anahtarları Eksik"
+        yield message, None, "❌ API Anahtarları Eksik"
+        return
     
     # Giriş parametrelerini doğrula
     if not url or not url.strip():
-        return "❌ URL boş olamaz!", None, "❌ Geçersiz Giriş"
+        yield "❌ URL boş olamaz!", None, "❌ Geçersiz Giriş"
+        return
     
     if not keyword or not keyword.strip():
-        return "❌ Anahtar kelime boş olamaz!", None, "❌ Geçersiz Giriş"
+        yield "❌ Anahtar kelime boş olamaz!", None, "❌ Geçersiz Giriş"
+        return
     
     if not domain or not domain.strip():
-        return "❌ Domain boş olamaz!", None, "❌ Geçersiz Giriş"
+        yield "❌ Domain boş olamaz!", None, "❌ Geçersiz Giriş"
+        return
     
     # URL formatını kontrol et
     if not url.startswith(('http://', 'https://')):
-        return "❌ Geçerli bir URL girin (http:// veya https:// ile başlamalı)", None, "❌ Geçersiz URL"
+        yield "❌ Geçerli bir URL girin (http:// veya https:// ile başlamalı)", None, "❌ Geçersiz URL"
+        return
     
     try:
         progress(0.1, desc="🔍 Analiz başlatılıyor...")
         
-        # SEO analizini çalıştır
+        # Rakip sayısı boş bırakıldıysa None gönderilir ve SEO_COMPETITORS varsayılanı kullanılır
+        requested_competitors = None if competitor_count is None else int(competitor_count)
+        # Analiz iş kuyruğunda çalışır; sekme kapansa bile iş tamamlanıp kaydedilir
+        job_id = job_client.submit_job(
+            url.strip(), keyword.strip(), domain.strip(), profile=bool(profile), competitors=requested_competitors,
+            premium=bool(premium)
+        )
+        show_competitors = competitors.competitor_count(requested_competitors) > 0
+        sections = STAGE_SECTIONS + [COMPETITOR_SECTION] if show_competitors else STAGE_SECTIONS
+        
+        # Aşamalar tamamlandıkça kısmi raporu göster
         progress(0.3, desc="🤖 Agent'lar çalışıyor...")
-        result = run_seo_analysis(url.strip(), keyword.strip(), domain.strip())
+        shown_stages = 0
+        for job in job_client.iter_job_updates(job_id):
+            stage_results = job.get("partial") or {}
+            if job["status"] == "queued":
+                yield (
+                    gr.update(),
+                    None,
+                    "<div class='status-indicator'>🕒 Analiz sırada bekliyor...</div>"
+                )
+            elif len(stage_results) != shown_stages:
+                shown_stages = len(stage_results)
+                progress(0.3 + 0.1 * shown_stages, desc=f"📥 {shown_stages}/{len(sections)} aşama tamamlandı")
+                yield (
+                    format_partial_report(stage_results, sections),
+                    None,
+                    f"<div class='status-indicator'>⏳ {shown_stages}/{len(sections)} aşama tamamlandı, rapor hazırlanıyor...</div>"
+                )
+        
+        if job["status"] == "failed":
+            raise job_client.JobError(job.get("error") or "Analiz başarısız oldu")
         
         progress(0.8, desc="📊 Rapor hazırlanıyor...")
+        job_result = job_client.get_result(job_id)
+        report_data = job_result["report"]
+        result = report_data.get("result")
         
         # Raporu formatla
         formatted_result = result if result else "❌ Analiz sonucu alınamadı."
         
-        # JSON raporu oluştur
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_data = {
-            "timestamp": timestamp,
-            "url": url.strip(),
-            "keyword": keyword.strip(),
-            "domain": domain.strip(),
-            "result": result
-        }
-        
-        # JSON dosyasını kaydet
-        filename = f"seo_report_{timestamp}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, ensure_ascii=False, indent=2)
+        # Worker başka bir makinedeyse JSON raporunun yerel bir kopyasını oluştur
+        filename = job_result.get("filename")
+        if not filename or not os.path.exists(filename):
+            filename = os.path.basename(filename or f"seo_report_{report_data['timestamp']}_{job_id}.json")
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(report_data, f, ensure_ascii=False, indent=2)
         
         progress(1.0, desc="✅ Analiz tamamlandı!")
         
-        return formatted_result, filename, "✅ Analiz Tamamlandı"
+        yield formatted_result, filename, "✅ Analiz Tamamlandı"
         
     except Exception as e:
-        return f"❌ Analiz sırasında hata oluştu: {str(e)}", None, "❌ Hata Oluştu"
+        yield f"❌ Analiz sırasında hata oluştu: {str(e)}", None, "❌ Hata Oluştu"
 
 def download_report(filename):
     """Rapor dosyasını indirme linki oluşturur"""
@@ -116,6 +187,10 @@ def download_report(filename):
 
 # Gradio arayüzünü oluştur
 def create_interface():
+    """
+    Blocks düzenini kurar. CSS /ui-static'ten sürümlü URL ile bağlanır; HTML parçaları
+    static/fragments'tan bir kez okunur ve sayfaya gömülür.
+    """
     with gr.Blocks(
         title="🚀 Infera - Yapay Zeka Tabanlı SEO Analiz Platformu",
         theme=gr.themes.Soft(
@@ -123,1015 +198,17 @@ def create_interface():
             secondary_hue="gray",
             neutral_hue="slate",
         ),
-        css="""
-        .gradio-container {
-            max-width: 1600px !important;
-            margin: 0 auto !important;
-            padding: 0 !important;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%) !important;
-            min-height: 100vh;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .gradio-container::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: 
-                radial-gradient(circle at 20% 80%, rgba(120, 119, 198, 0.3) 0%, transparent 50%),
-                radial-gradient(circle at 80% 20%, rgba(255, 119, 198, 0.3) 0%, transparent 50%),
-                radial-gradient(circle at 40% 40%, rgba(120, 219, 255, 0.2) 0%, transparent 50%);
-            pointer-events: none;
-        }
-        
-        .main-content {
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(20px);
-            -webkit-backdrop-filter: blur(20px);
-            border-radius: 30px;
-            margin: 1rem;
-            padding: 2.5rem;
-            box-shadow: 
-                0 25px 50px rgba(0, 0, 0, 0.15),
-                0 0 0 1px rgba(255, 255, 255, 0.1),
-                inset 0 1px 0 rgba(255, 255, 255, 0.2);
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            position: relative;
-            overflow: hidden;
-            width: calc(100% - 2rem);
-            box-sizing: border-box;
-        }
-        
-        .main-content::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 1px;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.5), transparent);
-        }
-        
-        .hero-section {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-            border-radius: 25px;
-            padding: 3rem 2rem;
-            margin-bottom: 3rem;
-            color: white;
-            text-align: center;
-            position: relative;
-            overflow: hidden;
-            box-shadow: 
-                0 20px 40px rgba(102, 126, 234, 0.3),
-                0 0 0 1px rgba(255, 255, 255, 0.1);
-        }
-        
-        .hero-section::before {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: 
-                radial-gradient(circle at 30% 30%, rgba(255, 255, 255, 0.1) 0%, transparent 50%),
-                radial-gradient(circle at 70% 70%, rgba(255, 255, 255, 0.05) 0%, transparent 50%);
-            animation: float 6s ease-in-out infinite;
-        }
-        
-        @keyframes float {
-            0%, 100% { transform: translateY(0px) rotate(0deg); }
-            50% { transform: translateY(-20px) rotate(180deg); }
-        }
-        
-        .hero-title {
-            font-size: 3.5rem;
-            font-weight: 800;
-            margin-bottom: 1rem;
-            color: #f093fb;
-            text-shadow: 0 4px 8px rgba(0, 0, 0, 0.3);
-            position: relative;
-            z-index: 2;
-            background: linear-gradient(45deg, #f093fb, #667eea);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            letter-spacing: 2px;
-        }
-        
-        .hero-logo {
-            text-align: center;
-            margin-bottom: 2rem;
-            position: relative;
-            z-index: 2;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-        }
-        
-        .hero-logo img {
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            max-width: 200px;
-            height: auto;
-        }
-        
-        .hero-logo img:hover {
-            transform: scale(1.05);
-            box-shadow: 0 15px 40px rgba(0, 0, 0, 0.4);
-        }
-        
-        .logo-container {
-            display: inline-block;
-            text-align: center;
-            margin-bottom: 1rem;
-        }
-        
-        .logo-shapes {
-            display: flex;
-            justify-content: center;
-            align-items: flex-end;
-            gap: 8px;
-            margin-bottom: 15px;
-            height: 60px;
-        }
-        
-        .shape {
-            background: linear-gradient(to top, #8B5CF6, #EC4899);
-            border-radius: 4px;
-            position: relative;
-        }
-        
-        .shape-1 {
-            width: 20px;
-            height: 50px;
-            background: linear-gradient(to top, #8B5CF6, #EC4899);
-        }
-        
-        .shape-1::after {
-            content: '';
-            position: absolute;
-            top: 0;
-            right: -8px;
-            width: 12px;
-            height: 15px;
-            background: linear-gradient(to top, #8B5CF6, #EC4899);
-            border-radius: 4px;
-        }
-        
-        .shape-2 {
-            width: 18px;
-            height: 40px;
-            background: linear-gradient(to top, #8B5CF6, #EC4899);
-        }
-        
-        .shape-2::after {
-            content: '';
-            position: absolute;
-            top: 0;
-            right: -6px;
-            width: 10px;
-            height: 12px;
-            background: linear-gradient(to top, #8B5CF6, #EC4899);
-            border-radius: 4px;
-        }
-        
-        .shape-3 {
-            width: 16px;
-            height: 30px;
-            background: linear-gradient(to top, #8B5CF6, #EC4899);
-        }
-        
-        .shape-3::after {
-            content: '';
-            position: absolute;
-            bottom: -8px;
-            left: 0;
-            width: 8px;
-            height: 10px;
-            background: linear-gradient(to top, #8B5CF6, #EC4899);
-            border-radius: 4px;
-        }
-        
-        .logo-text {
-            font-size: 2.5rem;
-            font-weight: 800;
-            color: #EC4899;
-            letter-spacing: 3px;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.3);
-            font-family: 'Arial', sans-serif;
-        }
-        
-        .hero-subtitle {
-            font-size: 1.4rem;
-            opacity: 0.95;
-            margin-bottom: 1rem;
-            font-weight: 500;
-            position: relative;
-            z-index: 2;
-        }
-        
-        .hero-slogan {
-            font-size: 1.1rem;
-            font-style: italic;
-            opacity: 0.9;
-            margin-bottom: 1.5rem;
-            font-weight: 400;
-            position: relative;
-            z-index: 2;
-            color: #f0f0f0;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.3);
-        }
-        
-        .hero-description {
-            font-size: 1.1rem;
-            opacity: 0.9;
-            max-width: 600px;
-            margin: 0 auto;
-            line-height: 1.7;
-            position: relative;
-            z-index: 2;
-        }
-        
-        .stats-section {
-            display: flex;
-            justify-content: space-between;
-            gap: 1.5rem;
-            margin-bottom: 3rem;
-            flex-wrap: wrap;
-            overflow: hidden;
-        }
-        
-        .stat-card {
-            background: rgba(255, 255, 255, 0.9);
-            backdrop-filter: blur(15px);
-            -webkit-backdrop-filter: blur(15px);
-            border-radius: 20px;
-            padding: 2rem 1.5rem;
-            text-align: center;
-            box-shadow: 
-                0 15px 35px rgba(0, 0, 0, 0.1),
-                0 0 0 1px rgba(255, 255, 255, 0.2);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            position: relative;
-            overflow: hidden;
-            flex: 1;
-            min-width: 140px;
-        }
-        
-        .stat-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        }
-        
-        .stat-card::after {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, rgba(102, 126, 234, 0.05) 0%, rgba(118, 75, 162, 0.05) 50%, rgba(240, 147, 251, 0.05) 100%);
-            opacity: 0;
-            transition: opacity 0.3s ease;
-        }
-        
-        .stat-card:hover {
-            transform: translateY(-8px) scale(1.02);
-            box-shadow: 
-                0 25px 50px rgba(0, 0, 0, 0.15),
-                0 0 0 1px rgba(255, 255, 255, 0.3);
-        }
-        
-        .stat-card:hover::after {
-            opacity: 1;
-        }
-        
-        .stat-icon {
-            font-size: 2.5rem;
-            margin-bottom: 1rem;
-            display: block;
-            filter: drop-shadow(0 2px 4px rgba(0, 0, 0, 0.1));
-        }
-        
-        .stat-number {
-            font-size: 2.2rem;
-            font-weight: 800;
-            color: #1e293b;
-            margin-bottom: 0.5rem;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        .stat-label {
-            color: #64748b;
-            font-size: 0.95rem;
-            font-weight: 600;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        
-        .agent-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 2rem;
-            margin-bottom: 3rem;
-            overflow: hidden;
-        }
-        
-        .agent-card {
-            background: rgba(255, 255, 255, 0.9);
-            backdrop-filter: blur(15px);
-            -webkit-backdrop-filter: blur(15px);
-            border-radius: 25px;
-            padding: 2.5rem;
-            box-shadow: 
-                0 20px 40px rgba(0, 0, 0, 0.1),
-                0 0 0 1px rgba(255, 255, 255, 0.2);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .agent-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        }
-        
-        .agent-card::after {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, rgba(102, 126, 234, 0.05) 0%, rgba(118, 75, 162, 0.05) 50%, rgba(240, 147, 251, 0.05) 100%);
-            opacity: 0;
-            transition: opacity 0.3s ease;
-        }
-        
-        .agent-card:hover {
-            transform: translateY(-10px) scale(1.03);
-            box-shadow: 
-                0 30px 60px rgba(0, 0, 0, 0.15),
-                0 0 0 1px rgba(255, 255, 255, 0.3);
-        }
-        
-        .agent-card:hover::after {
-            opacity: 1;
-        }
-        
-        .agent-icon {
-            font-size: 3rem;
-            margin-bottom: 1.5rem;
-            display: block;
-            text-align: center;
-            filter: drop-shadow(0 4px 8px rgba(0, 0, 0, 0.1));
-        }
-        
-        .agent-title {
-            font-size: 1.3rem;
-            font-weight: 700;
-            color: #1e293b;
-            margin-bottom: 1rem;
-            text-align: center;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        .agent-description {
-            color: #64748b;
-            font-size: 1rem;
-            line-height: 1.6;
-            text-align: center;
-            margin-bottom: 1.5rem;
-        }
-        
-        .agent-features {
-            margin-top: 1.5rem;
-            padding-top: 1.5rem;
-            border-top: 1px solid rgba(226, 232, 240, 0.5);
-        }
-        
-        .agent-features ul {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .agent-features li {
-            color: #64748b;
-            font-size: 0.9rem;
-            margin-bottom: 0.5rem;
-            padding-left: 1.5rem;
-            position: relative;
-            font-weight: 500;
-        }
-        
-        .agent-features li::before {
-            content: '✓';
-            position: absolute;
-            left: 0;
-            color: #667eea;
-            font-weight: bold;
-            font-size: 1rem;
-        }
-        
-        .dashboard-section {
-            display: flex;
-            flex-direction: column;
-            gap: 2rem;
-            margin-bottom: 3rem;
-            overflow: hidden;
-        }
-        
-        .input-container {
-            background: rgba(255, 255, 255, 0.9);
-            backdrop-filter: blur(15px);
-            -webkit-backdrop-filter: blur(15px);
-            border-radius: 25px;
-            padding: 2.5rem;
-            box-shadow: 
-                0 20px 40px rgba(0, 0, 0, 0.1),
-                0 0 0 1px rgba(255, 255, 255, 0.2);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .input-container::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        }
-        
-        .input-title {
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: #1e293b;
-            margin-bottom: 2rem;
-            text-align: center;
-            position: relative;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        .input-title::after {
-            content: '';
-            position: absolute;
-            bottom: -10px;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 60px;
-            height: 3px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-            border-radius: 2px;
-        }
-        
-        .gradio-textbox {
-            border-radius: 15px !important;
-            border: 2px solid rgba(226, 232, 240, 0.8) !important;
-            transition: all 0.3s cubic-bezier(0.175, 0.885, 0.32, 1.275) !important;
-            background: rgba(248, 250, 252, 0.8) !important;
-            margin-bottom: 1.5rem !important;
-            backdrop-filter: blur(10px);
-            -webkit-backdrop-filter: blur(10px);
-        }
-        
-        .gradio-textbox:focus-within {
-            border-color: #667eea !important;
-            box-shadow: 
-                0 0 0 4px rgba(102, 126, 234, 0.1),
-                0 10px 25px rgba(102, 126, 234, 0.2) !important;
-            background: rgba(255, 255, 255, 0.95) !important;
-            transform: translateY(-2px) !important;
-        }
-        
-        .gradio-textbox input, .gradio-textbox textarea {
-            color: #1e293b !important;
-            font-size: 1rem !important;
-            padding: 1rem !important;
-            font-weight: 500 !important;
-        }
-        
-        .gradio-label {
-            color: #374151 !important;
-            font-weight: 600 !important;
-            font-size: 0.95rem !important;
-            margin-bottom: 0.5rem !important;
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.1);
-        }
-        
-        .analyze-button {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%) !important;
-            border: none !important;
-            border-radius: 30px !important;
-            padding: 1.2rem 2.5rem !important;
-            font-size: 1.1rem !important;
-            font-weight: 700 !important;
-            color: white !important;
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275) !important;
-            box-shadow: 
-                0 15px 35px rgba(102, 126, 234, 0.4),
-                0 0 0 1px rgba(255, 255, 255, 0.1) !important;
-            text-transform: uppercase !important;
-            letter-spacing: 1px !important;
-            width: 100% !important;
-            margin-top: 1rem !important;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .analyze-button::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-            transition: left 0.5s ease;
-        }
-        
-        .analyze-button:hover {
-            transform: translateY(-3px) scale(1.02) !important;
-            box-shadow: 
-                0 25px 50px rgba(102, 126, 234, 0.5),
-                0 0 0 1px rgba(255, 255, 255, 0.2) !important;
-        }
-        
-        .analyze-button:hover::before {
-            left: 100%;
-        }
-        
-        .result-container {
-            background: rgba(255, 255, 255, 0.9);
-            backdrop-filter: blur(15px);
-            -webkit-backdrop-filter: blur(15px);
-            border-radius: 25px;
-            padding: 2.5rem;
-            box-shadow: 
-                0 20px 40px rgba(0, 0, 0, 0.1),
-                0 0 0 1px rgba(255, 255, 255, 0.2);
-            border: 1px solid rgba(255, 255, 255, 0.3);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .result-container::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        }
-        
-        .result-title {
-            font-size: 1.5rem;
-            font-weight: 700;
-            color: #1e293b;
-            margin-bottom: 2rem;
-            text-align: center;
-            position: relative;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        .result-title::after {
-            content: '';
-            position: absolute;
-            bottom: -10px;
-            left: 50%;
-            transform: translateX(-50%);
-            width: 60px;
-            height: 3px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-            border-radius: 2px;
-        }
-        
-        .status-indicator {
-            background: linear-gradient(135deg, rgba(241, 245, 249, 0.9) 0%, rgba(226, 232, 240, 0.9) 100%);
-            backdrop-filter: blur(15px);
-            -webkit-backdrop-filter: blur(15px);
-            border-radius: 15px;
-            padding: 1.5rem 2rem;
-            margin-bottom: 2rem;
-            text-align: center;
-            font-weight: 600;
-            color: #64748b;
-            border: 1px solid rgba(226, 232, 240, 0.5);
-            position: relative;
-            overflow: hidden;
-            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.05);
-        }
-        
-        .status-indicator::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, rgba(102, 126, 234, 0.05) 0%, rgba(118, 75, 162, 0.05) 50%, rgba(240, 147, 251, 0.05) 100%);
-            opacity: 0.5;
-        }
-        
-        .gradio-markdown {
-            background: rgba(248, 250, 252, 0.9);
-            backdrop-filter: blur(15px);
-            -webkit-backdrop-filter: blur(15px);
-            border-radius: 15px;
-            padding: 2rem;
-            border: 1px solid rgba(226, 232, 240, 0.5);
-            line-height: 1.7;
-            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.05);
-        }
-        
-        .gradio-markdown h1, .gradio-markdown h2, .gradio-markdown h3 {
-            color: #1e293b !important;
-            font-weight: 700 !important;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        .gradio-markdown h1 {
-            font-size: 1.8rem !important;
-            margin-bottom: 1.5rem !important;
-        }
-        
-        .gradio-markdown h2 {
-            font-size: 1.5rem !important;
-            margin-bottom: 1.2rem !important;
-        }
-        
-        .gradio-markdown h3 {
-            font-size: 1.3rem !important;
-            margin-bottom: 1rem !important;
-        }
-        
-        .gradio-markdown strong {
-            color: #667eea !important;
-            font-weight: 700 !important;
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.1);
-        }
-        
-        .gradio-markdown ul, .gradio-markdown ol {
-            padding-left: 2rem !important;
-        }
-        
-        .gradio-markdown li {
-            margin-bottom: 0.8rem !important;
-            color: #374151 !important;
-            font-weight: 500 !important;
-        }
-        
-        .api-status {
-            background: linear-gradient(135deg, rgba(220, 252, 231, 0.9) 0%, rgba(187, 247, 208, 0.9) 100%);
-            backdrop-filter: blur(15px);
-            -webkit-backdrop-filter: blur(15px);
-            border: 2px solid #22c55e;
-            border-radius: 15px;
-            padding: 1.5rem 2rem;
-            margin-bottom: 2rem;
-            text-align: center;
-            font-weight: 600;
-            color: #166534;
-            position: relative;
-            overflow: hidden;
-            box-shadow: 0 10px 25px rgba(34, 197, 94, 0.2);
-        }
-        
-        .api-status::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, rgba(34, 197, 94, 0.1) 0%, rgba(22, 163, 74, 0.1) 100%);
-            opacity: 0.5;
-        }
-        
-        .api-status.error {
-            background: linear-gradient(135deg, rgba(254, 242, 242, 0.9) 0%, rgba(254, 202, 202, 0.9) 100%);
-            border-color: #ef4444;
-            color: #991b1b;
-            box-shadow: 0 10px 25px rgba(239, 68, 68, 0.2);
-        }
-        
-        .api-status.error::before {
-            background: linear-gradient(135deg, rgba(239, 68, 68, 0.1) 0%, rgba(220, 38, 38, 0.1) 100%);
-        }
-        
-        .footer {
-            background: linear-gradient(135deg, rgba(30, 41, 59, 0.95) 0%, rgba(51, 65, 85, 0.95) 100%);
-            backdrop-filter: blur(20px);
-            -webkit-backdrop-filter: blur(20px);
-            border-radius: 25px;
-            padding: 3rem;
-            color: white;
-            margin-top: 3rem;
-            position: relative;
-            overflow: hidden;
-            box-shadow: 
-                0 25px 50px rgba(0, 0, 0, 0.2),
-                0 0 0 1px rgba(255, 255, 255, 0.1);
-        }
-        
-        .footer::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: 
-                radial-gradient(circle at 20% 80%, rgba(102, 126, 234, 0.1) 0%, transparent 50%),
-                radial-gradient(circle at 80% 20%, rgba(240, 147, 251, 0.1) 0%, transparent 50%);
-        }
-        
-        .footer h3 {
-            color: white !important;
-            text-align: center;
-            margin-bottom: 2rem;
-            font-size: 1.5rem;
-            font-weight: 700;
-            text-shadow: 0 2px 4px rgba(0, 0, 0, 0.3);
-            position: relative;
-            z-index: 2;
-        }
-        
-        .footer-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 2.5rem;
-            position: relative;
-            z-index: 2;
-        }
-        
-        .footer-section h4 {
-            color: #e2e8f0;
-            margin-bottom: 1.5rem;
-            font-size: 1.1rem;
-            font-weight: 600;
-            text-shadow: 0 1px 2px rgba(0, 0, 0, 0.3);
-        }
-        
-        .footer-section ul, .footer-section ol {
-            color: #cbd5e1;
-            line-height: 1.8;
-        }
-        
-        .footer-section a {
-            color: #93c5fd;
-            text-decoration: none;
-            transition: all 0.3s ease;
-            font-weight: 500;
-        }
-        
-        .footer-section a:hover {
-            color: #60a5fa;
-            text-decoration: underline;
-            text-shadow: 0 0 10px rgba(96, 165, 250, 0.5);
-        }
-        
-        .gradio-file {
-            border-radius: 15px !important;
-            border: 2px solid rgba(226, 232, 240, 0.8) !important;
-            background: rgba(248, 250, 252, 0.8) !important;
-            backdrop-filter: blur(10px);
-            -webkit-backdrop-filter: blur(10px);
-        }
-        
-        /* Dark theme uyumluluğu */
-        @media (prefers-color-scheme: dark) {
-            .gradio-container {
-                background: linear-gradient(135deg, #1e293b 0%, #334155 50%, #475569 100%) !important;
-            }
-            
-            .main-content {
-                background: rgba(30, 41, 59, 0.95);
-                color: #f1f5f9;
-            }
-            
-            .stat-card, .agent-card, .input-container, .result-container {
-                background: rgba(30, 41, 59, 0.9);
-                color: #f1f5f9;
-            }
-            
-            .stat-number, .agent-title, .input-title, .result-title {
-                color: #f1f5f9 !important;
-            }
-            
-            .stat-label, .agent-description, .gradio-label {
-                color: #cbd5e1 !important;
-            }
-            
-            .gradio-textbox {
-                background: rgba(51, 65, 85, 0.8) !important;
-                border-color: rgba(71, 85, 105, 0.8) !important;
-            }
-            
-            .gradio-textbox input, .gradio-textbox textarea {
-                color: #f1f5f9 !important;
-            }
-            
-            .gradio-markdown {
-                background: rgba(51, 65, 85, 0.9);
-                color: #f1f5f9;
-            }
-            
-            .gradio-markdown h1, .gradio-markdown h2, .gradio-markdown h3 {
-                color: #f1f5f9 !important;
-            }
-            
-            .gradio-markdown li {
-                color: #cbd5e1 !important;
-            }
-        }
-        
-        /* Light theme için beyaz yazılar */
-        @media (prefers-color-scheme: light) {
-            .gradio-markdown {
-                color: #ffffff !important;
-            }
-            
-            .gradio-markdown h1, .gradio-markdown h2, .gradio-markdown h3 {
-                color: #ffffff !important;
-            }
-            
-            .gradio-markdown li {
-                color: #ffffff !important;
-            }
-            
-            .gradio-markdown strong {
-                color: #ffffff !important;
-            }
-            
-            .gradio-markdown a {
-                color: #93c5fd !important;
-            }
-            
-            .gradio-markdown a:hover {
-                color: #60a5fa !important;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .dashboard-section {
-                grid-template-columns: 1fr;
-            }
-            
-            .stats-section {
-                flex-direction: column;
-            }
-            
-            .stat-card {
-                min-width: auto;
-            }
-            
-            .agent-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .hero-title {
-                font-size: 2.5rem;
-            }
-            
-            .hero-subtitle {
-                font-size: 1.2rem;
-            }
-            
-            .main-content {
-                margin: 1rem;
-                padding: 2rem;
-            }
-            
-            .footer-grid {
-                grid-template-columns: 1fr;
-            }
-        }
-        """
+        head=ui_assets.stylesheet_tag("ui.css")
     ) as interface:
         
         # Hero Section
-        gr.Markdown("""
-        <div class="hero-section">
-            <div class="hero-title">🚀 Infera</div>
-            <div class="hero-subtitle">Yapay Zeka Tabanlı SEO Analiz Platformu</div>
-            <div class="hero-slogan">"Görünmeyeni görünür kılan zeka, Infera."</div>
-            <div class="hero-description">
-                Gelişmiş AI agent'ları ile kapsamlı SEO analizi yapın. 
-                PageSpeed, SERP, anahtar kelime ve rapor kalitesi analizlerini tek platformda birleştirin.
-            </div>
-        </div>
-        """)
+        gr.Markdown(ui_assets.fragment("hero.html"))
         
         # Stats Section - Tek satırda
-        gr.Markdown("""
-        <div class="stats-section">
-            <div class="stat-card">
-                <span class="stat-icon">🤖</span>
-                <div class="stat-number">4</div>
-                <div class="stat-label">AI Agent</div>
-            </div>
-            <div class="stat-card">
-                <span class="stat-icon">⚡</span>
-                <div class="stat-number">100%</div>
-                <div class="stat-label">Otomatik</div>
-            </div>
-            <div class="stat-card">
-                <span class="stat-icon">📊</span>
-                <div class="stat-number">50+</div>
-                <div class="stat-label">Metrik</div>
-            </div>
-            <div class="stat-card">
-                <span class="stat-icon">🎯</span>
-                <div class="stat-number">24/7</div>
-                <div class="stat-label">Aktif</div>
-            </div>
-        </div>
-        """)
+        gr.Markdown(ui_assets.fragment("stats.html"))
         
         # Agent Grid
-        gr.Markdown("""
-        <div class="agent-grid">
-            <div class="agent-card">
-                <span class="agent-icon">🤖</span>
-                <div class="agent-title">Technical SEO Agent</div>
-                <div class="agent-description">
-                    PageSpeed Insights ve SERP API analizi ile teknik SEO performansınızı ölçün
-                </div>
-                <div class="agent-features">
-                    <ul>
-                        <li>PageSpeed Skorları</li>
-                        <li>SERP Sıralama Analizi</li>
-                        <li>Teknik SEO Kontrolleri</li>
-                    </ul>
-                </div>
-            </div>
-            <div class="agent-card">
-                <span class="agent-icon">🔍</span>
-                <div class="agent-title">Keyword Control Agent</div>
-                <div class="agent-description">
-                    Anahtar kelime analizi ve içerik okunabilirlik kontrolü yapın
-                </div>
-                <div class="agent-features">
-                    <ul>
-                        <li>Anahtar Kelime Yoğunluğu</li>
-                        <li>Okunabilirlik Skorları</li>
-                        <li>İçerik Analizi</li>
-                    </ul>
-                </div>
-            </div>
-            <div class="agent-card">
-                <span class="agent-icon">📊</span>
-                <div class="agent-title">Report Agent</div>
-                <div class="agent-description">
-                    Kapsamlı ve detaylı SEO raporları oluşturun
-                </div>
-                <div class="agent-features">
-                    <ul>
-                        <li>Detaylı Analiz Raporları</li>
-                        <li>Görsel Grafikler</li>
-                        <li>PDF/JSON Export</li>
-                    </ul>
-                </div>
-            </div>
-            <div class="agent-card">
-                <span class="agent-icon">✅</span>
-                <div class="agent-title">Report Quality Agent</div>
-                <div class="agent-description">
-                    Rapor kalitesini kontrol edin ve doğruluğunu garanti edin
-                </div>
-                <div class="agent-features">
-                    <ul>
-                        <li>Kalite Kontrolü</li>
-                        <li>Doğruluk Doğrulaması</li>
-                        <li>Format Standardizasyonu</li>
-                    </ul>
-                </div>
-            </div>
-        </div>
-        """)
+        gr.Markdown(ui_assets.fragment("agents.html"))
         
         # Dashboard Section
         gr.Markdown("""
@@ -1166,6 +243,27 @@ def create_interface():
             lines=1
         )
         
+        profile_input = gr.Checkbox(
+            label="🔬 Profil Modu",
+            value=False,
+            info="CPU profili ve bellek ayırma özetini raporun yanına kaydeder"
+        )
+        
+        competitors_input = gr.Number(
+            label="🥊 Rakip Karşılaştırması",
+            minimum=0,
+            maximum=10,
+            value=None,
+            precision=0,
+            info="SERP'teki ilk N rakip sayfayı aynı anahtar kelimeyle analiz eder (0 = kapalı, boş = SEO_COMPETITORS)"
+        )
+        
+        premium_input = gr.Checkbox(
+            label="💎 Premium Rapor",
+            value=False,
+            info="Kural tabanlı öneriler yerine Gemini ile kapsamlı rapor oluşturur (daha yavaş)"
+        )
+        
         analyze_btn = gr.Button(
             "🚀 Analizi Başlat",
             variant="primary",
@@ -1226,31 +324,7 @@ Analiz başlatmak için gerekli bilgileri girin ve **"🚀 Analizi Başlat"** bu
         gr.Markdown("</div>")
         
         # Footer
-        gr.Markdown("""
-        <div class="footer">
-            <h3>📝 Kullanım Talimatları</h3>
-            <div class="footer-grid">
-                <div class="footer-section">
-                    <h4>🔧 Gerekli API Anahtarları:</h4>
-                    <ul>
-                        <li><strong>Gemini API</strong>: <a href="https://makersuite.google.com/app/apikey" target="_blank">https://makersuite.google.com/app/apikey</a></li>
-                        <li><strong>PageSpeed API</strong>: <a href="https://console.cloud.google.com/apis/credentials" target="_blank">https://console.cloud.google.com/apis/credentials</a></li>
-                        <li><strong>SerpAPI</strong>: <a href="https://serpapi.com/" target="_blank">https://serpapi.com/</a></li>
-                    </ul>
-                </div>
-                <div class="footer-section">
-                    <h4>📋 Adım Adım Kullanım:</h4>
-                    <ol>
-                        <li><strong>API Anahtarları</strong>: .env dosyasında gerekli API anahtarlarınızı ayarlayın</li>
-                        <li><strong>URL</strong>: Analiz edilecek web sitesinin tam URL'sini girin</li>
-                        <li><strong>Anahtar Kelime</strong>: SEO analizi yapılacak anahtar kelimeyi girin</li>
-                        <li><strong>Domain</strong>: SERP sıralaması kontrol edilecek domain'i girin</li>
-                        <li><strong>Analizi Başlat</strong>: Butona tıklayarak analizi başlatın</li>
-                    </ol>
-                </div>
-            </div>
-        </div>
-        """)
+        gr.Markdown(ui_assets.fragment("footer.html"))
         
         # Event handlers
         def check_api_status():
@@ -1266,31 +340,53 @@ Analiz başlatmak için gerekli bilgileri girin ve **"🚀 Analizi Başlat"** bu
         # Analiz butonu event'i
         analyze_btn.click(
             fn=analyze_seo,
-            inputs=[url_input, keyword_input, domain_input],
+            inputs=[url_input, keyword_input, domain_input, profile_input, competitors_input, premium_input],
             outputs=[result_output, download_output, status_indicator]
         )
         
         # Enter tuşu ile analiz başlatma
         url_input.submit(
             fn=analyze_seo,
-            inputs=[url_input, keyword_input, domain_input],
+            inputs=[url_input, keyword_input, domain_input, profile_input, competitors_input, premium_input],
             outputs=[result_output, download_output, status_indicator]
         )
         
         keyword_input.submit(
             fn=analyze_seo,
-            inputs=[url_input, keyword_input, domain_input],
+            inputs=[url_input, keyword_input, domain_input, profile_input, competitors_input, premium_input],
             outputs=[result_output, download_output, status_indicator]
         )
         
         domain_input.submit(
             fn=analyze_seo,
-            inputs=[url_input, keyword_input, domain_input],
+            inputs=[url_input, keyword_input, domain_input, profile_input, competitors_input, premium_input],
             outputs=[result_output, download_output, status_indicator]
         )
     
     return interface
 
+_interface = None
+
+def get_interface():
+    """Blocks düzenini süreç başına yalnızca bir kez kurar"""
+    global _interface
+    if _interface is None:
+        _interface = create_interface()
+    return _interface
+
+def create_app(interface):
+    """Gradio arayüzünü /metrics ve /ui-static uç noktaları olan bir FastAPI uygulamasına bağlar"""
+    app = FastAPI()
+    # CSS gibi statik dosyalar sürümlü URL, uzun önbellek başlığı ve gzip ile sunulur
+    ui_assets.register(app)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics_endpoint():
+        # Analizler kuyruk worker'larında çalıştığı için metrikler kuyruk sunucusundan alınır
+        return PlainTextResponse(job_client.fetch_metrics(), media_type="text/plain; version=0.0.4")
+
+    return gr.mount_gradio_app(app, interface, path="/", show_error=True)
+
 # Ana fonksiyon
 if __name__ == "__main__":
     # API anahtarlarını kontrol et
@@ -1299,11 +395,14 @@ if __name__ == "__main__":
         print(f"⚠️ Uyarı: {message}")
         print("📝 .env dosyasını oluşturun ve API anahtarlarınızı ekleyin.")
     
-    # Arayüzü oluştur ve başlat
-    interface = create_interface()
-    interface.launch(
-        server_name="0.0.0.0",
-        server_port=7880,
-        share=False,
-        show_error=True
-    ) 
\ No newline at end of file
+    # Harici bir kuyruk adresi verilmemişse kuyruğu ve worker'ları bu süreçte başlat
+    if not os.getenv(job_client.QUEUE_URL_ENV):
+        os.environ[job_client.QUEUE_URL_ENV] = job_server.start_embedded(
+            workers=int(os.getenv("SEO_QUEUE_WORKERS", job_server.DEFAULT_WORKERS))
+        )
+        print(f"📬 İş kuyruğu: {os.environ[job_client.QUEUE_URL_ENV]}")
+    
+    # Arayüzü oluştur ve /metrics uç noktasıyla birlikte başlat
+    interface = get_interface()
+    interface.queue()
+    uvicorn.run(create_app(interface), host="0.0.0.0", port=7880) 
\ No newline at end of file
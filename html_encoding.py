@@ -0,0 +1,89 @@
+import re
+import codecs
+
+import metrics
+
+# <meta charset> / http-equiv aranacak baş kısım (HTML standardı 1024 bayt öngörür)
+SNIFF_BYTES = 2048
+# Hiçbir bildirim yokken ve UTF-8 olarak çözülemeyen sayfalar için (Türkçe siteler çoğunlukla Windows-1254)
+FALLBACK_ENCODING = "cp1254"
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Tarayıcıların bu etiketler için kullandığı gerçek kodlamalar (WHATWG Encoding)
+ENCODING_ALIASES = {
+    "ascii": "cp1252",
+    "iso8859-1": "cp1252",
+    "iso8859-9": "cp1254",
+}
+
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?\s*([\w.:\-]+)", re.IGNORECASE)
+# <meta charset="..."> ve <meta http-equiv="Content-Type" content="...; charset=..."> tek desende
+_META_CHARSET = re.compile(rb"<meta\s[^>]*?charset\s*=\s*[\"']?\s*([\w.:\-]+)", re.IGNORECASE)
+_XML_ENCODING = re.compile(rb"^\s*<\?xml[^>]*?encoding\s*=\s*[\"']([\w.:\-]+)", re.IGNORECASE)
+
+
+def _normalize(label):
+    """Kodlama etiketini Python codec adına çevirir; bilinmeyen etiket için None"""
+    if not label:
+        return None
+    label = label.decode("ascii", "ignore") if isinstance(label, bytes) else label
+    try:
+        name = codecs.lookup(label.strip().strip("\"'")).name
+    except LookupError:
+        return None
+    return ENCODING_ALIASES.get(name, name)
+
+
+def header_charset(content_type):
+    """Content-Type başlığındaki charset parametresi (requests'in text/* için varsaydığı ISO-8859-1 değil)"""
+    match = _HEADER_CHARSET.search(content_type or "")
+    return match.group(1) if match else None
+
+
+def response_charset(response):
+    return header_charset(response.headers.get("Content-Type"))
+
+
+def sniff_encoding(content, declared=None):
+    """
+    Sayfanın kodlamasını tüm gövdeyi taramadan belirler: BOM, HTTP başlığı, ilk SNIFF_BYTES
+    içindeki <meta charset>/XML bildirimi. (codec, kaynak) döndürür; bildirim yoksa (None, None).
+    """
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding, "bom"
+    encoding = _normalize(declared)
+    if encoding:
+        return encoding, "header"
+    head = content[:SNIFF_BYTES]
+    match = _META_CHARSET.search(head) or _XML_ENCODING.search(head)
+    encoding = _normalize(match.group(1)) if match else None
+    if encoding:
+        # ASCII olarak okunabilen bir bildirim UTF-16 olamaz; tarayıcılar UTF-8 kabul eder
+        return ("utf-8" if encoding.startswith("utf-16") else encoding), "meta"
+    return None, None
+
+
+def decode_html(content, declared=None):
+    """
+    Ham sayfa baytlarını tek seferde çözer. declared, Content-Type başlığındaki charset'tir.
+    Bildirim yoksa UTF-8 denenir, olmazsa FALLBACK_ENCODING kullanılır; geçersiz baytlar değiştirilir.
+    """
+    if not content:
+        return ""
+    encoding, source = sniff_encoding(content, declared)
+    if encoding is None:
+        try:
+            html = content.decode("utf-8")
+            encoding, source = "utf-8", "default"
+        except UnicodeDecodeError:
+            encoding, source = FALLBACK_ENCODING, "fallback"
+            html = content.decode(encoding, "replace")
+    else:
+        html = content.decode(encoding, "replace")
+    metrics.inc("seo_page_charset_total", source=source, encoding=encoding)
+    return html
@@ -0,0 +1,63 @@
+import time
+import requests
+from urllib.parse import urlparse
+
+import cassette
+import metrics
+import resilience
+
+# Devre kesicisi API yerine hedef host bazında tutulan istek türleri
+PER_HOST_APIS = {"page", "resource", "link"}
+
+
+def get(api, url, **kwargs):
+    """GET isteği; ayrıntılar için request()"""
+    return request("GET", api, url, **kwargs)
+
+
+def head(api, url, **kwargs):
+    """HEAD isteği; ayrıntılar için request()"""
+    kwargs.setdefault("allow_redirects", True)
+    return request("HEAD", api, url, **kwargs)
+
+
+def request(method, api, url, **kwargs):
+    """
+    Harici servislere yapılan tüm isteklerin ortak giriş noktası.
+    Gecikme, durum kodu ve 429 sayaçlarını metriklere işler; SEO_HTTP_MODE
+    ayarına göre yanıtları kasete kaydeder veya kasetten oynatır.
+    Zaman aşımı aktif analizin kalan süre bütçesiyle sınırlanır ve her API
+    için ayrı bir devre kesici uygulanır. Ücretli API'ler süreç genelindeki
+    hız sınırına göre sıraya alınır.
+    """
+    if not cassette.replaying():
+        resilience.acquire_rate(api)
+    kwargs.setdefault("timeout", resilience.request_timeout(api))
+    breaker_name = f"{api}:{urlparse(url).netloc}" if api in PER_HOST_APIS else api
+    breaker = resilience.check_breaker(breaker_name)
+
+    start = time.perf_counter()
+    try:
+        if cassette.replaying():
+            response = cassette.replay_http(api, url, kwargs.get("params"), method, kwargs.get("headers"))
+        else:
+            response = requests.request(method, url, **kwargs)
+    except BaseException as e:
+        metrics.record_api_call(api, time.perf_counter() - start, type(e).__name__)
+        # Kaset eksikliği ve süre bütçesinin dolması hedef servisin hatası sayılmaz; bu durumda
+        # yarı açık devrenin denemesi yine de bırakılır, yoksa devre hiç kapanmaz
+        if isinstance(e, Exception) and not isinstance(e, cassette.CassetteMissError) and resilience.counts_as_failure(e):
+            breaker.record_failure()
+        else:
+            breaker.release_trial()
+        raise
+
+    elapsed = time.perf_counter() - start
+    metrics.record_api_call(api, elapsed, response.status_code)
+    if response.status_code == 429 or response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if cassette.recording():
+        cassette.record_http(api, url, kwargs.get("params"), response, elapsed, method, kwargs.get("headers"))
+    return response
@@ -0,0 +1,361 @@
+import re
+import sys
+import json
+import struct
+import argparse
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import html_encoding
+import http_client
+import shared_cache
+
+# Eşzamanlı istek ve sayfa başına denetlenecek en fazla görsel
+MAX_WORKERS = 16
+MAX_IMAGES = 100
+# Biçim ve boyut için okunan baş kısım; EXIF'i büyük JPEG'lerde SOF daha geride olabilir
+PROBE_BYTES = 4096
+JPEG_PROBE_BYTES = 64 * 1024
+
+# Yüksek yoğunluklu ekranlar için slotun bu katına kadar piksel makul sayılır
+MAX_DPR = 2.0
+# İzin verilen boyutun bu katını aşan görseller "gereğinden büyük" işaretlenir
+OVERSIZE_TOLERANCE = 1.25
+# srcset'teki w tanımı ile gerçek genişlik arasındaki kabul edilebilir fark
+SRCSET_WIDTH_TOLERANCE = 0.1
+LARGE_IMAGE_BYTES = 200 * 1024
+# Bu boyutun üzerindeki JPEG/PNG/GIF'ler için WebP/AVIF önerilir
+LEGACY_MIN_BYTES = 50 * 1024
+LEGACY_FORMATS = {"jpeg", "png", "gif"}
+TOP_IMAGES = 10
+
+CONTENT_RANGE_PATTERN = re.compile(r"/\s*(\d+)\s*$")
+_DIMENSION_PATTERN = re.compile(r"^\s*(\d+)(?:\.\d+)?\s*(?:px)?\s*$")
+# SOF0-SOF15; C4 (DHT), C8 (JPG) ve CC (DAC) çerçeve başlığı değildir
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _dimension(value):
+    """width/height özniteliğini piksele çevirir; yüzde ve geçersiz değerler için None"""
+    match = _DIMENSION_PATTERN.match(value or "")
+    return int(match.group(1)) if match and int(match.group(1)) > 0 else None
+
+
+def parse_srcset(srcset):
+    """srcset'i HTML standardındaki gibi ayrıştırır: [(url, tanım)] — tanım '640w', '2x' veya ''"""
+    candidates = []
+    position, length = 0, len(srcset)
+    while position < length:
+        while position < length and (srcset[position].isspace() or srcset[position] == ","):
+            position += 1
+        start = position
+        while position < length and not srcset[position].isspace():
+            position += 1
+        url = srcset[start:position]
+        if not url:
+            break
+        descriptor = ""
+        if url.endswith(","):
+            url = url.rstrip(",")
+        else:
+            start = position
+            while position < length and srcset[position] != ",":
+                position += 1
+            descriptor = srcset[start:position].strip().lower()
+        if url:
+            candidates.append((url, descriptor))
+    return candidates
+
+
+def _image_url(page_url, href):
+    if not href or href.startswith(("data:", "blob:")):
+        return None
+    url = urljoin(page_url, href.strip())
+    return url.split("#", 1)[0] if urlparse(url).scheme in ("http", "https") else None
+
+
+def collect_images(page):
+    """
+    onpage.extract_page çıktısındaki <img> src ve srcset adaylarını, görselin çizildiği
+    slotun boyutlarıyla (width/height öznitelikleri) birlikte toplar; aynı URL bir kez denetlenir.
+    """
+    images = {}
+    for img in page.get("images", []):
+        slot = {"slot_width": _dimension(img.get("width")), "slot_height": _dimension(img.get("height"))}
+        sources = [(img.get("src"), "", False)]
+        sources += [(href, descriptor, True) for href, descriptor in parse_srcset(img.get("srcset") or "")]
+        for href, descriptor, from_srcset in sources:
+            url = _image_url(page["url"], href)
+            if url and url not in images:
+                images[url] = {"url": url, "descriptor": descriptor, "from_srcset": from_srcset, **slot}
+    return list(images.values())
+
+
+# --- başlıktan biçim ve boyut ---------------------------------------------
+
+
+def _jpeg_size(data):
+    """JPEG segmentlerini SOF işaretine kadar atlar; veri yetmezse None"""
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        segment_length = struct.unpack(">H", data[position + 2:position + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if position + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[position + 5:position + 9])
+            return width, height
+        position += 2 + segment_length
+    return None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def _avif_size(data):
+    """ISOBMFF 'ispe' kutularındaki en büyük boyut (küçük resim/alfa katmanları daha küçüktür)"""
+    sizes = []
+    position = data.find(b"ispe")
+    while position != -1 and position + 16 <= len(data):
+        sizes.append(struct.unpack(">II", data[position + 8:position + 16]))
+        position = data.find(b"ispe", position + 4)
+    return max(sizes, key=lambda size: size[0] * size[1]) if sizes else None
+
+
+def sniff_image(data):
+    """
+    Dosyanın ilk baytlarından biçimi ve gerçek (intrinsic) boyutları bulur.
+    (biçim, (genişlik, yükseklik) veya None) döndürür; tanınmayan biçim için (None, None).
+    """
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png", struct.unpack(">II", data[16:24]) if len(data) >= 24 else None
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif", struct.unpack("<HH", data[6:10]) if len(data) >= 10 else None
+    if data.startswith(b"\xff\xd8"):
+        return "jpeg", _jpeg_size(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp", _webp_size(data)
+    if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"):
+        return "avif", _avif_size(data)
+    if data[4:8] == b"ftyp" and data[8:12] in (b"heic", b"heix", b"mif1"):
+        return "heif", _avif_size(data)
+    head = data[:256].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in data[:1024].lower()):
+        return "svg", None
+    if data[:4] == b"\x00\x00\x01\x00":
+        return "ico", None
+    return None, None
+
+
+# --- ağ ------------------------------------------------------------------
+
+
+def _read_head(url, limit):
+    """
+    Range isteğiyle dosyanın ilk limit baytını okur; sunucu Range'i yok sayarsa
+    akıştan yalnızca limit kadar okunup bağlantı kapatılır. (durum, veri, toplam boyut) döndürür.
+    """
+    response = http_client.get("resource", url, headers={"Range": f"bytes=0-{limit - 1}"}, stream=True)
+    try:
+        if response.status_code >= 400:
+            return response.status_code, b"", None
+        data = b""
+        for chunk in response.iter_content(min(limit, 16 * 1024)):
+            data += chunk
+            if len(data) >= limit:
+                break
+        total = None
+        if response.status_code == 206:
+            match = CONTENT_RANGE_PATTERN.search(response.headers.get("Content-Range", ""))
+            total = int(match.group(1)) if match else None
+        else:
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and not response.headers.get("Content-Encoding"):
+                total = int(length)
+        if total is None and len(data) < limit:
+            total = len(data)
+        return response.status_code, data[:limit], total
+    finally:
+        response.close()
+
+
+def _probe(url):
+    try:
+        status, data, total = _read_head(url, PROBE_BYTES)
+        bytes_read = len(data)
+        if status >= 400:
+            return {"url": url, "status": status, "error": f"HTTP {status}", "bytes_read": 0}
+        image_format, size = sniff_image(data)
+        # SOF ilk okumada yoksa (büyük EXIF/ICC bloğu) bir kez daha geniş aralık okunur
+        if image_format == "jpeg" and size is None and len(data) >= PROBE_BYTES:
+            status, data, total = _read_head(url, JPEG_PROBE_BYTES)
+            bytes_read += len(data)
+            size = _jpeg_size(data)
+        return {
+            "url": url,
+            "status": status,
+            "format": image_format,
+            "width": size[0] if size else None,
+            "height": size[1] if size else None,
+            "bytes": total,
+            "bytes_read": bytes_read,
+        }
+    except Exception as e:
+        return {"url": url, "status": None, "error": type(e).__name__, "bytes_read": 0}
+
+
+def probe_image(url):
+    """
+    Görselin biçimini, boyutlarını ve dosya boyutunu (önbellekte varsa önbellekten) döndürür.
+    page_weight da görsellerin boyutunu buradan alır; aynı analizde görsel başına tek istek yapılır.
+    """
+    return shared_cache.cached("image", [url], lambda: _probe(url), should_cache=lambda result: bool(result.get("format")))
+
+
+# --- değerlendirme ---------------------------------------------------------
+
+
+def _allowed_scale(image):
+    """
+    Görselin slotuna göre izin verilen en büyük boyutun gerçek boyuta oranı (<1 ise gereğinden büyük).
+    x tanımlı srcset adayında yoğunluk, diğerlerinde MAX_DPR kullanılır. Slot bilinmiyorsa None.
+    """
+    descriptor = image["descriptor"]
+    density = MAX_DPR
+    if descriptor.endswith("x"):
+        try:
+            density = float(descriptor[:-1])
+        except ValueError:
+            pass
+    elif descriptor.endswith("w"):
+        # w adaylarını tarayıcı görünüm genişliğine göre seçer; slot ile kıyaslanamaz
+        return None
+    scales = []
+    if image["slot_width"] and image.get("width"):
+        scales.append(image["slot_width"] * density / image["width"])
+    if image["slot_height"] and image.get("height"):
+        scales.append(image["slot_height"] * density / image["height"])
+    return min(scales) if scales else None
+
+
+def _srcset_width_mismatch(image):
+    descriptor = image["descriptor"]
+    if not descriptor.endswith("w") or not image.get("width"):
+        return False
+    try:
+        declared = int(descriptor[:-1])
+    except ValueError:
+        return False
+    return declared > 0 and abs(image["width"] - declared) / declared > SRCSET_WIDTH_TOLERANCE
+
+
+def _dimensions_text(width, height):
+    return f"{width or '?'}x{height or '?'}"
+
+
+def summarize(images):
+    """Denetim sonuçlarını rapora uygun özete çevirir"""
+    oversized, heavy, mismatched = [], [], []
+    format_counts = {}
+    legacy_bytes = legacy_count = errors = 0
+    for image in images:
+        if image.get("error") or not image.get("format"):
+            errors += 1
+            continue
+        format_counts[image["format"]] = format_counts.get(image["format"], 0) + 1
+        size = image.get("bytes") or 0
+
+        scale = _allowed_scale(image)
+        if scale is not None and scale < 1 / OVERSIZE_TOLERANCE:
+            oversized.append({
+                "url": image["url"],
+                "format": image["format"],
+                "bytes": image.get("bytes"),
+                "intrinsic": _dimensions_text(image["width"], image["height"]),
+                "slot": _dimensions_text(image["slot_width"], image["slot_height"]),
+                "ratio": round(1 / scale, 1),
+                # Piksel sayısı ölçeğin karesiyle azalır; dosya boyutu kabaca onunla orantılı
+                "wasted_bytes": int(size * (1 - scale * scale)),
+            })
+        if size >= LARGE_IMAGE_BYTES:
+            heavy.append({"url": image["url"], "format": image["format"], "bytes": size})
+        if image["format"] in LEGACY_FORMATS and size >= LEGACY_MIN_BYTES:
+            legacy_count += 1
+            legacy_bytes += size
+        if _srcset_width_mismatch(image):
+            mismatched.append({"url": image["url"], "descriptor": image["descriptor"], "width": image["width"]})
+
+    oversized.sort(key=lambda entry: entry["wasted_bytes"], reverse=True)
+    heavy.sort(key=lambda entry: entry["bytes"], reverse=True)
+    checked = [image for image in images if not image.get("error")]
+    return {
+        "checked": len(checked),
+        "error_count": errors,
+        "total_bytes": sum(image.get("bytes") or 0 for image in checked),
+        "bytes_read": sum(image.get("bytes_read") or 0 for image in images),
+        "format_counts": format_counts,
+        "missing_dimensions_count": sum(
+            1 for image in images if not image["from_srcset"] and not (image["slot_width"] and image["slot_height"])
+        ),
+        "oversized_count": len(oversized),
+        "oversized_wasted_bytes": sum(entry["wasted_bytes"] for entry in oversized),
+        "oversized": oversized[:TOP_IMAGES],
+        "large_count": len(heavy),
+        "large": heavy[:TOP_IMAGES],
+        "legacy_format_count": legacy_count,
+        "legacy_format_bytes": legacy_bytes,
+        "srcset_mismatch": mismatched[:TOP_IMAGES],
+    }
+
+
+def audit_images(page, max_images=MAX_IMAGES):
+    """
+    Analiz aşaması: sayfadaki görselleri tam indirmeden, yalnızca ilk birkaç KB'ı
+    eşzamanlı okuyarak denetler ve slotundan çok büyük görselleri işaretler.
+    """
+    try:
+        images = collect_images(page)[:max_images]
+        if not images:
+            return summarize([])
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(images))) as executor:
+            # Süre bütçesi ve metrik bağlamı her isteğe taşınır
+            futures = [executor.submit(contextvars.copy_context().run, probe_image, image["url"]) for image in images]
+            for image, future in zip(images, futures):
+                probed = dict(future.result())
+                probed.pop("url", None)
+                image.update(probed)
+        return summarize(images)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sayfadaki görselleri Range istekleriyle denetler")
+    parser.add_argument("url", help="Denetlenecek sayfa")
+    parser.add_argument("--max-images", type=int, default=MAX_IMAGES)
+    args = parser.parse_args()
+
+    from keywordcontrol import fetch_page, parse_page
+
+    response = fetch_page(args.url)
+    page = parse_page(response.content, html_encoding.response_charset(response), response.url or args.url)
+    sys.stdout.write(json.dumps(audit_images(page, args.max_images), ensure_ascii=False, indent=2) + "\n")
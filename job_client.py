@@ -0,0 +1,71 @@
+import os
+import time
+import requests
+
+# İş kuyruğu sunucusunun adresi (job_server.py)
+QUEUE_URL_ENV = "SEO_QUEUE_URL"
+DEFAULT_QUEUE_URL = "http://127.0.0.1:7881"
+REQUEST_TIMEOUT = 10
+POLL_INTERVAL = 1.0
+
+
+class JobError(RuntimeError):
+    """Kuyruk sunucusu hata döndürdüğünde veya iş başarısız olduğunda fırlatılır"""
+
+
+def queue_url():
+    return os.getenv(QUEUE_URL_ENV, DEFAULT_QUEUE_URL).rstrip("/")
+
+
+def _check(response):
+    if response.status_code >= 400:
+        try:
+            message = response.json().get("error")
+        except ValueError:
+            message = None
+        raise JobError(message or f"Kuyruk hatası: {response.status_code}")
+    return response.json()
+
+
+def submit_job(url, keyword, domain, profile=False, competitors=None, premium=False):
+    """Yeni bir analiz işi gönderir ve iş kimliğini döndürür; competitors None ise SEO_COMPETITORS kullanılır"""
+    response = requests.post(
+        f"{queue_url()}/jobs",
+        json={
+            "url": url,
+            "keyword": keyword,
+            "domain": domain,
+            "profile": profile,
+            "competitors": competitors,
+            "premium": premium,
+        },
+        timeout=REQUEST_TIMEOUT,
+    )
+    return _check(response)["id"]
+
+
+def get_job(job_id):
+    """İşin durumunu ve kısmi sonuçlarını döndürür"""
+    return _check(requests.get(f"{queue_url()}/jobs/{job_id}", timeout=REQUEST_TIMEOUT))
+
+
+def get_result(job_id):
+    """Tamamlanan işin sonucunu (filename, report) döndürür"""
+    return _check(requests.get(f"{queue_url()}/jobs/{job_id}/result", timeout=REQUEST_TIMEOUT))
+
+
+def iter_job_updates(job_id, poll_interval=POLL_INTERVAL):
+    """İş bitene kadar her yoklamada güncel iş durumunu üretir"""
+    while True:
+        job = get_job(job_id)
+        yield job
+        if job["status"] in ("done", "failed"):
+            return
+        time.sleep(poll_interval)
+
+
+def fetch_metrics():
+    """Kuyruk ve worker metriklerini Prometheus metin formatında döndürür"""
+    response = requests.get(f"{queue_url()}/metrics", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.text
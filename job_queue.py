@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import multiprocessing
+from datetime import datetime
+from contextlib import closing
+
+import metrics
+import profiling
+
+# Analiz işlerinin tutulduğu SQLite veritabanı
+QUEUE_DB_ENV = "SEO_QUEUE_DB"
+DEFAULT_QUEUE_DB = "seo_jobs.db"
+
+POLL_INTERVAL = 1.0
+# Bu süre boyunca haber alınamayan 'running' işler yeniden kuyruğa alınır (worker çökmesi)
+STALE_AFTER = 300.0
+# Çalışan işin kalp atışı bu aralıkla yazılır; uzun süren tek bir aşama işi 'bayat' göstermez
+HEARTBEAT_INTERVAL = STALE_AFTER / 5
+MAX_ATTEMPTS = 3
+# Boştaki worker'lar metriklerini bu aralıkla yeniler; bu süredir yenilenmeyen kayıtlar silinir
+METRICS_REFRESH_INTERVAL = 60.0
+WORKER_METRICS_TTL = 2 * STALE_AFTER
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    url TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    options TEXT,
+    partial TEXT,
+    result TEXT,
+    error TEXT,
+    report_path TEXT,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS worker_metrics (
+    worker TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    snapshot TEXT NOT NULL
+);
+"""
+
+
+def default_db_path():
+    return os.getenv(QUEUE_DB_ENV, DEFAULT_QUEUE_DB)
+
+
+class JobQueue:
+    """SQLite üzerinde kalıcı, çok süreçli kullanıma uygun analiz kuyruğu"""
+
+    def __init__(self, path=None):
+        self.path = path or default_db_path()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # report_path sütunu olmadan oluşturulmuş eski veritabanlarını güncelle
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "report_path" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN report_path TEXT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return closing(conn)
+
+    def submit(self, url, keyword, domain, options=None):
+        """Yeni bir analiz işi ekler ve iş kimliğini döndürür"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, url, keyword, domain, options, created_at) VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, url, keyword, domain, json.dumps(options or {}), time.time()),
+            )
+        return job_id
+
+    def claim(self, worker_id):
+        """Sıradaki işi atomik olarak bu worker'a atar; iş yoksa None döndürür"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Çökmüş worker'ların yarım bıraktığı işleri geri al
+                conn.execute(
+                    "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                    "error = CASE WHEN attempts >= ? THEN 'Worker yanıt vermedi' ELSE error END, worker = NULL "
+                    "WHERE status = 'running' AND heartbeat_at < ?",
+                    (MAX_ATTEMPTS, MAX_ATTEMPTS, now - STALE_AFTER),
+                )
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+                    "started_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (worker_id, now, now, row["id"]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return _row_to_job(row)
+
+    def update_partial(self, job_id, stage, data):
+        """Tamamlanan bir aşamanın verisini işin kısmi sonucuna ekler"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT partial FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            partial = json.loads(row["partial"]) if row and row["partial"] else {}
+            partial[stage] = data
+            conn.execute(
+                "UPDATE jobs SET partial = ?, heartbeat_at = ? WHERE id = ?",
+                (json.dumps(partial, ensure_ascii=False, default=str), time.time(), job_id),
+            )
+            conn.execute("COMMIT")
+
+    def heartbeat(self, job_id, worker_id):
+        """Çalışan işin canlı olduğunu yazar; iş artık bu worker'ın değilse False döner"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker_id),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id, result, worker_id, report_path=None):
+        """
+        İşi tamamlar ve rapor dosyasının yolunu saklar. İş bu worker'dan geri alınıp başka
+        worker'a verildiyse yazılmaz ve False döner.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, report_path = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (json.dumps(result, ensure_ascii=False, default=str), report_path, time.time(), job_id, worker_id),
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id, error, worker_id):
+        """İşi başarısız işaretler; complete() gibi yalnızca işin sahibi olan worker yazabilir"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (str(error), time.time(), job_id, worker_id),
+            )
+        return cursor.rowcount > 0
+
+    def get(self, job_id):
+        """İşin durumunu ve (varsa) sonucunu döndürür; bilinmeyen kimlik için None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def counts(self):
+        """Duruma göre iş sayıları (kuyruk derinliği)"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def store_worker_metrics(self, worker_id, snapshot):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, updated_at, snapshot) VALUES (?, ?, ?)",
+                (worker_id, time.time(), json.dumps(snapshot)),
+            )
+
+    def worker_metrics(self):
+        """Canlı worker'ların metrik görüntüleri; raporlamayı bırakmış worker'ların kayıtları silinir"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM worker_metrics WHERE updated_at < ?", (time.time() - WORKER_METRICS_TTL,))
+            rows = conn.execute("SELECT snapshot FROM worker_metrics").fetchall()
+        return [json.loads(row["snapshot"]) for row in rows]
+
+
+def _row_to_job(row):
+    job = dict(row)
+    for field in ("options", "partial", "result"):
+        job[field] = json.loads(job[field]) if job.get(field) else None
+    return job
+
+
+def save_report(url, keyword, domain, result, stage_results, run_metrics, profile_session=None, report_id=None):
+    """
+    Analiz sonucunu seo_report_<zaman>_<report_id>.json olarak kaydeder ve (dosya adı, rapor verisi)
+    döndürür. report_id (iş kimliği) aynı saniyede biten işlerin dosyalarının çakışmasını önler.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_name = f"seo_report_{timestamp}_{report_id}" if report_id else f"seo_report_{timestamp}"
+    report_data = {
+        "timestamp": timestamp,
+        "url": url,
+        "keyword": keyword,
+        "domain": domain,
+        "result": result,
+        "data": stage_results,
+        "metrics": run_metrics
+    }
+
+    # Profil modu açıksa profili raporun yanına kaydet
+    if profile_session is not None:
+        report_data["profile"] = profile_session.save(base_name)
+
+    filename = f"{base_name}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(report_data, f, ensure_ascii=False, indent=2)
+    return filename, report_data
+
+
+def execute_job(queue, job):
+    """Tek bir işi çalıştırır; aşamalar tamamlandıkça kısmi sonucu kuyruğa yazar"""
+    from seo_crew_simple import run_seo_analysis
+
+    options = job.get("options") or {}
+    stage_results = {}
+
+    def on_stage(stage, data):
+        stage_results[stage] = data
+        queue.update_partial(job["id"], stage, data)
+
+    with metrics.collect_run() as run_metrics, \
+            profiling.profile_run(profiling.profiling_enabled(options.get("profile"))) as profile_session:
+        result = run_seo_analysis(
+            job["url"], job["keyword"], job["domain"], on_stage=on_stage,
+            competitors=options.get("competitors"), premium=bool(options.get("premium"))
+        )
+
+    filename, report_data = save_report(
+        job["url"], job["keyword"], job["domain"], result, stage_results,
+        run_metrics.as_dict(), profile_session, report_id=job["id"]
+    )
+    return {"filename": os.path.abspath(filename), "report": report_data}
+
+
+def _heartbeat_loop(queue, job_id, worker_id, stop_event, interval):
+    while not stop_event.wait(interval):
+        try:
+            if not queue.heartbeat(job_id, worker_id):
+                return
+        except sqlite3.Error as e:
+            print(f"⚠️ Kalp atışı yazılamadı: {job_id}: {str(e)}")
+
+
+def run_worker(db_path=None, worker_id=None, poll_interval=POLL_INTERVAL, stop_event=None):
+    """Kuyruktan iş alıp çalıştıran worker döngüsü"""
+    queue = JobQueue(db_path)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    print(f"👷 Worker başladı: {worker_id}")
+    queue.store_worker_metrics(worker_id, metrics.snapshot())
+    metrics_stored_at = time.time()
+
+    while stop_event is None or not stop_event.is_set():
+        job = queue.claim(worker_id)
+        if job is None:
+            # Boştaki worker'ın metrikleri de canlı sayılsın diye periyodik yenilenir
+            if time.time() - metrics_stored_at >= METRICS_REFRESH_INTERVAL:
+                queue.store_worker_metrics(worker_id, metrics.snapshot())
+                metrics_stored_at = time.time()
+            time.sleep(poll_interval)
+            continue
+
+        print(f"🔧 İş alındı: {job['id']} ({job['url']})")
+        # Aşamalar arasında uzun süre geçse de iş canlı görünsün diye kalp atışı ayrı iş parçacığında yazılır
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat_loop, args=(queue, job["id"], worker_id, stop_heartbeat, HEARTBEAT_INTERVAL), daemon=True
+        )
+        heartbeat.start()
+        try:
+            with metrics.track_in_progress():
+                # Çalışan iş /metrics'te görünsün diye metrikler iş alınınca da yazılır
+                queue.store_worker_metrics(worker_id, metrics.snapshot())
+                job_result = execute_job(queue, job)
+            owned = queue.complete(job["id"], job_result, worker_id, report_path=job_result["filename"])
+        except Exception as e:
+            print(f"⚠️ İş başarısız: {job['id']}: {str(e)}")
+            owned = queue.fail(job["id"], e, worker_id)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            queue.store_worker_metrics(worker_id, metrics.snapshot())
+            metrics_stored_at = time.time()
+        if not owned:
+            print(f"⚠️ İş {job['id']} bu worker'dan geri alınmış; sonuç yazılmadı")
+
+
+def start_workers(count, db_path=None):
+    """Ayrı süreçlerde count adet worker başlatır ve süreç listesini döndürür"""
+    db_path = db_path or default_db_path()
+    JobQueue(db_path)
+    processes = []
+    for _ in range(count):
+        process = multiprocessing.Process(target=run_worker, args=(db_path,), daemon=True)
+        process.start()
+        processes.append(process)
+    return processes
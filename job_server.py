@@ -0,0 +1,136 @@
+import os
+import re
+import json
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import metrics
+from job_queue import JobQueue, start_workers, default_db_path
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7881
+DEFAULT_WORKERS = 2
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/result)?$")
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs                -> yeni analiz işi (url, keyword, domain, profile, competitors, premium)
+    GET  /jobs/<id>           -> iş durumu ve kısmi sonuçlar
+    GET  /jobs/<id>/result    -> tamamlanan işin sonucu
+    GET  /metrics             -> kuyruk derinliği ve worker metrikleri
+    GET  /health
+    """
+
+    queue = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status, text, content_type="text/plain; version=0.0.4; charset=utf-8"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "Bulunamadı"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            return self._send_json(400, {"error": "Geçersiz JSON"})
+
+        fields = {name: str(payload.get(name) or "").strip() for name in ("url", "keyword", "domain")}
+        missing = [name for name, value in fields.items() if not value]
+        if missing:
+            return self._send_json(400, {"error": f"Eksik alanlar: {', '.join(missing)}"})
+        if not fields["url"].startswith(("http://", "https://")):
+            return self._send_json(400, {"error": "URL http:// veya https:// ile başlamalı"})
+
+        # Alan yoksa veya null ise worker SEO_COMPETITORS varsayılanını kullanır
+        try:
+            competitors = None if payload.get("competitors") is None else max(0, int(payload["competitors"]))
+        except (TypeError, ValueError):
+            return self._send_json(400, {"error": "competitors bir tam sayı olmalı"})
+
+        options = {
+            "profile": bool(payload.get("profile")),
+            "competitors": competitors,
+            "premium": bool(payload.get("premium")),
+        }
+        job_id = self.queue.submit(fields["url"], fields["keyword"], fields["domain"], options)
+        self._send_json(202, {"id": job_id, "status": "queued"})
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send_json(200, {"status": "ok"})
+
+        if self.path == "/metrics":
+            lines = ["# HELP seo_jobs Kuyruktaki işler (duruma göre)", "# TYPE seo_jobs gauge"]
+            for status, count in self.queue.counts().items():
+                lines.append(f'seo_jobs{{status="{status}"}} {count}')
+            text = "\n".join(lines) + "\n" + metrics.render_prometheus(self.queue.worker_metrics())
+            return self._send_text(200, text)
+
+        match = JOB_PATH.match(self.path)
+        if not match:
+            return self._send_json(404, {"error": "Bulunamadı"})
+
+        job = self.queue.get(match.group(1))
+        if job is None:
+            return self._send_json(404, {"error": "İş bulunamadı"})
+
+        if match.group(2):
+            if job["status"] == "failed":
+                return self._send_json(500, {"id": job["id"], "status": job["status"], "error": job["error"]})
+            if job["status"] != "done":
+                return self._send_json(409, {"id": job["id"], "status": job["status"]})
+            return self._send_json(200, {"id": job["id"], "status": job["status"], **job["result"]})
+
+        job.pop("result", None)
+        self._send_json(200, job)
+
+    def log_message(self, format, *args):
+        # Durum sorguları çok sık geldiği için erişim kayıtlarını bastır
+        pass
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, db_path=None):
+    """Kuyruk HTTP sunucusunu oluşturur (başlatmaz)"""
+    handler = type("BoundJobRequestHandler", (JobRequestHandler,), {"queue": JobQueue(db_path)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def start_embedded(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, db_path=None):
+    """Sunucuyu arka plan thread'inde, worker'ları ayrı süreçlerde başlatır; temel URL'yi döndürür"""
+    db_path = db_path or default_db_path()
+    server = create_server(host, port, db_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    start_workers(workers, db_path)
+    return f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SEO analiz iş kuyruğu sunucusu")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SEO_QUEUE_WORKERS", DEFAULT_WORKERS)))
+    parser.add_argument("--db", default=default_db_path())
+    args = parser.parse_args()
+
+    start_workers(args.workers, args.db)
+    server = create_server(args.host, args.port, args.db)
+    print(f"🚀 İş kuyruğu http://{args.host}:{args.port} adresinde, {args.workers} worker ile çalışıyor")
+    server.serve_forever()
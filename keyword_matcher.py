@@ -0,0 +1,169 @@
+import re
+from collections import deque
+from functools import lru_cache
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def turkish_lower(text):
+    """Küçük harfe çevirir; 'İ' -> 'i' (str.lower() 'İ'yi 'i̇' yapar). Raporda gösterilen biçim"""
+    return text.replace("İ", "i").lower()
+
+
+def turkish_casefold(text):
+    """
+    Karşılaştırma biçimi: büyük/küçük harf ile noktalı/noktasız i farkı yok sayılır
+    ('I', 'İ', 'ı', 'i' aynı harf). Böylece hem 'Instagram' hem 'IŞIK' doğru eşleşir.
+    """
+    return turkish_lower(text).replace("ı", "i")
+
+
+# Sondan atılabilen Türkçe çekim ekleri (karşılaştırma biçiminde, uzundan kısaya)
+SUFFIXES = tuple(sorted({turkish_casefold(suffix) for suffix in {
+    "lerinden", "larından", "lerinde", "larında", "lerine", "larına", "lerini", "larını",
+    "lerin", "ların", "leri", "ları", "ler", "lar",
+    "ndaki", "ndeki", "daki", "deki", "taki", "teki",
+    "ndan", "nden", "dan", "den", "tan", "ten", "nda", "nde",
+    "nın", "nin", "nun", "nün", "yla", "yle", "sı", "si", "su", "sü",
+    "ya", "ye", "yı", "yi", "yu", "yü", "na", "ne", "da", "de", "ta", "te",
+    "ın", "in", "un", "ün", "ı", "i", "u", "ü", "a", "e",
+}}, key=len, reverse=True))
+# Ek atıldıktan sonra kalması gereken en kısa kök
+MIN_STEM_LENGTH = 3
+MAX_SUFFIX_ROUNDS = 3
+
+
+@lru_cache(maxsize=65536)
+def candidate_roots(token):
+    """
+    Karşılaştırma biçimindeki kelimenin kendisi ve sondan SUFFIXES zincirleri atılarak
+    elde edilebilecek kökler (uzundan kısaya). Kök tek başına anlam taşımaz; yalnızca
+    anahtar kelimelerde birebir geçen bir kökse eşleşme sayılır.
+    """
+    roots = {token}
+    frontier = {token}
+    for _ in range(MAX_SUFFIX_ROUNDS):
+        frontier = {
+            word[:-len(suffix)]
+            for word in frontier
+            for suffix in SUFFIXES
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH
+        } - roots
+        if not frontier:
+            break
+        roots |= frontier
+    return tuple(sorted(roots, key=len, reverse=True))
+
+
+def tokenize(text):
+    """Metni Türkçe harf dönüşümüyle küçültüp kelimelere ayırır"""
+    return TOKEN_PATTERN.findall(turkish_lower(text))
+
+
+class KeywordMatcher:
+    """
+    Binlerce anahtar kelime ve ifadeyi bir Aho-Corasick otomatına derler. Sayfa metni
+    tek geçişte taranır; metindeki kelime, ekleri atıldığında anahtar kelimedeki kelimenin
+    kendisine ulaşıyorsa eşleşir: 'analizi', 'analizler' 'analiz'e sayılır, ancak
+    'bilge' 'bilgi'ye veya 'date' 'data'ya sayılmaz (anahtar kelimeler köke indirgenmez).
+    """
+
+    def __init__(self, keywords):
+        self.keywords = []
+        self._lengths = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._vocabulary = set()
+
+        for keyword in dict.fromkeys(k.strip() for k in keywords if k and k.strip()):
+            words = [turkish_casefold(token) for token in tokenize(keyword)]
+            if not words:
+                continue
+            index = len(self.keywords)
+            self.keywords.append(keyword)
+            self._lengths.append(len(words))
+            self._vocabulary.update(words)
+
+            state = 0
+            for token in words:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        self._build_failure_links()
+
+    def _normalize(self, token):
+        """Metin kelimesini anahtar kelimelerde geçen en uzun köküne, yoksa kendisine eşler"""
+        folded = turkish_casefold(token)
+        for root in candidate_roots(folded):
+            if root in self._vocabulary:
+                return root
+        return folded
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _matches(self, tokens):
+        """Her eşleşme için (anahtar kelime indeksi, bitiş token indeksi) üretir"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, token in enumerate(tokens):
+            token = self._normalize(token)
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for index in output[state]:
+                yield index, position
+
+    def count(self, text):
+        """Her anahtar kelimenin metindeki (çekimli biçimler dahil) geçiş sayısı"""
+        counts = dict.fromkeys(self.keywords, 0)
+        for index, _ in self._matches(tokenize(text)):
+            counts[self.keywords[index]] += 1
+        return counts
+
+    def scan(self, text):
+        """Geçiş sayılarına ek olarak metinde görülen yüzey biçimlerini (varyantları) döndürür"""
+        tokens = tokenize(text)
+        results = {keyword: {"count": 0, "variants": {}} for keyword in self.keywords}
+        for index, position in self._matches(tokens):
+            result = results[self.keywords[index]]
+            result["count"] += 1
+            variant = " ".join(tokens[position - self._lengths[index] + 1:position + 1])
+            result["variants"][variant] = result["variants"].get(variant, 0) + 1
+        return results
+
+    def contains(self, text, keyword):
+        """Anahtar kelime (herhangi bir çekimli biçimiyle) metinde geçiyor mu"""
+        keyword = keyword.strip()
+        if not text or keyword not in self.keywords:
+            return False
+        index = self.keywords.index(keyword)
+        return any(found == index for found, _ in self._matches(tokenize(text)))
+
+
+@lru_cache(maxsize=32)
+def _compiled(keywords):
+    return KeywordMatcher(keywords)
+
+
+def compile_keywords(keywords):
+    """Aynı anahtar kelime listesi için derlenmiş otomatı önbellekten döndürür"""
+    return _compiled(tuple(keywords))
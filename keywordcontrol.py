@@ -1,48 +1,100 @@
-import requests
-from bs4 import BeautifulSoup
 import re
 import textstat
 
-def analyze_keywords(url, keyword):
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
+import cassette
+import html_encoding
+import http_client
+import keyword_matcher
+import metrics
+import onpage
+import shared_cache
+
+def fetch_page(url):
+    """
+    Analiz edilecek sayfayı indirir (diğer aşamalarla paylaşılabilir).
+    Başarılı yanıtlar kısa süreliğine paylaşılan önbellekte tutulur.
+    """
+    return shared_cache.cached(
+        "page",
+        [url],
+        lambda: http_client.get("page", url),
+        should_cache=lambda response: response.status_code == 200,
+        dump=cassette.serialize_response,
+        load=lambda recorded: cassette.deserialize_response(recorded, url),
+    )
 
-        # Metin içeriğini al
-        text = soup.get_text(separator=' ', strip=True)
-        word_list = re.findall(r'\b\w+\b', text.lower())
-        total_words = len(word_list)
+def parse_page(content, encoding, url=""):
+    """
+    Ham sayfa baytlarını çözer ve tek geçişte tüm on-page sinyallerini çıkarır.
+    encoding, Content-Type başlığındaki charset'tir (html_encoding.response_charset);
+    requests'in response.encoding tahmini kullanılmaz.
+    """
+    with metrics.span("parse"):
+        html = html_encoding.decode_html(content, encoding)
+        return onpage.extract_page(html, url)
 
-        # Anahtar kelime sayısı
-        keyword_lower = keyword.lower()
-        keyword_count = word_list.count(keyword_lower)
+def analyze_page(page, keyword, keyword_list=None):
+    """
+    onpage.extract_page çıktısı üzerinde anahtar kelime analizini yapar.
+    keyword_list verilirse listedeki tüm anahtar kelimeler de aynı taramada sayılır.
+    """
+    # Metin içeriğini al
+    with metrics.span("tokenize"):
+        text = page["text"]
+        word_list = re.findall(r'\b\w+\b', text)
+    total_words = len(word_list)
 
-        # Yoğunluk hesaplama
-        density = (keyword_count / total_words) * 100 if total_words > 0 else 0
+    # Anahtar kelime sayısı (Türkçe harf dönüşümü ve çekimli biçimler dahil, tek geçişte)
+    keywords = [keyword] + [k for k in (keyword_list or []) if k != keyword]
+    with metrics.span("keyword_match"):
+        scan = keyword_matcher.compile_keywords(keywords).scan(text)
+    keyword_count = scan[keyword.strip()]["count"] if keyword.strip() in scan else 0
 
-        # Başlık ve meta açıklama kontrolü
-        title = soup.title.string if soup.title else ''
-        meta_description = ''
-        meta_tag = soup.find('meta', attrs={'name': 'description'})
-        if meta_tag and 'content' in meta_tag.attrs:
-            meta_description = meta_tag['content']
+    # Yoğunluk hesaplama
+    density = (keyword_count / total_words) * 100 if total_words > 0 else 0
 
-        in_title = keyword_lower in title.lower()
-        in_description = keyword_lower in meta_description.lower()
+    # Başlık, meta açıklama ve diğer on-page sinyallerde anahtar kelime kontrolü
+    presence, on_page_score = onpage.keyword_presence(page, keyword)
 
-        # Okunabilirlik puanı
+    # Okunabilirlik puanı
+    with metrics.span("readability"):
         readability_score = textstat.flesch_reading_ease(text)
 
-        return {
-            "keyword": keyword,
-            "total_words": total_words,
-            "keyword_count": keyword_count,
-            "keyword_density_percent": round(density, 2),
-            "in_title": in_title,
-            "in_meta_description": in_description,
-            "readability_score": readability_score
-        }
+    return {
+        "keyword": keyword,
+        "total_words": total_words,
+        "keyword_count": keyword_count,
+        "keyword_variants": scan[keyword.strip()]["variants"] if keyword.strip() in scan else {},
+        "keyword_density_percent": round(density, 2),
+        "in_title": presence["title"],
+        "in_meta_description": presence["meta_description"],
+        "readability_score": readability_score,
+        "keyword_presence": presence,
+        "on_page_score": on_page_score,
+        "on_page": onpage.summarize(page),
+        **({"keyword_list_counts": {k: v["count"] for k, v in scan.items()}} if keyword_list else {})
+    }
+
+def analyze_page_content(content, encoding, keyword, url=""):
+    """
+    Ham sayfa baytları üzerinde anahtar kelime analizini yapar.
+    Ağ erişimi olmayan saf bir fonksiyondur; toplu modda ayrı süreçlerde çalıştırılabilir.
+    """
+    return analyze_page(parse_page(content, encoding, url), keyword)
+
+def analyze_keywords(url, keyword, response=None):
+    """
+    Sayfadaki anahtar kelime kullanımını analiz eder.
+    response verilirse sayfa yeniden indirilmez.
+    """
+    try:
+        if response is None:
+            with metrics.span("page_fetch"):
+                response = fetch_page(url)
+
+        return analyze_page_content(
+            response.content, html_encoding.response_charset(response), keyword, response.url or url
+        )
 
     except Exception as e:
         return {"error": str(e)}
-
@@ -0,0 +1,189 @@
+import os
+import gzip
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+# Ham PageSpeed/Lighthouse yanıtlarının sıkıştırılmış olarak saklandığı klasör
+STORE_DIR_ENV = "SEO_LIGHTHOUSE_DIR"
+DEFAULT_STORE_DIR = "lighthouse_runs"
+INDEX_FILE = "index.jsonl"
+
+_index_lock = threading.Lock()
+
+
+def _store_dir():
+    return os.getenv(STORE_DIR_ENV, DEFAULT_STORE_DIR)
+
+
+def _run_path(run_id):
+    return os.path.join(_store_dir(), run_id[:8], f"{run_id}.json.gz")
+
+
+def save_run(url, strategy, raw_content, performance_score=None):
+    """
+    PageSpeed API'nin ham yanıt gövdesini (bytes) yeniden serileştirmeden
+    gzip ile saklar ve küçük bir indeks satırı ekler. Çalışma kimliğini döndürür.
+    """
+    fetched_at = datetime.now()
+    digest = hashlib.sha1(f"{url}|{strategy}|{fetched_at.isoformat()}".encode("utf-8")).hexdigest()[:8]
+    run_id = f"{fetched_at.strftime('%Y%m%d_%H%M%S')}_{digest}"
+
+    path = _run_path(run_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wb", compresslevel=6) as f:
+        f.write(raw_content)
+
+    entry = {
+        "id": run_id,
+        "url": url,
+        "strategy": strategy,
+        "fetched_at": fetched_at.isoformat(timespec="seconds"),
+        "performance_score": performance_score,
+    }
+    with _index_lock:
+        with open(os.path.join(_store_dir(), INDEX_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return run_id
+
+
+class LighthouseRun:
+    """
+    Saklanan bir Lighthouse çalışmasına tembel erişim sağlar.
+    Dosya yalnızca ilk sayısal değer istendiğinde açılır ve çözülür.
+    """
+
+    def __init__(self, run_id, meta=None):
+        self.run_id = run_id
+        self.meta = meta or {}
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            with gzip.open(_run_path(self.run_id), "rb") as f:
+                self._data = json.loads(f.read())
+        return self._data
+
+    def release(self):
+        """Çözülmüş JSON'u bellekten bırakır"""
+        self._data = None
+
+    def _lighthouse(self):
+        return self.data.get("lighthouseResult", {})
+
+    def score(self, category="performance"):
+        """Kategori skoru (0-1)"""
+        return self._lighthouse().get("categories", {}).get(category, {}).get("score")
+
+    def numeric(self, audit_id):
+        """Bir audit'in numericValue değeri (ör. 'largest-contentful-paint' -> ms)"""
+        return self._lighthouse().get("audits", {}).get(audit_id, {}).get("numericValue")
+
+    def numeric_audits(self):
+        """numericValue içeren tüm audit'ler: {audit_id: (değer, birim)}"""
+        audits = self._lighthouse().get("audits", {})
+        return {
+            audit_id: (audit["numericValue"], audit.get("numericUnit"))
+            for audit_id, audit in audits.items()
+            if isinstance(audit, dict) and audit.get("numericValue") is not None
+        }
+
+    def field_metric(self, name, origin=False):
+        """
+        CrUX saha verisinin 75. yüzdelik değeri (ör. 'LARGEST_CONTENTFUL_PAINT_MS').
+        origin=True ise sayfa yerine tüm origin verisi kullanılır.
+        """
+        experience = self.data.get("originLoadingExperience" if origin else "loadingExperience", {})
+        return experience.get("metrics", {}).get(name, {}).get("percentile")
+
+    def field_category(self, name, origin=False):
+        """CrUX saha verisinin kategorisi (FAST / AVERAGE / SLOW)"""
+        experience = self.data.get("originLoadingExperience" if origin else "loadingExperience", {})
+        return experience.get("metrics", {}).get(name, {}).get("category")
+
+    def value(self, metric):
+        """
+        'audit:<id>', 'field:<METRIC>', 'origin:<METRIC>' veya 'score:<kategori>'
+        biçimindeki metrik tanımının değerini döndürür.
+        """
+        kind, _, name = metric.partition(":")
+        if kind == "audit":
+            return self.numeric(name)
+        if kind == "field":
+            return self.field_metric(name)
+        if kind == "origin":
+            return self.field_metric(name, origin=True)
+        if kind == "score":
+            return self.score(name or "performance")
+        raise ValueError(f"Bilinmeyen metrik tanımı: {metric}")
+
+
+def load_run(run_id):
+    """Kimliği bilinen bir çalışmayı (henüz açmadan) döndürür"""
+    return LighthouseRun(run_id)
+
+
+def iter_runs(url=None, strategy=None, since=None, until=None):
+    """
+    İndeksi satır satır okuyarak filtreye uyan çalışmaları üretir.
+    since/until ISO tarih veya zaman damgasıdır; yalnızca tarih verilen until o günü de kapsar.
+    """
+    index_path = os.path.join(_store_dir(), INDEX_FILE)
+    if not os.path.exists(index_path):
+        return
+    with open(index_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            meta = json.loads(line)
+            if url and meta.get("url") != url:
+                continue
+            if strategy and meta.get("strategy") != strategy:
+                continue
+            if since and meta.get("fetched_at", "") < since:
+                continue
+            # Önek karşılaştırması: until="2025-08-01" o günün tüm saatlerini dahil eder
+            if until and meta.get("fetched_at", "")[:len(until)] > until:
+                continue
+            yield LighthouseRun(meta["id"], meta)
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def aggregate(metric, runs, percentiles=(50, 75, 95)):
+    """
+    Birçok çalışma üzerinde bir metriğin ortalama ve yüzdeliklerini hesaplar.
+    Her çalışma değeri alındıktan sonra bellekten bırakılır.
+    """
+    values = []
+    for run in runs:
+        try:
+            value = run.value(metric)
+        except (OSError, ValueError):
+            value = None
+        finally:
+            run.release()
+        if isinstance(value, (int, float)):
+            values.append(float(value))
+
+    values.sort()
+    result = {
+        "metric": metric,
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4) if values else None,
+        "min": values[0] if values else None,
+        "max": values[-1] if values else None,
+    }
+    for p in percentiles:
+        value = _percentile(values, p)
+        result[f"p{p}"] = round(value, 4) if value is not None else None
+    return result
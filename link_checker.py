@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import argparse
+import threading
+import contextvars
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, unquote_plus
+
+import html_encoding
+import http_client
+import resilience
+import shared_cache
+
+# Toplam ve host başına eşzamanlı istek sayısı (hedef sunucuları yormamak için)
+MAX_WORKERS = 32
+PER_HOST_LIMIT_ENV = "SEO_LINK_PER_HOST"
+DEFAULT_PER_HOST_LIMIT = 4
+# Analiz aşamasında sayfa başına kontrol edilecek en fazla link
+MAX_STAGE_LINKS = 500
+
+# HEAD desteklemeyen veya HEAD'i farklı yanıtlayan sunucularda GET ile tekrar denenir
+HEAD_FALLBACK_STATUSES = {400, 403, 404, 405, 406, 429, 500, 501, 503}
+# Link kimliğini değiştirmeyen izleme parametreleri
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "yclid", "mc_cid", "mc_eid")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# İstek hiç gönderilmeden oluşan hatalar: link kırık değil, kontrol edilemedi
+UNCHECKED_ERRORS = (resilience.DeadlineExceeded, resilience.CircuitOpenError)
+
+
+def per_host_limit():
+    try:
+        return max(1, int(os.getenv(PER_HOST_LIMIT_ENV, DEFAULT_PER_HOST_LIMIT)))
+    except ValueError:
+        return DEFAULT_PER_HOST_LIMIT
+
+
+def normalize_url(url):
+    """
+    Aynı hedefi gösteren yazımları tek biçime indirir: küçük harf şema/host, varsayılan port
+    ve parça (#) kaldırılır, boş yol '/' olur, izleme parametreleri atılır. Diğer sorgu
+    parametrelere dokunulmaz; istenen URL sayfadakiyle aynı kalır. http(s) dışı için None.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    query = "&".join(
+        pair for pair in parts.query.split("&")
+        if not unquote_plus(pair.split("=", 1)[0]).lower().startswith(TRACKING_PARAMS)
+    ) if parts.query else ""
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def extract_links(page):
+    """onpage.extract_page çıktısındaki <a href> linklerini normalize edilmiş ve tekil olarak döndürür"""
+    links = []
+    for link in page.get("links", []):
+        url = normalize_url(link["href"])
+        if url:
+            links.append(url)
+    return list(dict.fromkeys(links))
+
+
+def _status_result(url, response, method):
+    return {
+        "url": url,
+        "status": response.status_code,
+        "ok": response.status_code < 400,
+        "final_url": response.url if response.url and response.url != url else None,
+        "method": method,
+    }
+
+
+def _error_result(url, error, method=None):
+    result = {"url": url, "status": None, "ok": False, "error": type(error).__name__}
+    if isinstance(error, UNCHECKED_ERRORS):
+        result["unchecked"] = True
+    if method:
+        result["method"] = method
+    return result
+
+
+def _check(url):
+    """Önce HEAD, gerekirse gövdesi okunmayan GET ile linkin durumunu bulur"""
+    try:
+        response = http_client.head("link", url)
+        response.close()
+        if response.status_code not in HEAD_FALLBACK_STATUSES:
+            return _status_result(url, response, "HEAD")
+    except Exception:
+        # Açık devre kesici veya biten süre bütçesi GET denemesinde de aynı hatayı verir
+        pass
+
+    try:
+        response = http_client.get("link", url, stream=True)
+        response.close()
+        return _status_result(url, response, "GET")
+    except Exception as e:
+        return _error_result(url, e, "GET")
+
+
+def _is_definitive(result):
+    # Zaman aşımı, bağlantı hatası ve 5xx geçici olabilir; önbelleğe yazılmaz
+    return result.get("status") is not None and result["status"] < 500
+
+
+def check_url(url):
+    """Tek bir linkin durumunu (paylaşılan önbellek süresi içindeyse önbellekten) döndürür"""
+    return shared_cache.cached("link", [url], lambda: _check(url), should_cache=_is_definitive)
+
+
+def _interleave_by_host(urls):
+    """Havuzun tek bir host'un kuyruğunda beklememesi için URL'leri host'lar arasında sırayla dağıtır"""
+    queues = defaultdict(list)
+    for url in urls:
+        queues[urlsplit(url).netloc].append(url)
+    ordered = []
+    while queues:
+        for host in list(queues):
+            ordered.append(queues[host].pop(0))
+            if not queues[host]:
+                del queues[host]
+    return ordered
+
+
+def check_links(urls, max_workers=MAX_WORKERS, per_host=None):
+    """
+    Linkleri tekilleştirip eşzamanlı kontrol eder; host başına en fazla per_host istek aynı anda yapılır.
+    {url: sonuç} döndürür.
+    """
+    urls = list(dict.fromkeys(url for url in (normalize_url(u) for u in urls) if url))
+    if not urls:
+        return {}
+    per_host = per_host or per_host_limit()
+    semaphores = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+    semaphores_lock = threading.Lock()
+
+    def run(url):
+        with semaphores_lock:
+            semaphore = semaphores[urlsplit(url).netloc]
+        with semaphore:
+            try:
+                return check_url(url)
+            except Exception as e:
+                # Tek linkin hatası diğer linklerin sonuçlarını düşürmesin
+                return _error_result(url, e)
+
+    ordered = _interleave_by_host(urls)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ordered))) as executor:
+        # Süre bütçesi ve metrik bağlamı her kontrole taşınır
+        futures = [executor.submit(contextvars.copy_context().run, run, url) for url in ordered]
+        return {url: future.result() for url, future in zip(ordered, futures)}
+
+
+def summarize(results, sources=None, page_host=None):
+    """
+    Kontrol sonuçlarını rapora uygun özete çevirir; sources verilirse kırık linkin bulunduğu sayfalar eklenir.
+    Süre bütçesi dolduğu veya devre kesici açık olduğu için istenemeyen linkler kırık sayılmaz,
+    'unchecked' altında ayrıca listelenir.
+    """
+    by_status = defaultdict(int)
+    broken, unchecked, redirected = [], [], 0
+    for url, result in results.items():
+        if result.get("unchecked"):
+            unchecked.append({"url": url, "error": result.get("error")})
+            continue
+        by_status[str(result.get("status") or result.get("error"))] += 1
+        if result.get("final_url"):
+            redirected += 1
+        if not result["ok"]:
+            entry = {"url": url, "status": result.get("status"), "error": result.get("error")}
+            if page_host is not None:
+                entry["internal"] = urlsplit(url).netloc == page_host
+            if sources is not None:
+                entry["found_on"] = sorted(sources.get(url, ()))
+            broken.append(entry)
+    broken.sort(key=lambda entry: (entry.get("status") is None, entry["url"]))
+    unchecked.sort(key=lambda entry: entry["url"])
+    return {
+        "checked": len(results) - len(unchecked),
+        "broken_count": len(broken),
+        "unchecked_count": len(unchecked),
+        "redirected_count": redirected,
+        "by_status": dict(sorted(by_status.items())),
+        "broken": broken,
+        "unchecked": unchecked,
+    }
+
+
+def check_page_links(page, max_links=MAX_STAGE_LINKS):
+    """Analiz aşaması: tek sayfanın linklerini kontrol eder ve özetler"""
+    try:
+        links = extract_links(page)
+        results = check_links(links[:max_links])
+        summary = summarize(results, page_host=urlsplit(normalize_url(page["url"]) or "").netloc)
+        summary["total_links"] = len(links)
+        return summary
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def check_site(page_urls, max_workers=MAX_WORKERS, per_host=None):
+    """
+    Birden fazla sayfayı indirip tüm linklerini sayfalar arasında tekilleştirerek bir kez kontrol eder.
+    Kırık linkler bulundukları sayfalarla birlikte döndürülür.
+    """
+    from keywordcontrol import fetch_page, parse_page
+
+    sources = defaultdict(set)
+    page_errors = {}
+
+    def load(page_url):
+        response = fetch_page(page_url)
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        return parse_page(response.content, html_encoding.response_charset(response), response.url or page_url)
+
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(page_urls)))) as executor:
+        futures = {page_url: executor.submit(contextvars.copy_context().run, load, page_url) for page_url in page_urls}
+        for page_url, future in futures.items():
+            try:
+                page = future.result()
+            except Exception as e:
+                page_errors[page_url] = str(e)
+                continue
+            for link in extract_links(page):
+                sources[link].add(page_url)
+
+    results = check_links(list(sources), max_workers=max_workers, per_host=per_host)
+    summary = summarize(results, sources)
+    summary["pages"] = len(page_urls)
+    if page_errors:
+        summary["page_errors"] = page_errors
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sayfalardaki kırık linkleri eşzamanlı kontrol eder")
+    parser.add_argument("urls", nargs="*", help="Kontrol edilecek sayfalar")
+    parser.add_argument("--file", help="Her satırda bir sayfa URL'si olan dosya")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--per-host", type=int, default=None, help="Host başına eşzamanlı istek (varsayılan SEO_LINK_PER_HOST)")
+    args = parser.parse_args()
+
+    page_urls = list(args.urls)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            page_urls += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not page_urls:
+        parser.error("En az bir sayfa URL'si gerekli")
+
+    result = check_site(page_urls, args.workers, args.per_host)
+    sys.stdout.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
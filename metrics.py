@@ -0,0 +1,293 @@
+import threading
+import time
+import contextvars
+from contextlib import contextmanager
+
+# Prometheus uyumlu varsayılan histogram aralıkları (saniye)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP_TEXTS = {
+    "seo_stage_duration_seconds": "Analiz aşamalarının süresi",
+    "seo_stage_errors_total": "Hata ile biten analiz aşamaları",
+    "seo_api_latency_seconds": "Harici API çağrılarının gecikmesi",
+    "seo_api_requests_total": "Harici API çağrıları (durum koduna göre)",
+    "seo_api_errors_total": "Başarısız harici API çağrıları",
+    "seo_api_rate_limited_total": "429 ile dönen harici API çağrıları",
+    "seo_cache_requests_total": "Önbellek istekleri (hit/miss)",
+    "seo_cache_errors_total": "Erişilemeyen veya hatalı yanıt veren önbellek işlemleri",
+    "seo_llm_generation_seconds": "LLM rapor üretim süresi",
+    "seo_llm_tokens_total": "LLM çağrılarında harcanan token'lar (input/output)",
+    "seo_page_charset_total": "Sayfa kodlamasının belirlendiği kaynak (bom/header/meta/default/fallback)",
+    "seo_analyses_in_progress": "Şu anda çalışan/sırada bekleyen analizler",
+    "seo_analyses_total": "Tamamlanan analizler",
+    "seo_circuit_open": "Devre kesicisi açık olan API'ler (1 = açık)",
+    "seo_circuit_rejected_total": "Devre kesici tarafından reddedilen çağrılar",
+    "seo_stage_missing_total": "Süre bütçesi içinde tamamlanamayan aşamalar",
+    "seo_rate_limit_wait_seconds": "Hız sınırı nedeniyle API çağrısı öncesi beklenen süre",
+}
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+# Aktif analizin ölçümleri (thread'lere contextvars ile taşınır)
+_current_run = contextvars.ContextVar("seo_current_run", default=None)
+
+# Her aşama bitişinde çağrılan dinleyiciler (ör. profiling)
+_span_listeners = []
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """Sayacı artırır"""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """Gauge değerini ayarlar"""
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def add_gauge(name, value, **labels):
+    """Gauge değerini artırır/azaltır"""
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0) + value
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    """Histograma bir gözlem ekler"""
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            _histograms[key] = hist
+        for i, bound in enumerate(hist["buckets"]):
+            if value <= bound:
+                hist["counts"][i] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+
+class RunMetrics:
+    """Tek bir analiz çalışmasına ait zamanlama ve API ölçümleri"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.spans = []
+        self.api_calls = []
+        self.llm_calls = []
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, stage, seconds, ok):
+        with self._lock:
+            self.spans.append({"stage": stage, "seconds": round(seconds, 4), "ok": ok})
+
+    def add_api_call(self, api, seconds, status):
+        with self._lock:
+            self.api_calls.append({"api": api, "seconds": round(seconds, 4), "status": status})
+
+    def add_llm_call(self, model, input_tokens, output_tokens, seconds):
+        with self._lock:
+            self.llm_calls.append({
+                "model": model,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "seconds": round(seconds, 4),
+            })
+
+    def add_cache(self, cache, hit):
+        with self._lock:
+            stats = self.cache.setdefault(cache, {"hit": 0, "miss": 0})
+            stats["hit" if hit else "miss"] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "total_seconds": round(time.time() - self.started_at, 4),
+                "spans": list(self.spans),
+                "api_calls": list(self.api_calls),
+                "llm_calls": list(self.llm_calls),
+                "cache": {name: dict(stats) for name, stats in self.cache.items()},
+            }
+
+
+def current_run():
+    """Aktif analizin RunMetrics nesnesini döndürür (yoksa None)"""
+    return _current_run.get()
+
+
+@contextmanager
+def collect_run():
+    """Blok içinde yapılan ölçümleri bir RunMetrics nesnesinde toplar"""
+    run = RunMetrics()
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def add_span_listener(listener):
+    """Aşama bitişlerinde listener(stage, seconds, ok) çağrılmasını sağlar"""
+    _span_listeners.append(listener)
+
+
+@contextmanager
+def span(stage):
+    """Bir analiz aşamasının süresini ölçer"""
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        observe("seo_stage_duration_seconds", elapsed, stage=stage)
+        if not ok:
+            inc("seo_stage_errors_total", stage=stage)
+        run = _current_run.get()
+        if run is not None:
+            run.add_span(stage, elapsed, ok)
+        for listener in _span_listeners:
+            listener(stage, elapsed, ok)
+
+
+def record_api_call(api, seconds, status):
+    """Harici bir API çağrısının gecikmesini ve sonucunu kaydeder"""
+    status = str(status)
+    observe("seo_api_latency_seconds", seconds, api=api)
+    inc("seo_api_requests_total", api=api, status=status)
+    if status == "429":
+        inc("seo_api_rate_limited_total", api=api)
+    if not status.isdigit() or int(status) >= 400:
+        inc("seo_api_errors_total", api=api, reason=status)
+    run = _current_run.get()
+    if run is not None:
+        run.add_api_call(api, seconds, status)
+
+
+def record_llm_usage(model, input_tokens, output_tokens, seconds):
+    """Bir LLM çağrısının girdi/çıktı token sayısını ve üretim süresini kaydeder"""
+    observe("seo_llm_generation_seconds", seconds, model=model)
+    if input_tokens is not None:
+        inc("seo_llm_tokens_total", input_tokens, model=model, direction="input")
+    if output_tokens is not None:
+        inc("seo_llm_tokens_total", output_tokens, model=model, direction="output")
+    run = _current_run.get()
+    if run is not None:
+        run.add_llm_call(model, input_tokens, output_tokens, seconds)
+
+
+def record_cache(cache, hit):
+    """Önbellek isabet/ıskalama bilgisini kaydeder"""
+    inc("seo_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+    run = _current_run.get()
+    if run is not None:
+        run.add_cache(cache, hit)
+
+
+@contextmanager
+def track_in_progress():
+    """Çalışan analiz sayısını (kuyruk derinliği) takip eder"""
+    add_gauge("seo_analyses_in_progress", 1)
+    try:
+        yield
+    finally:
+        add_gauge("seo_analyses_in_progress", -1)
+        inc("seo_analyses_total")
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra) if extra else [])
+    if not items:
+        return ""
+    escaped = []
+    for k, v in items:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{k}="{v}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def snapshot():
+    """Süreçteki tüm metriklerin JSON'a çevrilebilir kopyasını döndürür"""
+    with _lock:
+        return {
+            "counters": [[name, [list(l) for l in labels], value] for (name, labels), value in _counters.items()],
+            "gauges": [[name, [list(l) for l in labels], value] for (name, labels), value in _gauges.items()],
+            "histograms": [
+                [name, [list(l) for l in labels], {**hist, "buckets": list(hist["buckets"]), "counts": list(hist["counts"])}]
+                for (name, labels), hist in _histograms.items()
+            ],
+        }
+
+
+def _merge_snapshot(counters, gauges, histograms, data):
+    for name, labels, value in data.get("counters", []):
+        key = (name, tuple(tuple(l) for l in labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, value in data.get("gauges", []):
+        key = (name, tuple(tuple(l) for l in labels))
+        gauges[key] = gauges.get(key, 0) + value
+    for name, labels, hist in data.get("histograms", []):
+        key = (name, tuple(tuple(l) for l in labels))
+        existing = histograms.get(key)
+        if existing is None or list(existing["buckets"]) != list(hist["buckets"]):
+            histograms[key] = {**hist, "counts": list(hist["counts"])}
+            continue
+        existing["counts"] = [a + b for a, b in zip(existing["counts"], hist["counts"])]
+        existing["sum"] += hist["sum"]
+        existing["count"] += hist["count"]
+
+
+def render_prometheus(snapshots=()):
+    """
+    Tüm metrikleri Prometheus metin formatında döndürür.
+    snapshots ile diğer süreçlerden (ör. kuyruk worker'ları) alınan ölçümler toplanarak eklenir.
+    """
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {k: {**v, "counts": list(v["counts"])} for k, v in _histograms.items()}
+    for data in snapshots:
+        _merge_snapshot(counters, gauges, histograms, data)
+
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name in seen:
+            return
+        seen.add(name)
+        if name in HELP_TEXTS:
+            lines.append(f"# HELP {name} {HELP_TEXTS[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), value in sorted(gauges.items()):
+        header(name, "gauge")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), hist in sorted(histograms.items()):
+        header(name, "histogram")
+        for bound, count in zip(hist["buckets"], hist["counts"]):
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {round(hist['sum'], 6)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+
+    return "\n".join(lines) + "\n"
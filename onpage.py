@@ -0,0 +1,242 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+
+import keyword_matcher
+
+# İçeriği sayfa metnine dahil edilmeyen etiketler (BeautifulSoup get_text ile aynı)
+SKIP_TEXT_TAGS = {"script", "style", "template"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+CSS_URL_PATTERN = re.compile(r"url\(\s*['\"]?([^'\")]+)['\"]?\s*\)")
+
+
+class OnPageExtractor(HTMLParser):
+    """
+    Sayfayı tek geçişte dolaşarak metni ve tüm on-page SEO sinyallerini toplar:
+    title, meta etiketleri, canonical, hreflang, Open Graph, H1-H6, görseller,
+    linkler, script/stil kaynakları ve satır içi CSS referansları.
+    """
+
+    def __init__(self, base_url=""):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.text_parts = []
+        self.title = ""
+        self.meta = {}
+        self.og = {}
+        self.headings = {tag: [] for tag in sorted(HEADING_TAGS)}
+        self.images = []
+        self.links = []
+        self.link_tags = []
+        self.scripts = []
+        self.css_urls = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._title_parts = []
+        self._heading = None
+        self._heading_parts = []
+        self._in_style = False
+        self._body_started = False
+
+    # --- yardımcılar ---------------------------------------------------
+
+    def _resolve(self, href):
+        if not href:
+            return None
+        href = href.strip()
+        if href.startswith(("data:", "javascript:", "mailto:", "tel:", "#", "about:", "blob:")):
+            return None
+        return urljoin(self.base_url, href)
+
+    # --- HTMLParser olayları --------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: (value if value is not None else "") for name, value in attrs}
+
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+            self._in_style = tag == "style"
+        if tag == "body":
+            self._body_started = True
+
+        if tag == "base" and attrs.get("href"):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            name = (attrs.get("name") or attrs.get("http-equiv") or "").lower()
+            prop = attrs.get("property", "").lower()
+            if prop.startswith("og:"):
+                self.og.setdefault(prop[3:], attrs.get("content", ""))
+            elif name:
+                self.meta.setdefault(name, attrs.get("content", ""))
+        elif tag == "link":
+            self.link_tags.append({
+                "rel": attrs.get("rel", "").lower().split(),
+                "href": self._resolve(attrs.get("href")),
+                "as": attrs.get("as", "").lower(),
+                "media": attrs.get("media", "").lower(),
+                "hreflang": attrs.get("hreflang", ""),
+                "disabled": "disabled" in attrs,
+            })
+        elif tag == "script" and attrs.get("src"):
+            self.scripts.append({
+                "src": self._resolve(attrs["src"]),
+                "in_head": not self._body_started,
+                "async": "async" in attrs,
+                "defer": "defer" in attrs,
+                "type": attrs.get("type", "").lower(),
+            })
+        elif tag == "img":
+            self.images.append({
+                "src": self._resolve(attrs.get("src")),
+                "srcset": attrs.get("srcset", ""),
+                "sizes": attrs.get("sizes", ""),
+                "alt": attrs.get("alt"),
+                "width": attrs.get("width", ""),
+                "height": attrs.get("height", ""),
+                "loading": attrs.get("loading", "").lower(),
+            })
+        elif tag == "a" and attrs.get("href"):
+            href = self._resolve(attrs["href"])
+            if href:
+                self.links.append({"href": href, "rel": attrs.get("rel", "").lower().split()})
+        elif tag in HEADING_TAGS:
+            self._heading = tag
+            self._heading_parts = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in SKIP_TEXT_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+            self._in_style = False
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            # SVG içindeki <title> etiketleri sayfa başlığını ezmesin
+            if not self.title:
+                self.title = "".join(self._title_parts).strip()
+        elif tag == "head":
+            self._body_started = True
+        elif tag == self._heading:
+            self.headings[tag].append(" ".join("".join(self._heading_parts).split()))
+            self._heading = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            if self._in_style:
+                self.css_urls.extend(CSS_URL_PATTERN.findall(data))
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+        if self._heading:
+            self._heading_parts.append(data)
+        stripped = data.strip()
+        if stripped:
+            self.text_parts.append(stripped)
+
+    # --- sonuç ----------------------------------------------------------
+
+    def result(self):
+        """Toplanan sinyalleri süreçler arasında taşınabilir sade bir sözlük olarak döndürür"""
+        page_host = urlparse(self.base_url).netloc.lower()
+        internal = external = nofollow = 0
+        for link in self.links:
+            host = urlparse(link["href"]).netloc.lower()
+            if not host or host == page_host:
+                internal += 1
+                link["internal"] = True
+            else:
+                external += 1
+                link["internal"] = False
+            if "nofollow" in link["rel"]:
+                nofollow += 1
+
+        canonical = next((l["href"] for l in self.link_tags if "canonical" in l["rel"] and l["href"]), None)
+        hreflang = [
+            {"lang": l["hreflang"], "href": l["href"]}
+            for l in self.link_tags if "alternate" in l["rel"] and l["hreflang"] and l["href"]
+        ]
+
+        return {
+            "url": self.base_url,
+            "text": " ".join(self.text_parts),
+            "title": self.title,
+            "meta_description": self.meta.get("description", ""),
+            "robots": self.meta.get("robots", ""),
+            "meta": self.meta,
+            "canonical": canonical,
+            "hreflang": hreflang,
+            "open_graph": self.og,
+            "headings": self.headings,
+            "images": self.images,
+            "links": self.links,
+            "link_counts": {"internal": internal, "external": external, "nofollow": nofollow},
+            "link_tags": self.link_tags,
+            "scripts": self.scripts,
+            "css_urls": [urljoin(self.base_url, u.strip()) for u in self.css_urls if not u.strip().startswith("data:")],
+        }
+
+
+def extract_page(html, base_url=""):
+    """HTML metnini tek geçişte ayrıştırır ve on-page sinyallerini döndürür"""
+    extractor = OnPageExtractor(base_url)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.result()
+
+
+def keyword_presence(page, keyword):
+    """Anahtar kelimenin her on-page sinyalde geçip geçmediğini ve ağırlıklı skoru döndürür"""
+    keyword = keyword.strip()
+    matcher = keyword_matcher.compile_keywords([keyword])
+
+    def contains(value):
+        # Türkçe harf dönüşümü ve çekimli biçimler dahil
+        return matcher.contains(value, keyword)
+
+    first_words = " ".join(page["text"].split()[:100])
+    subheadings = [h for tag in ("h2", "h3", "h4", "h5", "h6") for h in page["headings"].get(tag, [])]
+    slug = urlparse(page.get("url", "")).path.replace("-", " ").replace("_", " ")
+
+    presence = {
+        "title": contains(page["title"]),
+        "meta_description": contains(page["meta_description"]),
+        "h1": any(contains(h) for h in page["headings"].get("h1", [])),
+        "subheadings": sum(1 for h in subheadings if contains(h)),
+        "image_alt": sum(1 for img in page["images"] if contains(img.get("alt"))),
+        "open_graph": contains(page["open_graph"].get("title")) or contains(page["open_graph"].get("description")),
+        "url": contains(slug),
+        "first_100_words": contains(first_words),
+    }
+
+    # Ağırlıklar toplamı 100
+    weights = {
+        "title": 25, "meta_description": 15, "h1": 20, "subheadings": 10,
+        "image_alt": 5, "open_graph": 5, "url": 10, "first_100_words": 10,
+    }
+    score = sum(weight for signal, weight in weights.items() if presence[signal])
+    return presence, score
+
+
+def summarize(page):
+    """Rapora konacak kısa on-page özeti (uzun listeler olmadan)"""
+    images_missing_alt = sum(1 for img in page["images"] if not (img.get("alt") or "").strip())
+    return {
+        "title": page["title"],
+        "title_length": len(page["title"]),
+        "meta_description": page["meta_description"],
+        "meta_description_length": len(page["meta_description"]),
+        "canonical": page["canonical"],
+        "robots": page["robots"],
+        "hreflang": [h["lang"] for h in page["hreflang"]],
+        "open_graph": {k: v for k, v in page["open_graph"].items() if k in ("title", "description", "image", "type", "url")},
+        "heading_counts": {tag: len(items) for tag, items in page["headings"].items()},
+        "h1": page["headings"].get("h1", [])[:3],
+        "image_count": len(page["images"]),
+        "images_missing_alt": images_missing_alt,
+        "links": page["link_counts"],
+    }
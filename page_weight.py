@@ -0,0 +1,166 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import http_client
+import image_audit
+import onpage
+from image_audit import CONTENT_RANGE_PATTERN
+
+# Boyutu kontrol edilecek en fazla alt kaynak ve eşzamanlı istek sayısı
+MAX_RESOURCES = 150
+MAX_WORKERS = 16
+TOP_RESOURCES = 5
+
+FONT_EXTENSIONS = (".woff2", ".woff", ".ttf", ".otf", ".eot")
+
+
+def _absolute(page_url, href):
+    if not href:
+        return None
+    href = href.strip()
+    if href.startswith(("data:", "javascript:", "#", "about:", "blob:")):
+        return None
+    url = urljoin(page_url, href)
+    if urlparse(url).scheme not in ("http", "https"):
+        return None
+    return url.split("#", 1)[0]
+
+
+def find_subresources(page_url, page):
+    """
+    Sayfadaki script, stil, görsel ve font kaynaklarını bulur.
+    page, onpage.extract_page çıktısı ya da ham HTML metni olabilir.
+    """
+    if isinstance(page, str):
+        page = onpage.extract_page(page, page_url)
+    resources = []
+
+    def add(href, kind, render_blocking=False):
+        url = _absolute(page_url, href)
+        if url:
+            resources.append({"url": url, "type": kind, "render_blocking": render_blocking})
+
+    for script in page["scripts"]:
+        blocking = (
+            script["in_head"]
+            and not script["async"]
+            and not script["defer"]
+            and script["type"] != "module"
+        )
+        add(script["src"], "script", blocking)
+
+    for link in page["link_tags"]:
+        rel = link["rel"]
+        if not link["href"]:
+            continue
+        if "stylesheet" in rel:
+            add(link["href"], "stylesheet", (link["media"] or "all") not in ("print", "none") and not link["disabled"])
+        elif "preload" in rel and link["as"] == "font":
+            add(link["href"], "font")
+        elif "preload" in rel and link["as"] in ("script", "style", "image"):
+            add(link["href"], {"style": "stylesheet"}.get(link["as"], link["as"]))
+
+    for img in page["images"]:
+        add(img["src"], "image")
+
+    # Satır içi CSS'teki font ve arka plan görselleri
+    for href in page["css_urls"]:
+        kind = "font" if href.lower().split("?")[0].endswith(FONT_EXTENSIONS) else "image"
+        add(href, kind)
+
+    # Aynı kaynağı bir kez say; engelleyici olarak işaretlenmişse bunu koru
+    unique = {}
+    for resource in resources:
+        existing = unique.get(resource["url"])
+        if existing is None:
+            unique[resource["url"]] = resource
+        elif resource["render_blocking"]:
+            existing["render_blocking"] = True
+    return list(unique.values())
+
+
+def _image_size(url):
+    """
+    Görselin boyutu, görsel denetimiyle paylaşılan Range okumasından (image_audit.probe_image)
+    alınır: sonuç önbelleğe yazıldığından denetim aşaması aynı görsel için yeniden istek atmaz.
+    """
+    return image_audit.probe_image(url).get("bytes")
+
+
+def _resource_size(url):
+    """Önce HEAD, olmazsa 1 baytlık Range isteğiyle kaynağın boyutunu bulur"""
+    try:
+        response = http_client.head("resource", url)
+        length = response.headers.get("Content-Length")
+        if response.status_code < 400 and length and length.isdigit():
+            return int(length)
+    except Exception:
+        pass
+
+    try:
+        response = http_client.get("resource", url, headers={"Range": "bytes=0-0"}, stream=True)
+        try:
+            if response.status_code == 206:
+                match = CONTENT_RANGE_PATTERN.search(response.headers.get("Content-Range", ""))
+                if match:
+                    return int(match.group(1))
+            length = response.headers.get("Content-Length")
+            if response.status_code < 400 and length and length.isdigit():
+                return int(length)
+        finally:
+            response.close()
+    except Exception:
+        pass
+    return None
+
+
+def estimate_page_weight(page_url, html, html_bytes=None):
+    """
+    PageSpeed'e ulaşılamadığında hızlı bir performans göstergesi olarak
+    sayfanın toplam ağırlığını, istek sayısını ve render'ı engelleyen kaynakları tahmin eder.
+    html, ham HTML metni ya da önceden çıkarılmış onpage sonucu olabilir.
+    """
+    try:
+        resources = find_subresources(page_url, html)[:MAX_RESOURCES]
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            # Süre bütçesi ve metrik bağlamı her isteğe taşınır
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    _image_size if resource["type"] == "image" else _resource_size,
+                    resource["url"],
+                )
+                for resource in resources
+            ]
+            for resource, future in zip(resources, futures):
+                resource["bytes"] = future.result()
+
+        if html_bytes is None:
+            html_bytes = len(html.encode("utf-8")) if isinstance(html, str) else 0
+
+        by_type = {}
+        for resource in resources:
+            stats = by_type.setdefault(resource["type"], {"count": 0, "bytes": 0})
+            stats["count"] += 1
+            stats["bytes"] += resource["bytes"] or 0
+
+        sized = [r for r in resources if r["bytes"] is not None]
+        blocking = [r["url"] for r in resources if r["render_blocking"]]
+        largest = sorted(sized, key=lambda r: r["bytes"], reverse=True)[:TOP_RESOURCES]
+
+        return {
+            "estimated": True,
+            "html_bytes": html_bytes,
+            "total_bytes": html_bytes + sum(r["bytes"] for r in sized),
+            "request_count": 1 + len(resources),
+            "unknown_size_count": len(resources) - len(sized),
+            "render_blocking_count": len(blocking),
+            "render_blocking": blocking[:10],
+            "by_type": by_type,
+            "largest_resources": [{"url": r["url"], "type": r["type"], "bytes": r["bytes"]} for r in largest],
+        }
+
+    except Exception as e:
+        return {"error": str(e)}
@@ -1,11 +1,25 @@
-import requests
 import os
 from dotenv import load_dotenv
 
+import http_client
+import lighthouse_store
+import shared_cache
+
 # .env dosyasını yükle
 load_dotenv()
 
-def get_pagespeed_metrics(url):
+def get_pagespeed_metrics(url, fresh=False):
+    """
+    URL'nin PageSpeed metriklerini getirir. Başarılı sonuçlar paylaşılan önbellekte
+    tutulur; başka bir replikada alınmış sonuç API çağrısı yapılmadan kullanılır.
+    fresh=True ise (ör. planlı yenileme) önbellek atlanır ve API her zaman çağrılır.
+    """
+    return shared_cache.cached(
+        "pagespeed", [url, "desktop"], lambda: _fetch_pagespeed_metrics(url),
+        should_cache=shared_cache.is_success, fresh=fresh
+    )
+
+def _fetch_pagespeed_metrics(url):
     api_key = os.getenv("PAGESPEED_API_KEY")
     endpoint = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
 
@@ -15,7 +29,7 @@ def get_pagespeed_metrics(url):
         "strategy": "desktop"  # mobile için değiştirilebilir
     }
 
-    response = requests.get(endpoint, params=params)
+    response = http_client.get("pagespeed", endpoint, params=params)
 
     if response.status_code == 200:
         data = response.json()
@@ -24,7 +38,15 @@ def get_pagespeed_metrics(url):
         performance_score = lighthouse.get("categories", {}).get("performance", {}).get("score", None)
         audits = lighthouse.get("audits", {})
 
+        # Ham yanıtı sonraki toplu analizler için sıkıştırılmış olarak sakla
+        lighthouse_run_id = None
+        try:
+            lighthouse_run_id = lighthouse_store.save_run(url, params["strategy"], response.content, performance_score)
+        except OSError as e:
+            print(f"⚠️ Lighthouse sonucu kaydedilemedi: {str(e)}")
+
         return {
+            "lighthouse_run_id": lighthouse_run_id,
             "performance_score": performance_score,
             "first_contentful_paint": audits.get("first-contentful-paint", {}).get("displayValue"),
             "speed_index": audits.get("speed-index", {}).get("displayValue"),
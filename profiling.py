@@ -0,0 +1,181 @@
+import os
+import io
+import cProfile
+import pstats
+import threading
+import tracemalloc
+import contextvars
+from contextlib import contextmanager
+
+import metrics
+
+# SEO_PROFILE=1 ile tüm analizler için profil modu açılır
+PROFILE_ENV = "SEO_PROFILE"
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+TRACE_FRAMES = 10
+
+_current_session = contextvars.ContextVar("seo_profile_session", default=None)
+
+# Eşzamanlı profil oturumları tracemalloc'u paylaşır; son oturum bitince durdurulur
+_tracing_lock = threading.Lock()
+_tracing_sessions = 0
+_owns_tracing = False
+
+
+def profiling_enabled(requested=False):
+    """İstek bazında veya ortam değişkeniyle profil modunun açık olup olmadığını döndürür"""
+    if requested:
+        return True
+    return os.getenv(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class ProfileSession:
+    """Bir analiz boyunca CPU profili ve tracemalloc ölçümlerini toplar"""
+
+    def __init__(self):
+        self.profilers = []
+        self.stage_memory = []
+        self.snapshot = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile_thread(self):
+        """Çağıran thread'i ayrı bir cProfile ile profiller, sonuçlar kaydederken birleştirilir"""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+: sys.monitoring tabanlı profil zaten tüm thread'leri kapsıyor
+            yield
+            return
+        with self._lock:
+            self.profilers.append(profiler)
+        try:
+            yield
+        finally:
+            profiler.disable()
+
+    def record_stage(self, stage, seconds, ok):
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self.stage_memory.append({
+                "stage": stage,
+                "seconds": round(seconds, 4),
+                "ok": ok,
+                "current_kb": round(current / 1024, 1),
+                "peak_kb": round(peak / 1024, 1),
+            })
+
+    def _stats(self, stream):
+        stats = None
+        for profiler in self.profilers:
+            if stats is None:
+                stats = pstats.Stats(profiler, stream=stream)
+            else:
+                stats.add(profiler)
+        return stats
+
+    def save(self, base_path):
+        """Profili ve en çok bellek ayıran satırları rapor dosyasının yanına kaydeder"""
+        prof_path = f"{base_path}_profile.prof"
+        text_path = f"{base_path}_profile.txt"
+
+        stream = io.StringIO()
+        stats = self._stats(stream)
+        if stats is not None:
+            stats.dump_stats(prof_path)
+            stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        else:
+            prof_path = None
+
+        top_allocations = []
+        if self.snapshot is not None:
+            snapshot = self.snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+                frame = stat.traceback[0]
+                top_allocations.append({
+                    "location": f"{frame.filename}:{frame.lineno}",
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count": stat.count,
+                })
+
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write("# Aşama bazında bellek kullanımı\n")
+            for item in self.stage_memory:
+                f.write(f"{item['stage']:<20} {item['seconds']:>8.3f} s  "
+                        f"current={item['current_kb']} KB  peak={item['peak_kb']} KB\n")
+            f.write("\n# En çok bellek ayıran satırlar\n")
+            for item in top_allocations:
+                f.write(f"{item['size_kb']:>10} KB  {item['count']:>7}  {item['location']}\n")
+            f.write("\n# CPU profili (kümülatif süre)\n")
+            f.write(stream.getvalue())
+
+        return {
+            "profile_file": prof_path,
+            "summary_file": text_path,
+            "stage_memory": self.stage_memory,
+            "top_allocations": top_allocations[:10],
+        }
+
+
+def current_session():
+    """Aktif profil oturumunu döndürür (yoksa None)"""
+    return _current_session.get()
+
+
+def _on_span(stage, seconds, ok):
+    session = _current_session.get()
+    if session is not None:
+        session.record_stage(stage, seconds, ok)
+
+
+metrics.add_span_listener(_on_span)
+
+
+@contextmanager
+def profile_run(enabled=True):
+    """
+    Blok içindeki analizi cProfile ve tracemalloc ile profiller.
+    enabled False ise hiçbir ek maliyet getirmez ve None döndürür.
+    """
+    if not enabled:
+        yield None
+        return
+
+    session = ProfileSession()
+    token = _current_session.set(session)
+    _start_tracing()
+    try:
+        with session.profile_thread():
+            yield session
+    finally:
+        session.snapshot = _stop_tracing()
+        _current_session.reset(token)
+
+
+def _start_tracing():
+    global _tracing_sessions, _owns_tracing
+    with _tracing_lock:
+        # tracemalloc dışarıda (ör. -X tracemalloc) başlatıldıysa durdurmak bize düşmez
+        if _tracing_sessions == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            _owns_tracing = True
+        _tracing_sessions += 1
+
+
+def _stop_tracing():
+    """Oturumun bellek görüntüsünü alır; tracemalloc'u yalnızca son aktif oturum durdurur"""
+    global _tracing_sessions, _owns_tracing
+    with _tracing_lock:
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        _tracing_sessions -= 1
+        if _tracing_sessions == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+    return snapshot
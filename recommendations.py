@@ -0,0 +1,510 @@
+import os
+import re
+import sqlite3
+
+import serp_store
+
+# Gemini ne zaman çağrılır: auto (yalnızca premium veya olağan dışı durumlar), always, never
+LLM_MODE_ENV = "SEO_LLM_MODE"
+DEFAULT_LLM_MODE = "auto"
+
+SEVERITY_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+SEVERITY_LABELS = {"high": "🔴 Yüksek", "medium": "🟠 Orta", "low": "🟡 Düşük"}
+# Bulgu başına SEO skorundan düşülen puan
+SEVERITY_PENALTIES = {"high": 15, "medium": 7, "low": 3}
+# Aynı önem derecesinde hangi alanın önce ele alınacağı
+CATEGORY_WEIGHTS = {"indexing": 1.5, "serp": 1.3, "keyword": 1.2, "performance": 1.1, "onpage": 1.0, "competitors": 0.9}
+
+# Core Web Vitals / Lighthouse eşikleri: (iyi üst sınırı, kötü alt sınırı)
+VITALS = {
+    "largest_contentful_paint": ("LCP", 2.5, 4.0, "s"),
+    "first_contentful_paint": ("FCP", 1.8, 3.0, "s"),
+    "speed_index": ("Speed Index", 3.4, 5.8, "s"),
+    "total_blocking_time": ("TBT", 200, 600, "ms"),
+    "cumulative_layout_shift": ("CLS", 0.1, 0.25, ""),
+}
+VITAL_ACTIONS = {
+    "largest_contentful_paint": "En büyük görseli/başlığı önceden yükleyin (preload), sunucu yanıt süresini ve görsel boyutlarını küçültün.",
+    "first_contentful_paint": "Render'ı engelleyen CSS/JS'i azaltın, kritik CSS'i satır içine alın.",
+    "speed_index": "Ekranın üst kısmındaki içeriği öne alın, gereksiz JavaScript'i erteleyin.",
+    "total_blocking_time": "Uzun JavaScript görevlerini bölün, üçüncü parti betikleri erteleyin (defer/async).",
+    "cumulative_layout_shift": "Görsel ve reklam alanlarına sabit boyut verin, web fontlarında font-display kullanın.",
+}
+
+# Sıralama bu kadar değiştiyse kurallar açıklamakta zorlanır, LLM yorumu istenir
+RANK_SHIFT_UNUSUAL = 5
+
+_NUMBER_RE = re.compile(r"[\d.,]+")
+
+
+def llm_mode():
+    mode = os.getenv(LLM_MODE_ENV, DEFAULT_LLM_MODE).strip().lower()
+    return mode if mode in ("auto", "always", "never") else DEFAULT_LLM_MODE
+
+
+def _usable(data):
+    return isinstance(data, dict) and "error" not in data
+
+
+def _parse_display_value(value, unit):
+    """'2.5 s', '1,230 ms', '0.01' gibi Lighthouse değerlerini eşik birimine (s/ms) çevirir"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    # Lighthouse değer ile birim arasında bölünmez boşluk kullanır
+    text = str(value).replace("\u00a0", " ").strip().lower()
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None
+    try:
+        number = float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+    if unit == "s" and text.endswith("ms"):
+        return number / 1000
+    if unit == "ms" and text.endswith(" s"):
+        return number * 1000
+    return number
+
+
+def _finding(id, category, severity, title, detail, action):
+    return {
+        "id": id,
+        "category": category,
+        "severity": severity,
+        "priority": round(SEVERITY_WEIGHTS[severity] * CATEGORY_WEIGHTS.get(category, 1.0), 2),
+        "title": title,
+        "detail": detail,
+        "action": action,
+    }
+
+
+# --- kurallar -----------------------------------------------------------------
+
+def _performance_rules(ctx):
+    findings, strengths = [], []
+    pagespeed = ctx["pagespeed"]
+    if _usable(pagespeed):
+        score = pagespeed.get("performance_score")
+        if score is not None:
+            if score < 0.5:
+                findings.append(_finding(
+                    "performance_score", "performance", "high", "Performans skoru düşük",
+                    f"PageSpeed performans skoru {score * 100:.0f}/100.",
+                    "Aşağıdaki Core Web Vitals bulgularından başlayarak sayfa hızını iyileştirin.",
+                ))
+            elif score < 0.9:
+                findings.append(_finding(
+                    "performance_score", "performance", "medium", "Performans skoru geliştirilebilir",
+                    f"PageSpeed performans skoru {score * 100:.0f}/100 (hedef 90+).",
+                    "En kötü Core Web Vitals metriğine odaklanın.",
+                ))
+            else:
+                strengths.append(f"PageSpeed performans skoru {score * 100:.0f}/100")
+
+        for key, (name, good, poor, unit) in VITALS.items():
+            value = _parse_display_value(pagespeed.get(key), unit)
+            if value is None or value <= good:
+                continue
+            severity = "high" if value > poor else "medium"
+            findings.append(_finding(
+                key, "performance", severity, f"{name} yavaş",
+                f"{name} {pagespeed.get(key)} (iyi: ≤ {good}{unit and ' ' + unit}).",
+                VITAL_ACTIONS[key],
+            ))
+        return findings, strengths
+
+    # PageSpeed yoksa yerel sayfa ağırlığı tahmini kullanılır
+    weight = ctx["page_weight"]
+    if _usable(weight):
+        total_kb = (weight.get("total_bytes") or 0) / 1024
+        if total_kb > 3000:
+            severity = "high"
+        elif total_kb > 1600:
+            severity = "medium"
+        else:
+            severity = None
+        if severity:
+            findings.append(_finding(
+                "page_weight", "performance", severity, "Sayfa ağırlığı yüksek",
+                f"Tahmini toplam boyut {total_kb:.0f} KB, {weight.get('request_count')} istek.",
+                "Büyük görselleri sıkıştırın (WebP/AVIF), kullanılmayan JS/CSS'i kaldırın.",
+            ))
+        blocking = weight.get("render_blocking_count") or 0
+        if blocking >= 3:
+            findings.append(_finding(
+                "render_blocking", "performance", "medium", "Render'ı engelleyen kaynaklar",
+                f"{blocking} CSS/JS kaynağı ilk çizimi engelliyor.",
+                "Betiklere defer/async ekleyin, kritik olmayan CSS'i ertelenmiş yükleyin.",
+            ))
+    return findings, strengths
+
+
+def _serp_rules(ctx):
+    findings, strengths = [], []
+    serp = ctx["serp"]
+    if not _usable(serp):
+        return findings, strengths
+    rank = serp.get("rank")
+    if rank is None:
+        findings.append(_finding(
+            "not_ranking", "serp", "high", "İlk sayfada değil",
+            f"'{ctx['keyword']}' için {ctx['domain']} ilk 10 sonuçta bulunamadı.",
+            "Sayfayı anahtar kelimeye göre optimize edin ve ilgili iç linkler ekleyin.",
+        ))
+    elif rank > 3:
+        findings.append(_finding(
+            "rank_improvable", "serp", "medium", "İlk 3'e yakın",
+            f"Sıralama {rank}. sırada; ilk 3 sonuç tıklamaların çoğunu alır.",
+            "Başlık/meta açıklamayı tıklama oranı için iyileştirin, içeriği rakiplere göre derinleştirin.",
+        ))
+    else:
+        strengths.append(f"'{ctx['keyword']}' için {rank}. sırada")
+    return findings, strengths
+
+
+def _keyword_rules(ctx):
+    findings, strengths = [], []
+    data = ctx["keyword_data"]
+    if not _usable(data):
+        return findings, strengths
+    keyword = ctx["keyword"]
+
+    if data.get("in_title") is False:
+        findings.append(_finding(
+            "keyword_title", "keyword", "high", "Anahtar kelime başlıkta yok",
+            f"'{keyword}' title etiketinde geçmiyor.",
+            "Anahtar kelimeyi başlığın başına yakın bir yerde kullanın.",
+        ))
+    elif data.get("in_title"):
+        strengths.append("Anahtar kelime başlıkta")
+    if data.get("in_meta_description") is False:
+        findings.append(_finding(
+            "keyword_meta", "keyword", "medium", "Anahtar kelime meta açıklamada yok",
+            f"'{keyword}' meta açıklamada geçmiyor.",
+            "Anahtar kelimeyi içeren 120-160 karakterlik bir meta açıklama yazın.",
+        ))
+
+    presence = data.get("keyword_presence") or {}
+    if presence.get("h1") is False:
+        findings.append(_finding(
+            "keyword_h1", "keyword", "medium", "Anahtar kelime H1'de yok",
+            "Ana başlık (H1) anahtar kelimeyi içermiyor.",
+            "H1'i anahtar kelimeyi doğal şekilde içerecek biçimde yeniden yazın.",
+        ))
+    if presence.get("first_100_words") is False:
+        findings.append(_finding(
+            "keyword_intro", "keyword", "low", "Anahtar kelime girişte yok",
+            "İlk 100 kelimede anahtar kelime geçmiyor.",
+            "Giriş paragrafında anahtar kelimeyi kullanın.",
+        ))
+
+    total_words = data.get("total_words") or 0
+    density = data.get("keyword_density_percent") or 0
+    if total_words and total_words < 300:
+        findings.append(_finding(
+            "thin_content", "keyword", "medium", "İçerik kısa",
+            f"Sayfada {total_words} kelime var.",
+            "Konuyu kapsamlı işleyen en az 300-600 kelimelik özgün içerik ekleyin.",
+        ))
+    if total_words and density < 0.5:
+        findings.append(_finding(
+            "density_low", "keyword", "medium", "Anahtar kelime yoğunluğu düşük",
+            f"Yoğunluk %{density} ({data.get('keyword_count', 0)} kez).",
+            "Anahtar kelimeyi ve çekimli biçimlerini ara başlıklarda ve metinde doğal şekilde kullanın.",
+        ))
+    elif density > 3:
+        findings.append(_finding(
+            "density_high", "keyword", "medium", "Aşırı anahtar kelime kullanımı",
+            f"Yoğunluk %{density}; arama motorları bunu spam olarak değerlendirebilir.",
+            "Tekrarları azaltın, eş anlamlı ve ilgili ifadeler kullanın.",
+        ))
+
+    readability = data.get("readability_score")
+    if isinstance(readability, (int, float)) and readability < 30:
+        findings.append(_finding(
+            "readability", "keyword", "low", "Okunabilirlik düşük",
+            f"Okunabilirlik skoru {readability:.0f}.",
+            "Cümleleri kısaltın, paragrafları bölün ve listeler kullanın.",
+        ))
+    return findings, strengths
+
+
+def _onpage_rules(ctx):
+    findings, strengths = [], []
+    data = ctx["keyword_data"]
+    on_page = data.get("on_page") if _usable(data) else None
+    if not on_page:
+        return findings, strengths
+
+    robots = (on_page.get("robots") or "").lower()
+    if "noindex" in robots:
+        findings.append(_finding(
+            "noindex", "indexing", "high", "Sayfa dizine eklenmeyi engelliyor",
+            f"robots meta etiketi: '{robots}'.",
+            "Sayfanın aranabilir olması gerekiyorsa noindex'i kaldırın.",
+        ))
+
+    title_length = on_page.get("title_length") or 0
+    if not title_length:
+        findings.append(_finding(
+            "title_missing", "onpage", "high", "Başlık etiketi yok",
+            "Sayfanın title etiketi boş.",
+            "50-60 karakterlik, anahtar kelimeyi içeren bir başlık ekleyin.",
+        ))
+    elif title_length < 30 or title_length > 60:
+        findings.append(_finding(
+            "title_length", "onpage", "low", "Başlık uzunluğu ideal değil",
+            f"Başlık {title_length} karakter (ideal 30-60).",
+            "Başlığı arama sonuçlarında kesilmeyecek uzunluğa getirin.",
+        ))
+
+    meta_length = on_page.get("meta_description_length") or 0
+    if not meta_length:
+        findings.append(_finding(
+            "meta_missing", "onpage", "medium", "Meta açıklama yok",
+            "Sayfada meta description bulunmuyor.",
+            "120-160 karakterlik, anahtar kelimeyi içeren bir meta açıklama ekleyin.",
+        ))
+    elif meta_length < 70 or meta_length > 160:
+        findings.append(_finding(
+            "meta_length", "onpage", "low", "Meta açıklama uzunluğu ideal değil",
+            f"Meta açıklama {meta_length} karakter (ideal 70-160).",
+            "Açıklamayı arama sonuçlarında tam görünecek uzunluğa getirin.",
+        ))
+
+    h1_count = (on_page.get("heading_counts") or {}).get("h1", 0)
+    if h1_count == 0:
+        findings.append(_finding(
+            "h1_missing", "onpage", "medium", "H1 başlığı yok",
+            "Sayfada H1 etiketi bulunmuyor.",
+            "Sayfanın konusunu anlatan tek bir H1 ekleyin.",
+        ))
+    elif h1_count > 1:
+        findings.append(_finding(
+            "h1_multiple", "onpage", "low", "Birden fazla H1",
+            f"Sayfada {h1_count} H1 etiketi var.",
+            "Tek bir H1 kullanıp diğerlerini H2'ye dönüştürün.",
+        ))
+
+    missing_alt = on_page.get("images_missing_alt") or 0
+    if missing_alt:
+        findings.append(_finding(
+            "image_alt", "onpage", "low", "Alt metni olmayan görseller",
+            f"{missing_alt}/{on_page.get('image_count')} görselde alt metni yok.",
+            "Görsellere içeriği anlatan alt metinleri ekleyin.",
+        ))
+    if not on_page.get("canonical"):
+        findings.append(_finding(
+            "canonical_missing", "onpage", "low", "Canonical etiketi yok",
+            "Sayfada rel=canonical bulunmuyor.",
+            "Kopya içerik sorunlarını önlemek için kendi URL'sini gösteren canonical ekleyin.",
+        ))
+    return findings, strengths
+
+
+def _link_rules(ctx):
+    findings, strengths = [], []
+    links = ctx["links"]
+    if not _usable(links) or not links.get("checked"):
+        return findings, strengths
+    broken = links.get("broken") or []
+    internal = [entry for entry in broken if entry.get("internal")]
+    external = [entry for entry in broken if not entry.get("internal")]
+    if internal:
+        findings.append(_finding(
+            "broken_internal_links", "onpage", "high", "Kırık iç linkler",
+            f"{len(internal)} site içi link çalışmıyor (ör. {internal[0]['url']}).",
+            "Kırık iç linkleri düzeltin veya 301 ile doğru sayfaya yönlendirin.",
+        ))
+    if external:
+        findings.append(_finding(
+            "broken_external_links", "onpage", "medium", "Kırık dış linkler",
+            f"{len(external)} dış link çalışmıyor (ör. {external[0]['url']}).",
+            "Kırık dış linkleri güncelleyin veya kaldırın.",
+        ))
+    if not broken:
+        strengths.append(f"Kontrol edilen {links['checked']} linkin tamamı çalışıyor")
+    return findings, strengths
+
+
+def _image_rules(ctx):
+    findings, strengths = [], []
+    images = ctx["images"]
+    if not _usable(images) or not images.get("checked"):
+        return findings, strengths
+    oversized = images.get("oversized") or []
+    if oversized:
+        wasted_kb = (images.get("oversized_wasted_bytes") or 0) / 1024
+        worst = oversized[0]
+        findings.append(_finding(
+            "image_oversized", "performance", "high" if wasted_kb >= 500 else "medium", "Gereğinden büyük görseller",
+            f"{images['oversized_count']} görsel gösterildiği alandan çok büyük (ör. {worst['intrinsic']} → {worst['slot']}), "
+            f"~{wasted_kb:.0f} KB boşa indiriliyor.",
+            "Görselleri gösterim boyutuna (en fazla 2x) küçültün ve srcset/sizes ile farklı boyutlar sunun.",
+        ))
+    large = images.get("large_count") or 0
+    if large:
+        findings.append(_finding(
+            "image_large", "performance", "medium", "Ağır görseller",
+            f"{large} görsel 200 KB'tan büyük (en büyüğü {images['large'][0]['bytes'] / 1024:.0f} KB).",
+            "Görselleri sıkıştırın; ekranın altındakilere loading=\"lazy\" ekleyin.",
+        ))
+    legacy = images.get("legacy_format_count") or 0
+    if legacy:
+        findings.append(_finding(
+            "image_legacy_format", "performance", "low", "Eski görsel biçimleri",
+            f"{legacy} büyük JPEG/PNG/GIF görsel ({(images.get('legacy_format_bytes') or 0) / 1024:.0f} KB).",
+            "Görselleri WebP veya AVIF olarak sunun.",
+        ))
+    missing = images.get("missing_dimensions_count") or 0
+    if missing:
+        findings.append(_finding(
+            "image_dimensions", "performance", "low", "Boyutu belirtilmemiş görseller",
+            f"{missing} görselde width/height özniteliği yok.",
+            "Düzen kaymasını (CLS) önlemek için görsellere width ve height verin.",
+        ))
+    mismatched = images.get("srcset_mismatch") or []
+    if mismatched:
+        findings.append(_finding(
+            "image_srcset_mismatch", "performance", "low", "Hatalı srcset genişlikleri",
+            f"{len(mismatched)} srcset adayının gerçek genişliği tanımından farklı "
+            f"(ör. {mismatched[0]['descriptor']} → {mismatched[0]['width']}px).",
+            "srcset'teki w değerlerini dosyaların gerçek genişliğiyle eşleştirin.",
+        ))
+    if not oversized and not large:
+        strengths.append(f"Denetlenen {images['checked']} görselin boyutları gösterim alanına uygun")
+    return findings, strengths
+
+
+def _competitor_rules(ctx):
+    findings, strengths = [], []
+    comparison = ctx["competitors"]
+    if not _usable(comparison) or not comparison.get("own"):
+        return findings, strengths
+    own, average = comparison["own"], comparison.get("average") or {}
+
+    own_words, avg_words = own.get("total_words"), average.get("total_words")
+    if own_words and avg_words and own_words < 0.6 * avg_words:
+        findings.append(_finding(
+            "competitor_length", "competitors", "medium", "İçerik rakiplerden kısa",
+            f"Sayfanızda {own_words} kelime, rakip ortalaması {avg_words:.0f}.",
+            "Rakiplerin işlediği alt konuları ekleyerek içeriği genişletin.",
+        ))
+    own_score, avg_score = own.get("on_page_score"), average.get("on_page_score")
+    if own_score is not None and avg_score and own_score < avg_score - 15:
+        findings.append(_finding(
+            "competitor_onpage", "competitors", "medium", "On-page skoru rakiplerin gerisinde",
+            f"On-page skorunuz {own_score}, rakip ortalaması {avg_score:.0f}.",
+            "Rakiplerin başlık, H1 ve meta açıklama kullanımını inceleyin.",
+        ))
+    return findings, strengths
+
+
+RULES = [_performance_rules, _serp_rules, _keyword_rules, _onpage_rules, _link_rules, _image_rules, _competitor_rules]
+
+
+# --- olağan dışı durumlar ----------------------------------------------------
+
+def _rank_shift(keyword, domain):
+    """Saklanan SERP geçmişinde son iki ölçüm arasındaki sıra farkı (ilk sayfa dışı = 11)"""
+    try:
+        history = serp_store.SerpStore().rank_history(keyword, domain)
+    except (sqlite3.Error, OSError):
+        return None
+    if len(history) < 2:
+        return None
+    previous, latest = (entry["rank"] or 11 for entry in history[-2:])
+    return latest - previous
+
+
+def _unusual_reasons(ctx, findings):
+    """Kuralların tek başına yorumlayamadığı durumlar"""
+    reasons = []
+    rank = ctx["serp"].get("rank") if _usable(ctx["serp"]) else None
+    not_ranking = _usable(ctx["serp"]) and rank is None
+    if not_ranking and not any(f["severity"] == "high" and f["category"] != "serp" for f in findings):
+        reasons.append("sıralama sorunu ölçülen metriklerle açıklanamıyor")
+    if rank is not None and any(f["id"] == "noindex" for f in findings):
+        reasons.append("noindex sayfa sıralamada görünüyor")
+    if ctx["keyword"] and ctx["domain"]:
+        shift = _rank_shift(ctx["keyword"], ctx["domain"])
+        if shift is not None and abs(shift) >= RANK_SHIFT_UNUSUAL:
+            reasons.append(f"sıralama son ölçümde {abs(shift)} sıra {'düştü' if shift > 0 else 'yükseldi'}")
+    return reasons
+
+
+def assess(keyword, domain, pagespeed_data=None, serp_data=None, keyword_data=None, page_weight_data=None, competitor_data=None, link_data=None, image_data=None):
+    """
+    Ölçülen metriklerden öncelik sırasına dizilmiş bulgular, güçlü yönler ve 0-100 SEO skoru üretir.
+    Eksik veya hatalı aşamalar atlanır; API çağrısı yapılmaz.
+    """
+    ctx = {
+        "keyword": keyword,
+        "domain": domain,
+        "pagespeed": pagespeed_data,
+        "serp": serp_data,
+        "keyword_data": keyword_data,
+        "page_weight": page_weight_data,
+        "competitors": competitor_data,
+        "links": link_data,
+        "images": image_data,
+    }
+    findings, strengths = [], []
+    for rule in RULES:
+        rule_findings, rule_strengths = rule(ctx)
+        findings += rule_findings
+        strengths += rule_strengths
+    findings.sort(key=lambda f: f["priority"], reverse=True)
+
+    score = max(0, 100 - sum(SEVERITY_PENALTIES[f["severity"]] for f in findings))
+    return {
+        "score": score,
+        "findings": findings,
+        "strengths": strengths,
+        "unusual": _unusual_reasons(ctx, findings),
+    }
+
+
+def llm_reason(assessment, premium=False):
+    """Gemini raporu gerekiyorsa nedenini, kural tabanlı rapor yeterliyse None döndürür"""
+    mode = llm_mode()
+    if mode == "never":
+        return None
+    if mode == "always":
+        return "SEO_LLM_MODE=always"
+    if premium:
+        return "premium rapor"
+    if assessment["unusual"]:
+        return "olağan dışı durum: " + "; ".join(assessment["unusual"])
+    return None
+
+
+def format_findings(assessment):
+    """Bulguları öneri ve eylem planı bölümleri olarak Markdown'a çevirir"""
+    findings = assessment["findings"]
+    text = f"\n## 🎯 İYİLEŞTİRME ÖNERİLERİ\n\n**SEO Skoru**: {assessment['score']}/100\n\n"
+    if not findings:
+        text += "✅ Ölçülen metriklerde sorun bulunmadı.\n"
+    for i, finding in enumerate(findings, start=1):
+        text += (
+            f"{i}. {SEVERITY_LABELS[finding['severity']]} **{finding['title']}**: {finding['detail']}\n"
+            f"   ➜ {finding['action']}\n"
+        )
+    if assessment["strengths"]:
+        text += "\n### ✅ Güçlü Yönler:\n" + "".join(f"- {item}\n" for item in assessment["strengths"])
+
+    text += "\n## 📋 EYLEM PLANI\n"
+    plan = [
+        ("Kısa Vadeli (1-2 Hafta)", "high"),
+        ("Orta Vadeli (1-2 Ay)", "medium"),
+        ("Uzun Vadeli (3-6 Ay)", "low"),
+    ]
+    for title, severity in plan:
+        items = [f for f in findings if f["severity"] == severity]
+        if items:
+            text += f"\n### {title}:\n" + "".join(f"- [ ] {f['action']}\n" for f in items)
+    if not findings:
+        text += "\n- [ ] Sıralama ve performans metriklerini düzenli takip edin\n"
+    return text
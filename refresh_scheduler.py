@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from contextlib import closing
+
+import lighthouse_store
+import resilience
+import serp_store
+
+# Takip edilen öğelerin ve günlük API kullanımının tutulduğu SQLite veritabanı
+SCHEDULE_DB_ENV = "SEO_SCHEDULE_DB"
+DEFAULT_SCHEDULE_DB = "seo_schedule.db"
+
+# Günlük API bütçesi; SEO_DAILY_BUDGET="serpapi=100,pagespeed=200" ile değiştirilebilir
+DAILY_BUDGET_ENV = "SEO_DAILY_BUDGET"
+DEFAULT_DAILY_BUDGET = {"serpapi": 100, "pagespeed": 200}
+
+# Kontrol aralığı sınırları (saat)
+MIN_INTERVAL_HOURS = 6.0
+MAX_INTERVAL_HOURS = 7 * 24.0
+# Oynaklık hesabında kullanılan en fazla geçmiş ölçüm
+HISTORY_WINDOW = 20
+# İlk sayfada bulunamayan sıralama, oynaklık hesabında bu değer sayılır
+NOT_RANKED = 11
+
+KIND_API = {"serp": "serpapi", "pagespeed": "pagespeed"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    keyword TEXT NOT NULL DEFAULT '',
+    domain TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    volatility REAL,
+    interval_hours REAL NOT NULL,
+    next_due REAL NOT NULL,
+    last_checked REAL,
+    UNIQUE (kind, keyword, domain, url)
+);
+CREATE INDEX IF NOT EXISTS idx_items_due ON items (next_due);
+CREATE TABLE IF NOT EXISTS usage (
+    day TEXT NOT NULL,
+    api TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    PRIMARY KEY (day, api)
+);
+"""
+
+
+def default_db_path():
+    return os.getenv(SCHEDULE_DB_ENV, DEFAULT_SCHEDULE_DB)
+
+
+def daily_budget():
+    budget = dict(DEFAULT_DAILY_BUDGET)
+    for item in os.getenv(DAILY_BUDGET_ENV, "").split(","):
+        name, _, value = item.partition("=")
+        try:
+            budget[name.strip()] = int(value)
+        except ValueError:
+            continue
+    return budget
+
+
+def volatility(values):
+    """Ardışık ölçümler arasındaki ortalama mutlak değişim (0 = hiç değişmiyor)"""
+    values = values[-HISTORY_WINDOW:]
+    if len(values) < 2:
+        return None
+    return sum(abs(b - a) for a, b in zip(values, values[1:])) / (len(values) - 1)
+
+
+def interval_for(item_volatility, kind):
+    """
+    Oynaklığa göre kontrol aralığı: hiç değişmeyen öğe MAX_INTERVAL_HOURS'ta,
+    oynak öğeler MIN_INTERVAL_HOURS'a doğru daha sık kontrol edilir.
+    Geçmişi olmayan öğeler veri toplamak için en sık aralıkla başlar.
+    """
+    if item_volatility is None:
+        return MIN_INTERVAL_HOURS
+    # Bir sıra / 5 skor puanı değişim "birim oynaklık" sayılır
+    unit = 1.0 if kind == "serp" else 5.0
+    hours = MAX_INTERVAL_HOURS / (1.0 + 4.0 * item_volatility / unit)
+    return max(MIN_INTERVAL_HOURS, min(MAX_INTERVAL_HOURS, hours))
+
+
+def call_key(item):
+    """Aynı API çağrısıyla yenilenen öğeler aynı anahtarı paylaşır: SERP'te anahtar kelime başına tek çağrı"""
+    if item["kind"] == "serp":
+        return "serp", serp_store.keyword_key(item["keyword"])
+    return "pagespeed", item["url"]
+
+
+class RefreshScheduler:
+    """
+    SERP ve PageSpeed kontrollerini öğe başına oynaklığa göre planlar.
+    Sabit öğeler seyrek, sıralaması/skoru oynayan öğeler sık kontrol edilir ve
+    toplam plan günlük API bütçesine sığdırılır.
+    """
+
+    def __init__(self, path=None, budget=None):
+        self.path = path or default_db_path()
+        self.budget = budget or daily_budget()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return closing(conn)
+
+    def add_serp(self, keyword, domain):
+        """keyword × domain sıralamasını takibe alır"""
+        return self._add("serp", keyword=keyword, domain=domain)
+
+    def add_pagespeed(self, url):
+        """URL'nin PageSpeed skorunu takibe alır"""
+        return self._add("pagespeed", url=url)
+
+    def _add(self, kind, keyword="", domain="", url=""):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO items (kind, keyword, domain, url, interval_hours, next_due) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, keyword, domain, url, MIN_INTERVAL_HOURS, time.time()),
+            )
+            row = conn.execute(
+                "SELECT id FROM items WHERE kind = ? AND keyword = ? AND domain = ? AND url = ?",
+                (kind, keyword, domain, url),
+            ).fetchone()
+        return row["id"]
+
+    def items(self):
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute("SELECT * FROM items ORDER BY id")]
+
+    # --- geçmişten oynaklık -----------------------------------------------
+
+    def _history(self, items):
+        """Her öğenin saklanan ölçüm dizisi (SERP arşivi ve Lighthouse indeksi bir kez okunur)"""
+        scores = {}
+        if any(item["kind"] == "pagespeed" for item in items):
+            for run in lighthouse_store.iter_runs():
+                score = run.meta.get("performance_score")
+                if score is not None:
+                    scores.setdefault(run.meta.get("url"), []).append(score * 100)
+
+        store = serp_store.SerpStore() if any(item["kind"] == "serp" for item in items) else None
+        history = {}
+        for item in items:
+            if item["kind"] == "serp":
+                ranks = store.rank_history(item["keyword"], item["domain"])
+                history[item["id"]] = [r["rank"] if r["rank"] is not None else NOT_RANKED for r in ranks]
+            else:
+                history[item["id"]] = scores.get(item["url"], [])
+        return history
+
+    def refresh_intervals(self):
+        """
+        Oynaklıkları geçmişten yeniden hesaplar ve aralıkları günceller. Beklenen günlük
+        çağrı sayısı bütçeyi aşarsa API'nin tüm aralıkları aynı oranda uzatılır. Aynı
+        anahtar kelimenin domain'leri tek çağrıyla yenilendiğinden en sık aralıkları sayılır.
+        """
+        items = self.items()
+        history = self._history(items)
+        for item in items:
+            item["volatility"] = volatility(history[item["id"]])
+            item["interval_hours"] = interval_for(item["volatility"], item["kind"])
+
+        for kind, api in KIND_API.items():
+            group = [item for item in items if item["kind"] == kind]
+            shortest = {}
+            for item in group:
+                key = call_key(item)
+                shortest[key] = min(shortest.get(key, item["interval_hours"]), item["interval_hours"])
+            expected = sum(24.0 / hours for hours in shortest.values())
+            budget = self.budget.get(api)
+            if budget and expected > budget:
+                factor = expected / budget
+                for item in group:
+                    item["interval_hours"] *= factor
+
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE items SET volatility = ?, interval_hours = ?, "
+                "next_due = COALESCE(last_checked + ? * 3600, next_due) WHERE id = ?",
+                [(item["volatility"], item["interval_hours"], item["interval_hours"], item["id"]) for item in items],
+            )
+        return items
+
+    # --- plan ve çalıştırma -----------------------------------------------
+
+    def used_today(self, api):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT calls FROM usage WHERE day = ? AND api = ?", (datetime.now().date().isoformat(), api)
+            ).fetchone()
+        return row["calls"] if row else 0
+
+    def _record_call(self, api):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO usage (day, api, calls) VALUES (?, ?, 1) "
+                "ON CONFLICT (day, api) DO UPDATE SET calls = calls + 1",
+                (datetime.now().date().isoformat(), api),
+            )
+
+    def plan(self, now=None):
+        """
+        Vadesi gelen öğeleri öncelik sırasıyla (gecikme oranı × oynaklık) ve
+        bugünkü kalan bütçeye sığacak kadar döndürür. Bütçeden çağrı başına düşülür;
+        aynı anahtar kelimenin diğer domain'leri ek çağrı harcamaz.
+        """
+        now = now or time.time()
+        with self._connect() as conn:
+            due = [dict(row) for row in conn.execute("SELECT * FROM items WHERE next_due <= ?", (now,))]
+
+        def priority(item):
+            overdue = (now - item["next_due"]) / (item["interval_hours"] * 3600) + 1.0
+            return overdue * (1.0 + (item["volatility"] if item["volatility"] is not None else 1.0))
+
+        remaining = {api: self.budget.get(api, 0) - self.used_today(api) for api in KIND_API.values()}
+        planned, charged = [], set()
+        for item in sorted(due, key=priority, reverse=True):
+            api = KIND_API[item["kind"]]
+            key = call_key(item)
+            if key not in charged:
+                if remaining[api] <= 0:
+                    continue
+                remaining[api] -= 1
+                charged.add(key)
+            planned.append(item)
+        return planned
+
+    def _fetch(self, kind, items):
+        """
+        Bir çağrı grubunu çalıştırır; (öğe başına sonuçlar, istek gönderildi mi) döndürür.
+        Önbellekteki sonuç yeni ölçüm sayılmaz; her çağrı API'ye gider.
+        """
+        from pagespeed_tool import get_pagespeed_metrics
+        from serpapi_tool import get_serp_ranks
+
+        if kind == "serp":
+            serp = get_serp_ranks(items[0]["keyword"], [item["domain"] for item in items], fresh=True)
+            if "error" in serp:
+                return [serp] * len(items), serp.get("request_sent", True)
+            return [
+                {
+                    "keyword": serp["keyword"],
+                    "domain": item["domain"],
+                    "rank": serp["ranks"].get(item["domain"].strip()),
+                    "snapshot_id": serp["snapshot_id"],
+                }
+                for item in items
+            ], True
+
+        try:
+            return [get_pagespeed_metrics(items[0]["url"], fresh=True)], True
+        except Exception as e:
+            return [{"error": str(e)}], not isinstance(e, resilience.REQUEST_NOT_SENT_ERRORS)
+
+    def run_due(self, now=None):
+        """
+        Plandaki kontrolleri çalıştırır; aynı anahtar kelimenin domain'leri tek SERP çağrısıyla
+        yenilenir. Bir sonraki vade öğenin aralığına göre ayarlanır. İstek hiç gönderilemediyse
+        (devre kesici açık, süre bütçesi dolmuş) bütçeden düşülmez ve vade ertelenmez.
+        """
+        groups = {}
+        for item in self.plan(now):
+            groups.setdefault(call_key(item), []).append(item)
+
+        results, measured = [], False
+        for (kind, _), items in groups.items():
+            item_results, sent = self._fetch(kind, items)
+            if sent:
+                self._record_call(KIND_API[kind])
+                measured = True
+                checked_at = time.time()
+                with self._connect() as conn:
+                    conn.executemany(
+                        "UPDATE items SET last_checked = ?, next_due = ? WHERE id = ?",
+                        [(checked_at, checked_at + item["interval_hours"] * 3600, item["id"]) for item in items],
+                    )
+            for item, result in zip(items, item_results):
+                results.append({"id": item["id"], "kind": kind, "result": result, "sent": sent})
+
+        # Yeni ölçümlerle oynaklıkları ve aralıkları güncelle
+        if measured:
+            self.refresh_intervals()
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Oynaklığa göre SERP/PageSpeed yenileme planlayıcısı")
+    parser.add_argument("--db", default=default_db_path())
+    sub = parser.add_subparsers(dest="command", required=True)
+    add_serp = sub.add_parser("add-serp", help="keyword × domain takibe al")
+    add_serp.add_argument("keyword")
+    add_serp.add_argument("domain")
+    add_pagespeed = sub.add_parser("add-pagespeed", help="URL PageSpeed takibe al")
+    add_pagespeed.add_argument("url")
+    sub.add_parser("plan", help="Bugün çalışacak kontrolleri göster")
+    sub.add_parser("run", help="Vadesi gelen kontrolleri çalıştır")
+    args = parser.parse_args()
+
+    scheduler = RefreshScheduler(args.db)
+    if args.command == "add-serp":
+        output = {"id": scheduler.add_serp(args.keyword, args.domain)}
+    elif args.command == "add-pagespeed":
+        output = {"id": scheduler.add_pagespeed(args.url)}
+    elif args.command == "plan":
+        scheduler.refresh_intervals()
+        output = {
+            "budget": scheduler.budget,
+            "used_today": {api: scheduler.used_today(api) for api in KIND_API.values()},
+            "planned": scheduler.plan(),
+        }
+    else:
+        output = scheduler.run_due()
+    sys.stdout.write(json.dumps(output, ensure_ascii=False, indent=2, default=str) + "\n")
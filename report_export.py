@@ -0,0 +1,269 @@
+import os
+import sys
+import csv
+import glob
+import json
+import argparse
+
+import lighthouse_store
+from keyword_matcher import turkish_casefold
+from serp_store import host_of
+
+# Parquet çıktısı için opsiyonel bağımlılık
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+REPORT_PATTERN = "seo_report_*.json"
+FORMATS = ("csv", "jsonl", "parquet")
+# Parquet'te bellekte biriktirilen en fazla satır (bir row group)
+BATCH_SIZE = 1000
+
+# Dışa aktarılan sütunlar ve türleri; sıra çıktıdaki sütun sırasıdır
+COLUMNS = [
+    ("timestamp", "string"),
+    ("url", "string"),
+    ("keyword", "string"),
+    ("domain", "string"),
+    ("performance_score", "double"),
+    ("first_contentful_paint", "string"),
+    ("speed_index", "string"),
+    ("largest_contentful_paint", "string"),
+    ("total_blocking_time", "string"),
+    ("cumulative_layout_shift", "string"),
+    ("lcp_ms", "double"),
+    ("fcp_ms", "double"),
+    ("tbt_ms", "double"),
+    ("cls", "double"),
+    ("lighthouse_run_id", "string"),
+    ("rank", "int64"),
+    ("serp_snapshot_id", "int64"),
+    ("keyword_count", "int64"),
+    ("total_words", "int64"),
+    ("keyword_density_percent", "double"),
+    ("in_title", "bool"),
+    ("in_meta_description", "bool"),
+    ("readability_score", "double"),
+    ("on_page_score", "double"),
+    ("page_total_bytes", "int64"),
+    ("page_request_count", "int64"),
+    ("render_blocking_count", "int64"),
+    ("competitor_avg_density", "double"),
+    ("competitor_avg_readability", "double"),
+    ("total_seconds", "double"),
+    ("failed_stages", "string"),
+    ("source_file", "string"),
+]
+FIELDS = [name for name, _ in COLUMNS]
+
+# Lighthouse arşivinden okunacak sayısal değerler
+LIGHTHOUSE_NUMERIC = {
+    "lcp_ms": "audit:largest-contentful-paint",
+    "fcp_ms": "audit:first-contentful-paint",
+    "tbt_ms": "audit:total-blocking-time",
+    "cls": "audit:cumulative-layout-shift",
+}
+
+
+def _date_key(value):
+    """'YYYY-MM-DD' ya da 'YYYYmmdd_HHMMSS' değerini rapor zaman damgası biçimine çevirir"""
+    if not value:
+        return None
+    return value.replace("-", "").replace(":", "").replace("T", "_").replace(" ", "_")
+
+
+def iter_report_files(directory=".", since=None, until=None):
+    """Tarih filtresine uyan rapor dosyalarını (dosya adındaki zaman damgasıyla, açmadan) sırayla üretir"""
+    since, until = _date_key(since), _date_key(until)
+    for path in sorted(glob.glob(os.path.join(directory, REPORT_PATTERN))):
+        timestamp = os.path.basename(path)[len("seo_report_"):-len(".json")]
+        if since and timestamp < since:
+            continue
+        # Yalnızca gün verilmişse o günün tamamı dahil
+        if until and timestamp[:len(until)] > until:
+            continue
+        yield path
+
+
+def _stage(data, name):
+    value = (data or {}).get(name)
+    return value if isinstance(value, dict) else {}
+
+
+def flatten_report(report, lighthouse=False):
+    """Bir rapordaki aşama verilerini tek satırlık düz metriklere çevirir (markdown metni hariç)"""
+    data = report.get("data") or {}
+    pagespeed = _stage(data, "pagespeed")
+    serp = _stage(data, "serp")
+    keyword = _stage(data, "keyword_analysis")
+    page_weight = _stage(data, "page_weight")
+    competitors = _stage(data, "competitors")
+    average = competitors.get("average") or {}
+
+    row = {
+        "timestamp": report.get("timestamp"),
+        "url": report.get("url"),
+        "keyword": report.get("keyword"),
+        "domain": report.get("domain"),
+        "performance_score": pagespeed.get("performance_score"),
+        "first_contentful_paint": pagespeed.get("first_contentful_paint"),
+        "speed_index": pagespeed.get("speed_index"),
+        "largest_contentful_paint": pagespeed.get("largest_contentful_paint"),
+        "total_blocking_time": pagespeed.get("total_blocking_time"),
+        "cumulative_layout_shift": pagespeed.get("cumulative_layout_shift"),
+        "lighthouse_run_id": pagespeed.get("lighthouse_run_id"),
+        "rank": serp.get("rank"),
+        "serp_snapshot_id": serp.get("snapshot_id"),
+        "keyword_count": keyword.get("keyword_count"),
+        "total_words": keyword.get("total_words"),
+        "keyword_density_percent": keyword.get("keyword_density_percent"),
+        "in_title": keyword.get("in_title"),
+        "in_meta_description": keyword.get("in_meta_description"),
+        "readability_score": keyword.get("readability_score"),
+        "on_page_score": keyword.get("on_page_score"),
+        "page_total_bytes": page_weight.get("total_bytes"),
+        "page_request_count": page_weight.get("request_count"),
+        "render_blocking_count": page_weight.get("render_blocking_count"),
+        "competitor_avg_density": average.get("keyword_density_percent"),
+        "competitor_avg_readability": average.get("readability_score"),
+        "total_seconds": (report.get("metrics") or {}).get("total_seconds"),
+        "failed_stages": ",".join(sorted(name for name, value in data.items() if isinstance(value, dict) and "error" in value)),
+    }
+
+    # Ham Lighthouse sonucundan sayısal değerler (istenirse; dosya okunduktan hemen sonra bırakılır)
+    if lighthouse and row["lighthouse_run_id"]:
+        run = lighthouse_store.load_run(row["lighthouse_run_id"])
+        try:
+            for field, metric in LIGHTHOUSE_NUMERIC.items():
+                row[field] = run.value(metric)
+        except (OSError, ValueError):
+            pass
+        finally:
+            run.release()
+    return row
+
+
+def iter_rows(directory=".", since=None, until=None, domain=None, keyword=None, lighthouse=False):
+    """Filtrelere uyan raporları birer birer okuyup düzleştirilmiş satırlar üretir"""
+    domain_host = host_of(domain) if domain else None
+    keyword_key = " ".join(turkish_casefold(keyword).split()) if keyword else None
+
+    for path in iter_report_files(directory, since, until):
+        try:
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Rapor okunamadı: {path}: {str(e)}", file=sys.stderr)
+            continue
+
+        if domain_host and host_of(report.get("domain") or "") != domain_host:
+            continue
+        if keyword_key and " ".join(turkish_casefold(report.get("keyword") or "").split()) != keyword_key:
+            continue
+
+        row = {field: None for field in FIELDS}
+        row.update(flatten_report(report, lighthouse))
+        row["source_file"] = os.path.basename(path)
+        yield row
+
+
+def _write_csv(rows, output):
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def _write_jsonl(rows, output):
+    count = 0
+    with open(output, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _coerce(value, kind):
+    """Parquet sütun türüne uymayan değerleri (ör. '1.2 s' metni) boş bırakır"""
+    if value is None:
+        return None
+    try:
+        if kind == "double":
+            return float(value)
+        if kind == "int64":
+            return int(value)
+        if kind == "bool":
+            return bool(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _write_parquet(rows, output):
+    if pa is None:
+        raise RuntimeError("Parquet çıktısı için pyarrow kurulu olmalı (pip install pyarrow)")
+
+    types = {"string": pa.string(), "double": pa.float64(), "int64": pa.int64(), "bool": pa.bool_()}
+    schema = pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+    count = 0
+    with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                count += _write_parquet_batch(writer, schema, batch)
+                batch = []
+        if batch:
+            count += _write_parquet_batch(writer, schema, batch)
+    return count
+
+
+def _write_parquet_batch(writer, schema, batch):
+    columns = {name: [_coerce(row.get(name), kind) for row in batch] for name, kind in COLUMNS}
+    writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    return len(batch)
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export_reports(output, fmt=None, directory=".", since=None, until=None, domain=None, keyword=None, lighthouse=False):
+    """
+    Saklanan seo_report_*.json dosyalarını düzleştirilmiş metriklerle CSV, JSONL veya Parquet
+    dosyasına akış halinde yazar; bellekte aynı anda tek rapor (Parquet'te bir row group) tutulur.
+    Yazılan satır sayısını döndürür.
+    """
+    fmt = (fmt or os.path.splitext(output)[1].lstrip(".")).lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Desteklenmeyen format: {fmt} (desteklenenler: {', '.join(FORMATS)})")
+    rows = iter_rows(directory, since, until, domain, keyword, lighthouse)
+    return WRITERS[fmt](rows, output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Saklanan SEO raporlarını toplu dışa aktarma")
+    parser.add_argument("output", help="Çıktı dosyası (.csv, .jsonl veya .parquet)")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Varsayılan: dosya uzantısı")
+    parser.add_argument("--dir", default=".", help="Rapor dosyalarının bulunduğu klasör")
+    parser.add_argument("--since", default=None, help="Başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument("--until", default=None, help="Bitiş tarihi (YYYY-MM-DD, gün dahil)")
+    parser.add_argument("--domain", default=None)
+    parser.add_argument("--keyword", default=None)
+    parser.add_argument("--lighthouse", action="store_true", help="Lighthouse arşivinden sayısal LCP/FCP/TBT/CLS ekle")
+    args = parser.parse_args()
+
+    try:
+        count = export_reports(
+            args.output, args.format, args.dir, args.since, args.until, args.domain, args.keyword, args.lighthouse
+        )
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+    print(f"✅ {count} rapor {args.output} dosyasına aktarıldı")
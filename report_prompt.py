@@ -0,0 +1,162 @@
+import os
+import json
+import math
+import threading
+
+# Gemini raporu için tahmini girdi token'ı üst sınırı; SEO_PROMPT_TOKEN_BUDGET ile değiştirilebilir
+TOKEN_BUDGET_ENV = "SEO_PROMPT_TOKEN_BUDGET"
+DEFAULT_TOKEN_BUDGET = 4000
+# Rapor için üretilecek en fazla token
+MAX_OUTPUT_TOKENS_ENV = "SEO_REPORT_MAX_OUTPUT_TOKENS"
+DEFAULT_MAX_OUTPUT_TOKENS = 2048
+
+# Kalibrasyon verisi yokken token başına karakter (Türkçe metin + JSON noktalaması için temkinli)
+CHARS_PER_TOKEN = 3.0
+# Gerçek token sayıları bu kadar karaktere ulaşınca tahmin onlara göre yapılır
+MIN_CALIBRATION_CHARS = 2000
+# Gerçek sayım (count_tokens) alınamazsa tahmin bütçenin bu oranına sığmalı; JSON yoğun
+# Türkçe metinde karakter/token oranı tahminden düşük çıkabilir
+ESTIMATE_SAFETY_MARGIN = 0.8
+
+# Modelin yorumlamadığı kimlikler ve uzun ham metinler gönderilmez
+DROP_KEYS = {"lighthouse_run_id", "snapshot_id", "snippet"}
+
+# Bölümler öncelik sırasıyla; bütçe aşılırsa önce sondakiler kısaltılır/çıkarılır
+SECTIONS = [
+    ("pagespeed", "PAGESPEED"),
+    ("serp", "SERP"),
+    ("keyword_analysis", "ANAHTAR KELİME"),
+    ("findings", "KURAL TABANLI BULGULAR (skor, öncelik sırasıyla bulgular, olağan dışı durumlar)"),
+    ("page_weight", "YEREL SAYFA AĞIRLIĞI TAHMİNİ (PageSpeed yoksa performans göstergesi)"),
+    ("links", "LİNK KONTROLÜ"),
+    ("images", "GÖRSEL DENETİMİ (gerçek boyut / gösterim alanı)"),
+    ("competitors", "RAKİP KARŞILAŞTIRMASI"),
+]
+
+# Sıkıştırma seviyeleri: liste uzunluğu, metin uzunluğu ve çıkarılacak bölümler
+LEVELS = [
+    {"max_items": None, "max_chars": None, "drop": ()},
+    {"max_items": 5, "max_chars": 160, "drop": ()},
+    {"max_items": 3, "max_chars": 100, "drop": ("competitors", "links", "images", "page_weight", "findings")},
+]
+
+INSTRUCTIONS = """Aşağıdaki SEO verilerini (kompakt JSON) kullanarak Türkçe, emoji'lerle zenginleştirilmiş ve anlaşılır bir SEO raporu oluştur.
+Başlıklar:
+1. 📊 GENEL SEO DURUMU
+2. ⚡ PERFORMANS ANALİZİ
+3. 🔍 ANAHTAR KELİME OPTİMİZASYONU
+4. 📈 SERP SIRALAMASI
+5. 🎯 İYİLEŞTİRME ÖNERİLERİ
+6. 📋 EYLEM PLANI
+"missing":true olan bölümlerin verisi süre bütçesi içinde alınamadı; verinin eksik olduğunu belirt ve değer uydurma."""
+
+_calibration = {"chars": 0, "tokens": 0}
+_calibration_lock = threading.Lock()
+
+
+class PromptBudgetError(ValueError):
+    """En sıkı seviyede bile prompt token bütçesine sığmadığında fırlatılır"""
+
+
+def token_budget():
+    try:
+        return int(os.getenv(TOKEN_BUDGET_ENV, DEFAULT_TOKEN_BUDGET))
+    except ValueError:
+        return DEFAULT_TOKEN_BUDGET
+
+
+def max_output_tokens():
+    try:
+        return int(os.getenv(MAX_OUTPUT_TOKENS_ENV, DEFAULT_MAX_OUTPUT_TOKENS))
+    except ValueError:
+        return DEFAULT_MAX_OUTPUT_TOKENS
+
+
+def estimate_tokens(text):
+    """
+    Token sayısını API çağrısı yapmadan tahmin eder. Gemini'nin döndürdüğü gerçek
+    prompt token sayıları calibrate() ile işlendikçe oran bu sürecin verisine göre ayarlanır.
+    """
+    with _calibration_lock:
+        chars, tokens = _calibration["chars"], _calibration["tokens"]
+    ratio = chars / tokens if chars >= MIN_CALIBRATION_CHARS and tokens else CHARS_PER_TOKEN
+    return math.ceil(len(text) / ratio)
+
+
+def calibrate(text, prompt_tokens):
+    """Gönderilen prompt'un gerçek token sayısıyla tahmin oranını günceller"""
+    if prompt_tokens:
+        with _calibration_lock:
+            _calibration["chars"] += len(text)
+            _calibration["tokens"] += prompt_tokens
+
+
+def count_prompt_tokens(text, count_tokens=None):
+    """
+    Prompt'un token sayısını gönderimden önce bulur: count_tokens(text) (ör. Gemini
+    model.count_tokens) verilmiş ve başarılıysa gerçek sayı, değilse estimate_tokens tahmini.
+    (token sayısı, gerçek sayım mı) döndürür.
+    """
+    if count_tokens is not None:
+        try:
+            tokens = count_tokens(text)
+            if tokens is not None:
+                return tokens, True
+        except Exception as e:
+            print(f"⚠️ Token sayımı yapılamadı, tahmin kullanılıyor: {str(e)}")
+    return estimate_tokens(text), False
+
+
+def compact(value, max_items=None, max_chars=None):
+    """
+    Boş/None alanları ve DROP_KEYS'i çıkarır, ondalıkları yuvarlar; verilirse listeleri
+    max_items elemana, metinleri max_chars karaktere kısaltır.
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in DROP_KEYS:
+                continue
+            item = compact(item, max_items, max_chars)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            result[key] = item
+        return result
+    if isinstance(value, (list, tuple)):
+        items = value[:max_items] if max_items else value
+        return [compact(item, max_items, max_chars) for item in items]
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, str) and max_chars and len(value) > max_chars:
+        return value[:max_chars] + "…"
+    return value
+
+
+def _render(url, keyword, domain, sections, level):
+    lines = [INSTRUCTIONS, "", f"WEB SİTESİ: {url}", f"ANAHTAR KELİME: {keyword}", f"DOMAIN: {domain}"]
+    for name, title in SECTIONS:
+        data = sections.get(name)
+        if data is None or name in level["drop"]:
+            continue
+        encoded = json.dumps(
+            compact(data, level["max_items"], level["max_chars"]), ensure_ascii=False, separators=(",", ":")
+        )
+        lines.append(f"{title}: {encoded}")
+    return "\n".join(lines)
+
+
+def build_report_prompt(url, keyword, domain, sections, budget=None, count_tokens=None):
+    """
+    Aşama verilerinden kompakt rapor prompt'u oluşturur ve token bütçesine sığana kadar
+    seviye seviye kısaltır. (prompt, token sayısı) döndürür.
+    count_tokens verilirse her seviye gerçek sayımla ölçülür; sayım alınamazsa tahmin
+    ESTIMATE_SAFETY_MARGIN ile daraltılmış bütçeye sığmalıdır.
+    sections: {'pagespeed': ..., 'serp': ..., 'keyword_analysis': ..., 'page_weight': ..., 'links': ..., 'images': ..., 'competitors': ..., 'findings': ...}
+    """
+    budget = budget or token_budget()
+    for level in LEVELS:
+        prompt = _render(url, keyword, domain, sections, level)
+        tokens, exact = count_prompt_tokens(prompt, count_tokens)
+        if tokens <= (budget if exact else budget * ESTIMATE_SAFETY_MARGIN):
+            return prompt, tokens
+    raise PromptBudgetError(f"Rapor prompt'u token bütçesini aşıyor: ~{tokens} > {budget}")
@@ -0,0 +1,250 @@
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+import metrics
+
+# Tek bir analizin toplam süre bütçesi (saniye)
+DEADLINE_ENV = "SEO_ANALYSIS_DEADLINE"
+DEFAULT_DEADLINE = 90.0
+
+# Her API için tek istek zaman aşımı üst sınırı (saniye)
+DEFAULT_TIMEOUTS = {
+    "pagespeed": 60.0,
+    "serpapi": 20.0,
+    "page": 15.0,
+    "resource": 5.0,
+    "link": 10.0,
+    "gemini": 45.0,
+}
+FALLBACK_TIMEOUT = 15.0
+
+# Devre kesici ayarları
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+
+# Ücretli API'ler için saniyedeki en fazla istek; SEO_RATE_LIMITS="serpapi=2,pagespeed=4" ile değiştirilebilir
+RATE_LIMITS_ENV = "SEO_RATE_LIMITS"
+DEFAULT_RATE_LIMITS = {
+    "serpapi": 2.0,
+    "pagespeed": 4.0,
+}
+
+_current_deadline = contextvars.ContextVar("seo_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Analizin süre bütçesi dolduğunda fırlatılır"""
+
+
+class CircuitOpenError(RuntimeError):
+    """Devre kesici açıkken ilgili API'ye istek atılmak istendiğinde fırlatılır"""
+
+
+# İstek hiç gönderilmeden fırlatılan hatalar (API kotası harcanmaz)
+REQUEST_NOT_SENT_ERRORS = (DeadlineExceeded, CircuitOpenError)
+
+
+def counts_as_failure(error, deadline=None):
+    """
+    Hatanın devre kesiciye servis hatası olarak yazılıp yazılmayacağı. Analizin kendi süre
+    bütçesinin dolması (DeadlineExceeded veya bütçe biterken alınan zaman aşımı) sayılmaz.
+    deadline verilmezse aktif analizin bütçesine bakılır.
+    """
+    if isinstance(error, REQUEST_NOT_SENT_ERRORS):
+        return False
+    deadline = deadline or _current_deadline.get()
+    return deadline is None or not deadline.expired()
+
+
+def default_budget():
+    try:
+        return float(os.getenv(DEADLINE_ENV, DEFAULT_DEADLINE))
+    except ValueError:
+        return DEFAULT_DEADLINE
+
+
+class Deadline:
+    """Bir analiz için mutlak bitiş zamanı"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+def current_deadline():
+    """Aktif analizin Deadline nesnesini döndürür (yoksa None)"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Blok içindeki isteklerin zaman aşımlarını verilen Deadline ile sınırlar"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def request_timeout(api):
+    """API varsayılanı ile kalan süre bütçesinden küçük olanı döndürür"""
+    timeout = DEFAULT_TIMEOUTS.get(api, FALLBACK_TIMEOUT)
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{api}: analiz süre bütçesi doldu")
+        timeout = min(timeout, remaining)
+    return timeout
+
+
+class CircuitBreaker:
+    """
+    Art arda hata veren bir API'yi belirli bir süre devre dışı bırakır.
+    closed -> (eşik kadar hata) -> open -> (reset süresi) -> half_open -> tek deneme
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+        metrics.set_gauge("seo_circuit_open", 0, api=self.name)
+
+    def release_trial(self):
+        """Sonucu kaydedilmeden biten yarı açık denemeyi bırakır; sıradaki çağrı yeniden deneyebilir"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+            opened = self.state == "open"
+        metrics.set_gauge("seo_circuit_open", 1 if opened else 0, api=self.name)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(api):
+    """API adına ait (süreç genelinde paylaşılan) devre kesiciyi döndürür"""
+    with _breakers_lock:
+        breaker = _breakers.get(api)
+        if breaker is None:
+            breaker = _breakers[api] = CircuitBreaker(api)
+        return breaker
+
+
+def check_breaker(api):
+    """Devre açıksa CircuitOpenError fırlatır"""
+    breaker = get_breaker(api)
+    if not breaker.allow():
+        metrics.inc("seo_circuit_rejected_total", api=api)
+        raise CircuitOpenError(f"{api} geçici olarak devre dışı (art arda hatalar)")
+    return breaker
+
+
+class RateLimiter:
+    """Token bucket: saniyede rate istek, en fazla burst kadar ani istek"""
+
+    def __init__(self, name, rate, burst=None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Bir token ayırır; token için beklenmesi gereken süreyi döndürür"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def _release(self):
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+    def acquire(self, timeout=None):
+        """Sıra gelene kadar bekler; bekleme timeout'u aşacaksa beklemeden False döndürür"""
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            self._release()
+            return False
+        if wait > 0:
+            metrics.observe("seo_rate_limit_wait_seconds", wait, api=self.name)
+            time.sleep(wait)
+        return True
+
+
+def _configured_rate_limits():
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for item in os.getenv(RATE_LIMITS_ENV, "").split(","):
+        name, _, value = item.partition("=")
+        try:
+            limits[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return limits
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api):
+    """API'nin (süreç genelinde paylaşılan) hız sınırlayıcısı; sınırı yoksa None"""
+    with _limiters_lock:
+        if api not in _limiters:
+            rate = _configured_rate_limits().get(api)
+            _limiters[api] = RateLimiter(api, rate) if rate and rate > 0 else None
+        return _limiters[api]
+
+
+def acquire_rate(api):
+    """Hız sınırı varsa sıra bekler; bekleme süre bütçesini aşacaksa DeadlineExceeded fırlatır"""
+    limiter = get_rate_limiter(api)
+    if limiter is None:
+        return
+    deadline = _current_deadline.get()
+    if not limiter.acquire(deadline.remaining() if deadline is not None else None):
+        raise DeadlineExceeded(f"{api}: hız sınırı beklemesi süre bütçesini aşıyor")
@@ -1,5 +1,9 @@
 import os
 import json
+import time
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew, Process
@@ -8,9 +12,21 @@ from typing import Dict, Any
 import google.generativeai as genai
 
 # Mevcut fonksiyonları import et
-from keywordcontrol import analyze_keywords
+from keywordcontrol import analyze_keywords, analyze_page, fetch_page, parse_page
+from page_weight import estimate_page_weight
 from pagespeed_tool import get_pagespeed_metrics
 from serpapi_tool import get_serp_rank
+import competitors as competitor_analysis
+import html_encoding
+import link_checker
+import image_audit
+import metrics
+import cassette
+import profiling
+import recommendations
+import report_prompt
+import resilience
+import shared_cache
 
 # .env dosyasını yükle
 load_dotenv()
@@ -18,12 +34,15 @@ load_dotenv()
 # Gemini API anahtarını ayarla
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Rapor için kullanılan Gemini modeli; kaset ve önbellek anahtarları bu ada göre tutulur
+GEMINI_MODEL = "gemini-1.5-flash"
+
 # Gemini modelini yapılandır (opsiyonel)
 model = None
 if GEMINI_API_KEY and GEMINI_API_KEY != "your_gemini_api_key_here":
     try:
         genai.configure(api_key=GEMINI_API_KEY)
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = genai.GenerativeModel(GEMINI_MODEL)
         print("✅ Gemini API başarıyla yapılandırıldı")
     except Exception as e:
         print(f"⚠️ Gemini API yapılandırma hatası: {str(e)}")
@@ -31,41 +50,195 @@ if GEMINI_API_KEY and GEMINI_API_KEY != "your_gemini_api_key_here":
 else:
     print("⚠️ Gemini API anahtarı bulunamadı, basit rapor oluşturulacak")
 
+# Gemini çağrısına başlamak için kalması gereken en az süre (saniye)
+MIN_GEMINI_BUDGET = 5.0
+
+class ToolMemo:
+    """
+    Bir crew çalışması boyunca araç sonuçlarını araç adı ve argümanlara göre saklar.
+    Aynı çağrıyı aynı anda yapan agent'lar tek API çağrısını bekler; hata sonuçları ve
+    should_keep(sonuç) False dönen sonuçlar saklanmaz.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, args: dict, compute, should_keep=None):
+        key = (name, json.dumps(args, sort_keys=True, ensure_ascii=False))
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+        metrics.record_cache(f"tool_{name}", not owner)
+        if not owner:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                self._results.pop(key, None)
+            future.set_exception(e)
+            raise
+        failed = isinstance(result, dict) and "error" in result
+        if failed or (should_keep is not None and not should_keep(result)):
+            with self._lock:
+                self._results.pop(key, None)
+        future.set_result(result)
+        return result
+
+def _memoized(memo, name: str, args: dict, compute, should_keep=None):
+    return memo.get(name, args, compute, should_keep) if memo is not None else compute()
+
+# Agent'ın yorumlayamayacağı yerel kayıt kimlikleri araç çıktısından atılır
+INTERNAL_ID_KEYS = {"lighthouse_run_id", "snapshot_id"}
+
+def _strip_internal_ids(value):
+    if isinstance(value, dict):
+        return {key: _strip_internal_ids(item) for key, item in value.items() if key not in INTERNAL_ID_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_strip_internal_ids(item) for item in value]
+    return value
+
+def _tool_json(result) -> str:
+    """
+    Agent'a dönen araç çıktısı: iç kimlikleri atılmış kompakt JSON. None değerler korunur;
+    ör. SERP'te sıralanmayan domain için "rank":null agent'a iletilmelidir.
+    """
+    return json.dumps(_strip_internal_ids(result), ensure_ascii=False, separators=(",", ":"))
+
 class PageSpeedTool(BaseTool):
     name: str = "PageSpeed Tool"
-    description: str = "Google PageSpeed Insights API kullanarak web sitesi performans metriklerini alır"
+    description: str = "Google PageSpeed Insights API kullanarak web sitesi performans metriklerini JSON olarak döndürür"
+    memo: Any = None
 
     def _run(self, url: str) -> str:
         try:
-            result = get_pagespeed_metrics(url)
-            return f"PageSpeed analizi tamamlandı: {result}"
+            result = _memoized(self.memo, "pagespeed", {"url": url}, lambda: get_pagespeed_metrics(url))
         except Exception as e:
-            return f"PageSpeed analizi sırasında hata: {str(e)}"
+            result = {"error": str(e)}
+        return _tool_json(result)
 
 class SerpRankTool(BaseTool):
     name: str = "SERP Rank Tool"
-    description: str = "SERP API kullanarak anahtar kelime için domain sıralamasını kontrol eder"
+    description: str = "SERP API kullanarak anahtar kelime için domain sıralamasını kontrol eder, sonucu JSON olarak döndürür"
+    memo: Any = None
 
     def _run(self, keyword: str, domain: str) -> str:
         try:
-            result = get_serp_rank(keyword, domain)
-            return f"SERP analizi tamamlandı: {result}"
+            args = {"keyword": keyword, "domain": domain}
+            result = _memoized(self.memo, "serp", args, lambda: get_serp_rank(keyword, domain))
         except Exception as e:
-            return f"SERP analizi sırasında hata: {str(e)}"
+            result = {"error": str(e)}
+        return _tool_json(result)
 
 class KeywordControlTool(BaseTool):
     name: str = "Keyword Control Tool"
-    description: str = "Anahtar kelime analizi, başlık kontrolü ve okunabilirlik analizi yapar"
+    description: str = "Anahtar kelime analizi, başlık kontrolü ve okunabilirlik analizi yapar, sonucu JSON olarak döndürür"
+    memo: Any = None
 
     def _run(self, url: str, keyword: str) -> str:
         try:
-            result = analyze_keywords(url, keyword)
-            return f"Anahtar kelime analizi tamamlandı: {result}"
+            # Aynı sayfa farklı anahtar kelimelerle sorulsa da bir kez indirilir
+            # Geçici hata yanıtları (ör. 503) saklanmaz; sonraki çağrı sayfayı yeniden indirir
+            response = _memoized(
+                self.memo, "page", {"url": url}, lambda: fetch_page(url),
+                should_keep=lambda page: page.status_code == 200
+            )
+            args = {"url": url, "keyword": keyword}
+            result = _memoized(self.memo, "keyword", args, lambda: analyze_keywords(url, keyword, response=response))
         except Exception as e:
-            return f"Anahtar kelime analizi sırasında hata: {str(e)}"
+            result = {"error": str(e)}
+        return _tool_json(result)
+
+def create_tools(memo: ToolMemo = None) -> list:
+    """
+    Bir crew çalışması için araçları oluşturur. Araçlar aynı memo'yu paylaşır; agent'lar
+    aynı PageSpeed, SERP veya sayfa çağrısını tekrar yapsa da API'ye bir kez gidilir.
+    Her crew çalışması için yeniden çağrılmalıdır.
+    """
+    memo = memo or ToolMemo()
+    return [PageSpeedTool(memo=memo), SerpRankTool(memo=memo), KeywordControlTool(memo=memo)]
+
+def _is_missing(data) -> bool:
+    """Süre bütçesi içinde tamamlanamayan aşama verisi mi"""
+    return isinstance(data, dict) and bool(data.get("missing"))
+
+def _page_weight_section(page_weight_data: dict) -> str:
+    """PageSpeed verisi yokken yerel sayfa ağırlığı tahminini rapora ekler"""
+    if not page_weight_data or "error" in page_weight_data:
+        return ""
+    return f"""
+### 🧪 Yerel Sayfa Ağırlığı Tahmini:
+- **Toplam Boyut**: {page_weight_data.get('total_bytes', 0) / 1024:.0f} KB
+- **HTML Boyutu**: {page_weight_data.get('html_bytes', 0) / 1024:.0f} KB
+- **İstek Sayısı**: {page_weight_data.get('request_count', 'N/A')}
+- **Render'ı Engelleyen Kaynak**: {page_weight_data.get('render_blocking_count', 'N/A')}
+- **Boyutu Bilinmeyen Kaynak**: {page_weight_data.get('unknown_size_count', 'N/A')}
+"""
+
+def _score_text(score) -> str:
+    return f"{score * 100:.0f}/100" if isinstance(score, (int, float)) else "N/A"
+
+def _yes_no(value) -> str:
+    if value is None:
+        return "N/A"
+    return "✅ Evet" if value else "❌ Hayır"
+
+def _link_section(link_data: dict) -> str:
+    """Kırık link kontrolünün özetini ve ilk kırık linkleri rapora ekler"""
+    if not link_data:
+        return ""
+    if _is_missing(link_data) or "error" in link_data:
+        return f"\n## 🔗 LİNK KONTROLÜ\n\n⏱️ Eksik bölüm ({link_data.get('error')})\n"
+    
+    section = f"""
+## 🔗 LİNK KONTROLÜ
+- **Kontrol Edilen Link**: {link_data.get('checked', 0)} / {link_data.get('total_links', link_data.get('checked', 0))}
+- **Kırık Link**: {link_data.get('broken_count', 0)}
+- **Yönlendirilen Link**: {link_data.get('redirected_count', 0)}
+"""
+    if link_data.get("unchecked_count"):
+        section += f"- **Kontrol Edilemeyen Link** (süre bütçesi / devre kesici): {link_data['unchecked_count']}\n"
+    for entry in link_data.get("broken", [])[:10]:
+        section += f"- ❌ {entry['url']} ({entry.get('status') or entry.get('error')})\n"
+    return section
+
+def _image_section(image_data: dict) -> str:
+    """Görsel denetiminin özetini ve slotundan büyük görselleri rapora ekler"""
+    if not image_data:
+        return ""
+    if _is_missing(image_data) or "error" in image_data:
+        return f"\n## 🖼️ GÖRSEL DENETİMİ\n\n⏱️ Eksik bölüm ({image_data.get('error')})\n"
+    
+    formats = ", ".join(f"{name}: {count}" for name, count in image_data.get("format_counts", {}).items()) or "-"
+    section = f"""
+## 🖼️ GÖRSEL DENETİMİ
+- **Denetlenen Görsel**: {image_data.get('checked', 0)} ({image_data.get('total_bytes', 0) / 1024:.0f} KB, okunan: {image_data.get('bytes_read', 0) / 1024:.0f} KB)
+- **Biçimler**: {formats}
+- **Slotundan Büyük Görsel**: {image_data.get('oversized_count', 0)} (~{image_data.get('oversized_wasted_bytes', 0) / 1024:.0f} KB tasarruf)
+- **200 KB Üzeri Görsel**: {image_data.get('large_count', 0)}
+- **Boyutsuz (width/height yok) Görsel**: {image_data.get('missing_dimensions_count', 0)}
+"""
+    for entry in image_data.get("oversized", [])[:5]:
+        section += f"- 📐 {entry['url']} ({entry['intrinsic']} → slot {entry['slot']}, {entry['ratio']}x)\n"
+    return section
+
+def _competitor_section(competitor_data: dict) -> str:
+    """Rakip karşılaştırmasını yan yana tablo olarak rapora ekler"""
+    if not competitor_data:
+        return ""
+    if _is_missing(competitor_data) or "error" in competitor_data:
+        return f"\n## 🥊 RAKİP KARŞILAŞTIRMASI\n\n⏱️ Eksik bölüm ({competitor_data.get('error')})\n"
+    
+    return "\n## 🥊 RAKİP KARŞILAŞTIRMASI\n\n" + competitor_analysis.format_table(competitor_data)
 
-def create_simple_report(url: str, keyword: str, domain: str, pagespeed_data: dict, serp_data: dict, keyword_data: dict):
-    """API anahtarı olmadan basit rapor oluşturur"""
+def create_simple_report(url: str, keyword: str, domain: str, pagespeed_data: dict, serp_data: dict, keyword_data: dict, page_weight_data: dict = None, competitor_data: dict = None, assessment: dict = None, link_data: dict = None, image_data: dict = None):
+    """Ölçülen metriklerden LLM kullanmadan, önceliklendirilmiş önerilerle rapor oluşturur"""
+    if assessment is None:
+        assessment = recommendations.assess(keyword, domain, pagespeed_data, serp_data, keyword_data, page_weight_data, competitor_data, link_data, image_data)
     
     report = f"""
 # 📊 SEO Analiz Raporu
@@ -79,26 +252,33 @@ def create_simple_report(url: str, keyword: str, domain: str, pagespeed_data: di
 ## ⚡ PERFORMANS ANALİZİ
 """
     
-    if pagespeed_data and not isinstance(pagespeed_data, str):
+    if _is_missing(pagespeed_data):
+        report += f"\n### PageSpeed Analizi: ⏱️ Eksik bölüm ({pagespeed_data.get('error')})\n"
+    elif pagespeed_data and not isinstance(pagespeed_data, str):
         report += f"""
 ### PageSpeed Insights Sonuçları:
-- **Mobil Skor**: {pagespeed_data.get('mobile_score', 'N/A')}
-- **Desktop Skor**: {pagespeed_data.get('desktop_score', 'N/A')}
+- **Desktop Skor**: {_score_text(pagespeed_data.get('performance_score'))}
 - **İlk İçerik Boyama**: {pagespeed_data.get('first_contentful_paint', 'N/A')}
 - **Largest Contentful Paint**: {pagespeed_data.get('largest_contentful_paint', 'N/A')}
+- **Total Blocking Time**: {pagespeed_data.get('total_blocking_time', 'N/A')}
+- **Cumulative Layout Shift**: {pagespeed_data.get('cumulative_layout_shift', 'N/A')}
 """
     else:
         report += "\n### PageSpeed Analizi: Veri alınamadı\n"
     
+    if not isinstance(pagespeed_data, dict) or "error" in pagespeed_data:
+        report += _page_weight_section(page_weight_data)
+    
     report += f"""
 ## 📈 SERP SIRALAMASI
 """
     
-    if serp_data and not isinstance(serp_data, str):
+    if _is_missing(serp_data):
+        report += f"\n### SERP Analizi: ⏱️ Eksik bölüm ({serp_data.get('error')})\n"
+    elif serp_data and not isinstance(serp_data, str):
         report += f"""
 ### SERP Analizi Sonuçları:
-- **Sıralama**: {serp_data.get('rank', 'N/A')}
-- **Toplam Sonuç**: {serp_data.get('total_results', 'N/A')}
+- **Sıralama**: {serp_data.get('rank') or 'İlk sayfada değil'}
 - **Domain**: {serp_data.get('domain', 'N/A')}
 """
     else:
@@ -108,109 +288,250 @@ def create_simple_report(url: str, keyword: str, domain: str, pagespeed_data: di
 ## 🔍 ANAHTAR KELİME OPTİMİZASYONU
 """
     
-    if keyword_data and not isinstance(keyword_data, str):
+    if _is_missing(keyword_data):
+        report += f"\n### Anahtar Kelime Analizi: ⏱️ Eksik bölüm ({keyword_data.get('error')})\n"
+    elif keyword_data and not isinstance(keyword_data, str):
         report += f"""
 ### Anahtar Kelime Analizi:
-- **Başlık Uyumu**: {keyword_data.get('title_match', 'N/A')}
-- **Meta Açıklama**: {keyword_data.get('meta_description', 'N/A')}
+- **Başlıkta**: {_yes_no(keyword_data.get('in_title'))}
+- **Meta Açıklamada**: {_yes_no(keyword_data.get('in_meta_description'))}
+- **Anahtar Kelime Yoğunluğu**: %{keyword_data.get('keyword_density_percent', 'N/A')} ({keyword_data.get('keyword_count', 'N/A')} / {keyword_data.get('total_words', 'N/A')} kelime)
 - **Okunabilirlik Skoru**: {keyword_data.get('readability_score', 'N/A')}
+- **On-Page Skoru**: {keyword_data.get('on_page_score', 'N/A')}/100
 """
     else:
         report += "\n### Anahtar Kelime Analizi: Veri alınamadı\n"
     
-    report += f"""
-## 🎯 İYİLEŞTİRME ÖNERİLERİ
+    report += _link_section(link_data)
+    report += _image_section(image_data)
+    report += _competitor_section(competitor_data)
+    
+    report += recommendations.format_findings(assessment)
+    report += """
+---
+*Bu rapor ölçülen metriklerden kural tabanlı olarak oluşturulmuştur.*
+"""
+    
+    return report
+
+def _run_stage(stage: str, func, args: tuple, deadline: resilience.Deadline):
+    """Bir analiz aşamasını süre bütçesi ve (açıksa) profil altında çalıştırır"""
+    session = profiling.current_session()
+    with resilience.deadline_scope(deadline), metrics.span(stage):
+        if session is None:
+            return func(*args)
+        with session.profile_thread():
+            return func(*args)
+
+def _parse_stage(page_future, url: str) -> dict:
+    """Paylaşılan sayfa indirmesini bekleyip sayfayı tek geçişte ayrıştırır"""
+    response = page_future.result()
+    return parse_page(response.content, html_encoding.response_charset(response), response.url or url)
 
-### Genel SEO İyileştirmeleri:
-1. **Sayfa Hızı**: Sayfa yükleme hızını artırın
-2. **Mobil Uyumluluk**: Mobil cihazlarda iyi performans sağlayın
-3. **Anahtar Kelime Optimizasyonu**: Başlık ve meta açıklamalarda anahtar kelimeyi kullanın
-4. **İçerik Kalitesi**: Kaliteli ve özgün içerik oluşturun
+def _keyword_stage(parse_future, keyword: str) -> dict:
+    """Paylaşılan ayrıştırma sonucunu bekleyip anahtar kelime analizini yapar"""
+    try:
+        return analyze_page(parse_future.result(), keyword)
+    except Exception as e:
+        return {"error": str(e)}
 
-### Teknik SEO:
-1. **Meta Etiketleri**: Title ve description etiketlerini optimize edin
-2. **URL Yapısı**: Temiz ve anlaşılır URL'ler kullanın
-3. **İç Linkleme**: Site içi linkleme yapısını güçlendirin
-4. **Dış Linkleme**: Kaliteli sitelerden backlink alın
+def _page_weight_stage(page_future, parse_future) -> dict:
+    """Paylaşılan ayrıştırma sonucunu bekleyip yerel sayfa ağırlığı tahminini yapar"""
+    page = parse_future.result()
+    return estimate_page_weight(page["url"], page, len(page_future.result().content))
 
-## 📋 EYLEM PLANI
+def _link_stage(parse_future) -> dict:
+    """Paylaşılan ayrıştırma sonucundaki linkleri eşzamanlı kontrol eder"""
+    return link_checker.check_page_links(parse_future.result())
 
-### Kısa Vadeli (1-2 Hafta):
-- [ ] Sayfa hızı optimizasyonu
-- [ ] Meta etiketlerin güncellenmesi
-- [ ] Anahtar kelime yoğunluğunun kontrolü
+def _image_stage(parse_future) -> dict:
+    """Paylaşılan ayrıştırma sonucundaki görselleri Range istekleriyle denetler"""
+    return image_audit.audit_images(parse_future.result())
 
-### Orta Vadeli (1-2 Ay):
-- [ ] İçerik kalitesinin artırılması
-- [ ] Backlink stratejisinin geliştirilmesi
-- [ ] Teknik SEO sorunlarının çözülmesi
+def _competitor_stage(serp_future, keyword_future, keyword: str, domain: str, top_n: int) -> dict:
+    """SERP yanıtındaki organik sonuçları bekleyip rakip sayfaları karşılaştırır"""
+    serp_data = serp_future.result()
+    try:
+        own_keyword_data = keyword_future.result()
+    except Exception:
+        own_keyword_data = None
+    return competitor_analysis.compare_competitors(serp_data, keyword, domain, own_keyword_data, top_n)
 
-### Uzun Vadeli (3-6 Ay):
-- [ ] Site genelinde SEO optimizasyonu
-- [ ] İçerik stratejisinin geliştirilmesi
-- [ ] Performans takip sisteminin kurulması
+def _count_prompt_tokens(prompt: str, deadline: resilience.Deadline):
+    """Gemini count_tokens ile prompt'un gerçek token sayısı; model yoksa veya kaset oynatılıyorsa None"""
+    if model is None or cassette.replaying():
+        return None
+    with resilience.deadline_scope(deadline):
+        request_options = {"timeout": resilience.request_timeout("gemini")}
+    return model.count_tokens(prompt, request_options=request_options).total_tokens
 
----
-*Bu rapor otomatik olarak oluşturulmuştur. Daha detaylı analiz için Gemini API anahtarınızı ayarlayın.*
-"""
-    
-    return report
+def _gemini_generate(prompt: str, deadline: resilience.Deadline) -> str:
+    """Gemini çağrısını devre kesici, süre bütçesi, API ve token metrikleriyle yapar"""
+    start = time.perf_counter()
+    breaker = None
+    try:
+        breaker = resilience.check_breaker("gemini")
+        with resilience.deadline_scope(deadline):
+            request_options = {"timeout": resilience.request_timeout("gemini")}
+        response = cassette.generate_content(
+            model,
+            GEMINI_MODEL,
+            prompt,
+            request_options=request_options,
+            generation_config={"max_output_tokens": report_prompt.max_output_tokens()},
+        )
+        text = response.text
+    except BaseException as e:
+        # Analizin süre bütçesi ve kaset eksikliği Gemini'nin hatası sayılmaz; yarı açık deneme yine bırakılır
+        if breaker is not None:
+            if isinstance(e, Exception) and not isinstance(e, cassette.CassetteMissError) \
+                    and resilience.counts_as_failure(e, deadline):
+                breaker.record_failure()
+            else:
+                breaker.release_trial()
+        metrics.record_api_call("gemini", time.perf_counter() - start, type(e).__name__)
+        raise
+    elapsed = time.perf_counter() - start
+    breaker.record_success()
+    metrics.record_api_call("gemini", elapsed, 200)
 
-def run_seo_analysis(url: str, keyword: str, domain: str):
+    usage = getattr(response, "usage_metadata", None)
+    input_tokens = getattr(usage, "prompt_token_count", None)
+    metrics.record_llm_usage(
+        GEMINI_MODEL, input_tokens, getattr(usage, "candidates_token_count", None), elapsed
+    )
+    report_prompt.calibrate(prompt, input_tokens)
+    return text
+
+def _missing_stage(stage: str, reason: str) -> dict:
+    """Tamamlanamayan aşama için rapora eklenecek işaretli veri"""
+    metrics.inc("seo_stage_missing_total", stage=stage)
+    return {"error": reason, "missing": True}
+
+def run_seo_analysis(url: str, keyword: str, domain: str, deadline: float = None, on_stage=None, competitors: int = None, premium: bool = False):
     """
-    SEO analizi için basit sistem çalıştırır
+    SEO analizi için basit sistem çalıştırır.
+    PageSpeed, SERP, anahtar kelime ve yerel sayfa ağırlığı aşamaları paralel
+    çalışır (son ikisi aynı sayfa indirmesini ve ayrıştırmasını paylaşır); süre bütçesi
+    (deadline, saniye) dolduğunda tamamlanan aşamalarla rapor oluşturulur.
+    on_stage verilirse her aşamanın verisi hazır olduğu anda on_stage(stage, data) çağrılır.
+    competitors > 0 ise (varsayılan: SEO_COMPETITORS) SERP'teki ilk N rakip sayfa aynı
+    SERP yanıtı kullanılarak analiz edilir ve yan yana karşılaştırılır.
+    Rapor varsayılan olarak kural tabanlı öneri motoruyla anında oluşturulur; Gemini yalnızca
+    premium raporlarda veya kuralların yorumlayamadığı olağan dışı durumlarda (SEO_LLM_MODE) çağrılır.
     """
     try:
-        print("🔍 PageSpeed analizi yapılıyor...")
-        pagespeed_data = get_pagespeed_metrics(url)
+        deadline = resilience.Deadline(deadline if deadline is not None else resilience.default_budget())
+        top_n = competitor_analysis.competitor_count(competitors)
+        executor = ThreadPoolExecutor(max_workers=9 if top_n else 8)
+        
+        # Sayfa bir kez indirilip bir kez ayrıştırılır, anahtar kelime ve sayfa ağırlığı aşamaları paylaşır
+        page_future = executor.submit(
+            contextvars.copy_context().run, _run_stage, "page_fetch", fetch_page, (url,), deadline
+        )
+        parse_future = executor.submit(
+            contextvars.copy_context().run, _run_stage, "page_parse", _parse_stage, (page_future, url), deadline
+        )
+        stages = {
+            "pagespeed": (get_pagespeed_metrics, (url,)),
+            "serp": (get_serp_rank, (keyword, domain)),
+            "keyword_analysis": (_keyword_stage, (parse_future, keyword)),
+            "page_weight": (_page_weight_stage, (page_future, parse_future)),
+            "links": (_link_stage, (parse_future,)),
+            "images": (_image_stage, (parse_future,)),
+        }
+        
+        print("🔍 PageSpeed, 📊 SERP, 🔤 anahtar kelime, 🧪 sayfa ağırlığı, 🔗 link ve 🖼️ görsel analizleri başlatılıyor...")
+        futures = {}
+        for stage, (func, args) in stages.items():
+            # Her aşama metrik/profil bağlamının kendi kopyasıyla çalışır
+            context = contextvars.copy_context()
+            futures[executor.submit(context.run, _run_stage, stage, func, args, deadline)] = stage
+        
+        if top_n:
+            # Rakip modu ikinci bir SERP çağrısı yapmaz, serp aşamasının yanıtını bekler
+            stage_futures = {stage: future for future, stage in futures.items()}
+            args = (stage_futures["serp"], stage_futures["keyword_analysis"], keyword, domain, top_n)
+            stages["competitors"] = (_competitor_stage, args)
+            context = contextvars.copy_context()
+            futures[executor.submit(context.run, _run_stage, "competitors", _competitor_stage, args, deadline)] = "competitors"
+        
+        results = {}
+        try:
+            for future in as_completed(futures, timeout=deadline.remaining()):
+                stage = futures[future]
+                if future.exception() is not None:
+                    print(f"⚠️ {stage} aşaması başarısız: {future.exception()}")
+                    results[stage] = _missing_stage(stage, str(future.exception()))
+                else:
+                    results[stage] = future.result()
+                if on_stage:
+                    on_stage(stage, results[stage])
+        except FuturesTimeoutError:
+            # Python 3.10'da builtin TimeoutError'dan farklı bir sınıf; 3.11+ ile aynı
+            pass
+        # Bekleyen aşamalar raporu bloklamaz; istekleri zaten süre bütçesiyle sınırlı
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        for stage in stages:
+            if stage not in results:
+                print(f"⏱️ {stage} aşaması süre bütçesi içinde tamamlanamadı")
+                results[stage] = _missing_stage(stage, "Süre bütçesi içinde tamamlanamadı")
+                if on_stage:
+                    on_stage(stage, results[stage])
         
-        print("📊 SERP analizi yapılıyor...")
-        serp_data = get_serp_rank(keyword, domain)
+        pagespeed_data = results["pagespeed"]
+        serp_data = results["serp"]
+        keyword_data = results["keyword_analysis"]
+        page_weight_data = results["page_weight"]
+        competitor_data = results.get("competitors")
+        link_data = results["links"]
+        image_data = results["images"]
         
-        print("🔤 Anahtar kelime analizi yapılıyor...")
-        keyword_data = analyze_keywords(url, keyword)
+        with metrics.span("recommendations"):
+            assessment = recommendations.assess(
+                keyword, domain, pagespeed_data, serp_data, keyword_data, page_weight_data, competitor_data, link_data, image_data
+            )
+        llm_reason = recommendations.llm_reason(assessment, premium)
         
-        # Gemini API varsa kullan, yoksa basit rapor oluştur
-        if model:
-            print("🤖 Gemini ile kapsamlı analiz yapılıyor...")
+        # Gerekliyse ve Gemini API varsa (veya kayıttan oynatılıyorsa) ve süre kaldıysa kullan, yoksa kural tabanlı rapor oluştur
+        if llm_reason and (model or cassette.replaying()) and deadline.remaining() >= MIN_GEMINI_BUDGET:
+            print(f"🤖 Gemini ile kapsamlı analiz yapılıyor ({llm_reason})...")
             
-            analysis_prompt = f"""
-            Aşağıdaki SEO analiz verilerini kullanarak kapsamlı bir SEO raporu oluştur:
-
-            WEB SİTESİ: {url}
-            ANAHTAR KELİME: {keyword}
-            DOMAIN: {domain}
-
-            PAGESPEED VERİLERİ:
-            {json.dumps(pagespeed_data, indent=2, ensure_ascii=False)}
-
-            SERP VERİLERİ:
-            {json.dumps(serp_data, indent=2, ensure_ascii=False)}
-
-            KEYWORD ANALİZ VERİLERİ:
-            {json.dumps(keyword_data, indent=2, ensure_ascii=False)}
-
-            Lütfen aşağıdaki başlıklar altında detaylı bir SEO raporu oluştur:
-
-            1. 📊 GENEL SEO DURUMU
-            2. ⚡ PERFORMANS ANALİZİ
-            3. 🔍 ANAHTAR KELİME OPTİMİZASYONU
-            4. 📈 SERP SIRALAMASI
-            5. 🎯 İYİLEŞTİRME ÖNERİLERİ
-            6. 📋 EYLEM PLANI
-
-            Raporu Türkçe olarak, emoji'lerle zenginleştirilmiş ve anlaşılır bir şekilde hazırla.
-            """
+            # Kompakt JSON ile ve token bütçesine sığacak şekilde (gerekirse kısaltılarak) hazırlanır
+            sections = {
+                "pagespeed": pagespeed_data,
+                "serp": serp_data,
+                "keyword_analysis": keyword_data,
+                "page_weight": page_weight_data,
+                "links": link_data,
+                "images": image_data,
+                "competitors": competitor_data,
+                "findings": assessment,
+            }
             
             try:
-                response = model.generate_content(analysis_prompt)
-                return response.text
+                analysis_prompt, prompt_tokens = report_prompt.build_report_prompt(
+                    url, keyword, domain, sections,
+                    count_tokens=lambda text: _count_prompt_tokens(text, deadline)
+                )
+                print(f"🧮 Rapor prompt'u {prompt_tokens} token")
+                # Aynı veriler için üretilmiş rapor (başka bir replikada bile) yeniden kullanılır
+                with metrics.span("gemini"):
+                    return shared_cache.cached(
+                        "gemini",
+                        [GEMINI_MODEL, analysis_prompt],
+                        lambda: _gemini_generate(analysis_prompt, deadline),
+                        should_cache=bool,
+                    )
             except Exception as e:
                 print(f"⚠️ Gemini API hatası: {str(e)}")
-                return create_simple_report(url, keyword, domain, pagespeed_data, serp_data, keyword_data)
+                with metrics.span("simple_report"):
+                    return create_simple_report(url, keyword, domain, pagespeed_data, serp_data, keyword_data, page_weight_data, competitor_data, assessment, link_data, image_data)
         else:
-            print("📝 Basit rapor oluşturuluyor...")
-            return create_simple_report(url, keyword, domain, pagespeed_data, serp_data, keyword_data)
+            print("📝 Kural tabanlı rapor oluşturuluyor...")
+            with metrics.span("simple_report"):
+                return create_simple_report(url, keyword, domain, pagespeed_data, serp_data, keyword_data, page_weight_data, competitor_data, assessment, link_data, image_data)
         
     except Exception as e:
         return f"SEO analizi sırasında hata oluştu: {str(e)}"
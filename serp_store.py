@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from datetime import datetime, date
+from urllib.parse import urlparse
+from contextlib import closing
+
+from domain_matcher import DomainMatcher, registrable_domain
+
+# Her SerpAPI yanıtının organik sonuçlarının tarihli olarak saklandığı SQLite veritabanı
+SERP_DB_ENV = "SEO_SERP_DB"
+DEFAULT_SERP_DB = "serp_snapshots.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    keyword TEXT NOT NULL,
+    keyword_key TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    result_count INTEGER NOT NULL,
+    gl TEXT NOT NULL DEFAULT '',
+    hl TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    device TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS results (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    position INTEGER,
+    host TEXT NOT NULL,
+    link TEXT NOT NULL,
+    title TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_snapshot ON results (snapshot_id, position);
+CREATE INDEX IF NOT EXISTS idx_results_host ON results (host, snapshot_id);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_snapshots_cell ON snapshots (keyword_key, gl, hl, location, device, fetched_at);
+"""
+
+# Bir SERP hücresini (ülke, dil, konum, cihaz) tanımlayan SerpAPI parametreleri
+CELL_FIELDS = ("gl", "hl", "location", "device")
+
+
+def default_db_path():
+    return os.getenv(SERP_DB_ENV, DEFAULT_SERP_DB)
+
+
+def keyword_key(keyword):
+    """Aynı sorgunun farklı yazımlarını (büyük harf, fazla boşluk) tek anahtarda toplar"""
+    return " ".join(keyword.lower().split())
+
+
+def host_of(value):
+    """URL ya da domain'den 'www.' öneki olmadan küçük harfli host adını çıkarır"""
+    value = value.strip().lower()
+    host = urlparse(value if "//" in value else f"//{value}").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_cell(cell=None):
+    """Eksik alanları boş bırakarak hücreyi karşılaştırılabilir hale getirir (boş = genel Google)"""
+    cell = cell or {}
+    normalized = {field: str(cell.get(field) or "").strip() for field in CELL_FIELDS}
+    for field in ("gl", "hl", "device"):
+        normalized[field] = normalized[field].lower()
+    return normalized
+
+
+def _timestamp(value, end_of_day=False):
+    """datetime/date/ISO metnini karşılaştırılabilir ISO zaman damgasına çevirir"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, date):
+        value = value.isoformat()
+    if len(value) == 10 and end_of_day:
+        return f"{value}T23:59:59"
+    return value
+
+
+class SerpStore:
+    """SERP anlık görüntülerini anahtar kelime ve domain'e göre indeksleyen yerel arşiv"""
+
+    def __init__(self, path=None):
+        self.path = path or default_db_path()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Hücre sütunları olmadan oluşturulmuş eski veritabanlarını güncelle
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(snapshots)")}
+            for field in CELL_FIELDS:
+                if field not in columns:
+                    conn.execute(f"ALTER TABLE snapshots ADD COLUMN {field} TEXT NOT NULL DEFAULT ''")
+            conn.executescript(INDEXES)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return closing(conn)
+
+    def save_snapshot(self, keyword, organic_results, fetched_at=None, cell=None):
+        """
+        Bir SERP yanıtının organik sonuçlarını tarihli anlık görüntü olarak saklar; kimliğini döndürür.
+        cell: sorgunun yapıldığı {'gl', 'hl', 'location', 'device'} hücresi.
+        """
+        fetched_at = _timestamp(fetched_at or datetime.now())
+        cell = normalize_cell(cell)
+        rows = [
+            (result.get("position"), host_of(result.get("link") or ""), result.get("link") or "", result.get("title"))
+            for result in organic_results
+            if result.get("link")
+        ]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO snapshots (keyword, keyword_key, fetched_at, result_count, gl, hl, location, device) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (keyword, keyword_key(keyword), fetched_at, len(rows), *(cell[field] for field in CELL_FIELDS)),
+                )
+                snapshot_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO results (snapshot_id, position, host, link, title) VALUES (?, ?, ?, ?, ?)",
+                    [(snapshot_id, *row) for row in rows],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return snapshot_id
+
+    def _cell_filter(self, keyword, cell):
+        cell = normalize_cell(cell)
+        query = "SELECT * FROM snapshots WHERE keyword_key = ?" + "".join(f" AND {field} = ?" for field in CELL_FIELDS)
+        return query, [keyword_key(keyword), *(cell[field] for field in CELL_FIELDS)]
+
+    def find_snapshot(self, keyword, on=None, cell=None, since=None):
+        """
+        Hücrenin verilen tarihte (gün sonuna kadar) ya da tarih yoksa en son alınan anlık görüntüsünü döndürür.
+        since verilirse daha eski görüntüler yok sayılır (önbellek tazeliği).
+        """
+        query, params = self._cell_filter(keyword, cell)
+        if since is not None:
+            query += " AND fetched_at >= ?"
+            params.append(_timestamp(since))
+        if on is not None:
+            query += " AND fetched_at <= ?"
+            params.append(_timestamp(on, end_of_day=True))
+        with self._connect() as conn:
+            row = conn.execute(query + " ORDER BY fetched_at DESC, id DESC LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+
+    def snapshot_results(self, snapshot_id):
+        """Bir anlık görüntünün organik sonuçlarını sıralı olarak döndürür"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT position, host, link, title FROM results WHERE snapshot_id = ? ORDER BY position",
+                (snapshot_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _rank_in(self, conn, snapshot_id, matcher):
+        # İndeksten kayıt edilebilir alan adına göre adayları al, kesin eşleşmeyi (alt alan adı/yol) matcher yapsın
+        rows = []
+        for domain in {registrable_domain(target) for target in matcher.targets}:
+            rows += conn.execute(
+                "SELECT position, link FROM results WHERE snapshot_id = ? AND (host = ? OR host LIKE ?)",
+                (snapshot_id, domain, f"%.{domain}"),
+            ).fetchall()
+        return next(
+            (row for row in sorted(rows, key=lambda r: r["position"] or 0) if matcher.match(row["link"])),
+            None,
+        )
+
+    def rank_on(self, keyword, domain, on=None, cell=None):
+        """
+        Domain'in verilen tarihteki (yoksa en son) sıralamasını API çağrısı yapmadan döndürür.
+        O tarihe ait anlık görüntü yoksa None döner.
+        """
+        snapshot = self.find_snapshot(keyword, on, cell)
+        if snapshot is None:
+            return None
+        with self._connect() as conn:
+            row = self._rank_in(conn, snapshot["id"], DomainMatcher([domain]))
+        return {
+            "keyword": snapshot["keyword"],
+            "domain": domain,
+            "rank": row["position"] if row else None,
+            "link": row["link"] if row else None,
+            "fetched_at": snapshot["fetched_at"],
+            "snapshot_id": snapshot["id"],
+        }
+
+    def rank_history(self, keyword, domain, since=None, until=None, cell=None):
+        """Domain'in saklanan tüm anlık görüntülerdeki sıralama geçmişini tarih sırasıyla döndürür"""
+        query, params = self._cell_filter(keyword, cell)
+        if since is not None:
+            query += " AND fetched_at >= ?"
+            params.append(_timestamp(since))
+        if until is not None:
+            query += " AND fetched_at <= ?"
+            params.append(_timestamp(until, end_of_day=True))
+
+        history = []
+        matcher = DomainMatcher([domain])
+        with self._connect() as conn:
+            for snapshot in conn.execute(query + " ORDER BY fetched_at, id", params).fetchall():
+                row = self._rank_in(conn, snapshot["id"], matcher)
+                history.append({
+                    "fetched_at": snapshot["fetched_at"],
+                    "rank": row["position"] if row else None,
+                    "snapshot_id": snapshot["id"],
+                })
+        return history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Saklanan SERP anlık görüntülerinden sıralama sorgusu")
+    parser.add_argument("keyword")
+    parser.add_argument("domain")
+    parser.add_argument("--date", default=None, help="YYYY-MM-DD (varsayılan: en son anlık görüntü)")
+    parser.add_argument("--history", action="store_true", help="Tüm anlık görüntülerdeki sıralama geçmişi")
+    for field in CELL_FIELDS:
+        parser.add_argument(f"--{field}", default="", help="SERP hücresi (varsayılan: genel Google)")
+    parser.add_argument("--db", default=default_db_path())
+    args = parser.parse_args()
+
+    store = SerpStore(args.db)
+    cell = {field: getattr(args, field) for field in CELL_FIELDS}
+    if args.history:
+        result = store.rank_history(args.keyword, args.domain, cell=cell)
+    else:
+        result = store.rank_on(args.keyword, args.domain, args.date, cell)
+    sys.stdout.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import metrics
+import serp_store
+from domain_matcher import DomainMatcher
+from serpapi_tool import search_organic
+
+# Aynı hücre için bu süreden yeni bir anlık görüntü varsa API çağrılmaz (saniye)
+CACHE_TTL_ENV = "SEO_SERP_CACHE_TTL"
+DEFAULT_CACHE_TTL = 6 * 3600
+MAX_WORKERS = 4
+
+# Türk müşteriler için varsayılan tarama matrisi
+DEFAULT_LOCALES = [
+    {"gl": "tr", "hl": "tr"},
+    {"gl": "tr", "hl": "en"},
+    {"gl": "us", "hl": "en"},
+]
+DEFAULT_DEVICES = ["desktop", "mobile"]
+
+# Aynı süreçte aynı hücreyi aynı anda isteyen taramalar tek API çağrısını bekler
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def cache_ttl():
+    try:
+        return float(os.getenv(CACHE_TTL_ENV, DEFAULT_CACHE_TTL))
+    except ValueError:
+        return DEFAULT_CACHE_TTL
+
+
+def build_cells(locales=None, devices=None):
+    """Konum/dil listesi ile cihaz listesinin çapraz çarpımından hücreleri üretir"""
+    return [
+        serp_store.normalize_cell({**locale, "device": device})
+        for locale in (locales or DEFAULT_LOCALES)
+        for device in (devices or DEFAULT_DEVICES)
+    ]
+
+
+def _cached_results(store, keyword, cell, max_age):
+    """Hücrenin önbellek süresi içindeki son anlık görüntüsünü (sonuçlar, kimlik, zaman) döndürür"""
+    since = datetime.now() - timedelta(seconds=max_age)
+    snapshot = store.find_snapshot(keyword, cell=cell, since=since)
+    if snapshot is None:
+        return None
+    return store.snapshot_results(snapshot["id"]), snapshot["id"], snapshot["fetched_at"]
+
+
+def fetch_cell(keyword, cell, max_age=None, store=None):
+    """
+    Bir hücrenin organik sonuçlarını döndürür: önbellek süresi içinde saklanmış bir
+    anlık görüntü varsa (başka bir kullanıcının taramasından bile) API çağrılmaz.
+    """
+    store = store or serp_store.SerpStore()
+    cell = serp_store.normalize_cell(cell)
+    max_age = cache_ttl() if max_age is None else max_age
+    key = (serp_store.keyword_key(keyword), *cell.values())
+
+    with _in_flight_lock:
+        cached = _cached_results(store, keyword, cell, max_age) if max_age > 0 else None
+        if cached is not None:
+            metrics.record_cache("serp_cell", True)
+            results, snapshot_id, fetched_at = cached
+            return {"organic_results": results, "snapshot_id": snapshot_id, "fetched_at": fetched_at, "cached": True}
+        pending = _in_flight.get(key)
+        owner = pending is None
+        if owner:
+            pending = _in_flight[key] = Future()
+
+    if not owner:
+        metrics.record_cache("serp_cell", True)
+        return {**pending.result(), "cached": True}
+
+    metrics.record_cache("serp_cell", False)
+    try:
+        # Paylaşılan önbellekteki sonuç da max_age'den eski olmamalı (max_age=0 her zaman yeni sorgu)
+        results, snapshot_id = search_organic(keyword, cell, max_age=max_age)
+        entry = {
+            "organic_results": results,
+            "snapshot_id": snapshot_id,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "cached": False,
+        }
+        pending.set_result(entry)
+        return entry
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+
+
+def sweep(keyword, domains, locales=None, devices=None, max_age=None, max_workers=MAX_WORKERS):
+    """
+    Bir anahtar kelimeyi konum/dil × cihaz matrisinde eşzamanlı olarak tarar.
+    İstekler SerpAPI hız sınırına tabidir; her hücre ayrı önbelleklenir.
+    Her hücre için domain sıralamalarını ve domain başına özet döndürür.
+    """
+    try:
+        cells = build_cells(locales, devices)
+        matcher = DomainMatcher(domains)
+        store = serp_store.SerpStore()
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(cells))) as executor:
+            # Süre bütçesi ve metrik bağlamı her hücreye taşınır
+            futures = [
+                executor.submit(contextvars.copy_context().run, fetch_cell, keyword, cell, max_age, store)
+                for cell in cells
+            ]
+
+            rows = []
+            for cell, future in zip(cells, futures):
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    rows.append({**cell, "error": str(e)})
+                    continue
+                ranks = matcher.ranks(entry["organic_results"])
+                rows.append({
+                    **cell,
+                    "ranks": {domain: match[0] if match else None for domain, match in ranks.items()},
+                    "snapshot_id": entry["snapshot_id"],
+                    "fetched_at": entry["fetched_at"],
+                    "cached": entry["cached"],
+                })
+
+        summary = {}
+        for domain in matcher.targets:
+            found = [row["ranks"][domain] for row in rows if "ranks" in row and row["ranks"][domain] is not None]
+            summary[domain] = {
+                "best": min(found) if found else None,
+                "worst": max(found) if found else None,
+                "found_in": len(found),
+                "cells": len(rows),
+            }
+        return {"keyword": keyword, "cells": rows, "summary": summary}
+
+    except (sqlite3.Error, OSError, ValueError) as e:
+        return {"error": str(e)}
+
+
+def _parse_locale(value):
+    """'tr:tr' veya 'tr:tr:Istanbul, Turkey' -> {'gl', 'hl', 'location'}"""
+    parts = value.split(":", 2)
+    return {"gl": parts[0], "hl": parts[1] if len(parts) > 1 else "", "location": parts[2] if len(parts) > 2 else ""}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konum/dil ve cihaz matrisinde SERP taraması")
+    parser.add_argument("keyword")
+    parser.add_argument("domains", nargs="+")
+    parser.add_argument("--locale", action="append", default=None, help="gl:hl[:location], tekrar edilebilir (ör. tr:tr)")
+    parser.add_argument("--device", action="append", default=None, choices=["desktop", "mobile", "tablet"])
+    parser.add_argument("--max-age", type=float, default=None, help="Önbellek süresi (saniye, varsayılan SEO_SERP_CACHE_TTL)")
+    args = parser.parse_args()
+
+    locales = [_parse_locale(value) for value in args.locale] if args.locale else None
+    result = sweep(args.keyword, args.domains, locales, args.device, args.max_age)
+    sys.stdout.write(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
@@ -1,45 +1,152 @@
 import os
-import requests
+import sqlite3
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+import http_client
+import resilience
+import serp_store
+import shared_cache
+from domain_matcher import DomainMatcher
+
 load_dotenv()
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 
-def get_serp_rank(keyword, domain):
+def get_stored_rank(keyword, domain, on=None):
     """
-    Belirtilen keyword için Google'da domain'in sıralamasını getirir.
-    SerpAPI kullanır.
+    Daha önce saklanan SERP anlık görüntüsünden domain'in sıralamasını API çağrısı yapmadan getirir.
+    on: 'YYYY-MM-DD' (o gün ve öncesindeki en son görüntü); verilmezse en son görüntü kullanılır.
     """
     try:
-        params = {
-            "engine": "google",
-            "q": keyword,
-            "api_key": SERP_API_KEY,
-            "num": 10
+        result = serp_store.SerpStore().rank_on(keyword, domain, on)
+        if result is None:
+            return {"keyword": keyword, "domain": domain, "rank": None, "message": "Bu tarih için saklanan SERP verisi yok."}
+        return result
+    except Exception as e:
+        return {"error": str(e)}
+
+def search_organic(keyword, cell=None, max_age=None):
+    """
+    SerpAPI'den organik sonuçları alır ve tarihli anlık görüntü olarak saklar.
+    cell: {'gl': 'tr', 'hl': 'tr', 'location': 'Istanbul, Turkey', 'device': 'mobile'} gibi
+    ülke/dil/konum/cihaz hücresi; verilmezse genel Google sorgulanır.
+    (organik sonuçlar, anlık görüntü kimliği) döndürür.
+    Sonuç paylaşılan önbellekte tutulur; diğer replikalar aynı sorgu için API çağırmaz.
+    max_age (saniye) verilirse önbellekteki sonuç bundan eskiyse API yeniden çağrılır; 0 = her zaman.
+    """
+    cell = serp_store.normalize_cell(cell)
+    parts = [serp_store.keyword_key(keyword), cell]
+    fetched = {}
+
+    def fetch():
+        entry, fetched["snapshot_id"] = _fetch_organic(keyword, cell)
+        return entry
+
+    entry = shared_cache.cached("serp", parts, fetch, fresh=max_age is not None and max_age <= 0)
+    if "snapshot_id" not in fetched and max_age is not None and _older_than(entry, max_age):
+        entry = shared_cache.cached("serp", parts, fetch, fresh=True)
+    if "snapshot_id" in fetched:
+        return entry["organic_results"], fetched["snapshot_id"]
+    # Anlık görüntü kimliği yerel arşive aittir, önbellekte paylaşılmaz; bu replikada yoksa None
+    return entry["organic_results"], _local_snapshot_id(keyword, cell, entry.get("fetched_at"))
+
+def _older_than(entry, max_age):
+    fetched_at = entry.get("fetched_at")
+    return fetched_at is None or fetched_at < (datetime.now() - timedelta(seconds=max_age)).isoformat(timespec="seconds")
+
+def _local_snapshot_id(keyword, cell, fetched_at):
+    if fetched_at is None:
+        return None
+    try:
+        snapshot = serp_store.SerpStore().find_snapshot(keyword, cell=cell, since=fetched_at)
+    except (OSError, sqlite3.Error):
+        return None
+    return snapshot["id"] if snapshot else None
+
+def _fetch_organic(keyword, cell):
+    """Önbelleğe yazılacak kaydı ve yerel anlık görüntü kimliğini döndürür"""
+    params = {
+        "engine": "google",
+        "q": keyword,
+        "api_key": SERP_API_KEY,
+        "num": 10
+    }
+    params.update({field: value for field, value in cell.items() if value})
+    response = http_client.get("serpapi", "https://serpapi.com/search", params=params)
+    data = response.json()
+    # Hata yanıtları boş bir SERP gibi saklanmasın (önbellekte yanlış "bulunamadı" sonucu kalır)
+    if "error" in data:
+        raise RuntimeError(f"SerpAPI hatası: {data['error']}")
+    organic_results = data.get("organic_results", [])
+    fetched_at = datetime.now().isoformat(timespec="seconds")
+
+    # Sonuçları tarihli olarak sakla; başka domain'lerin sıralaması sonradan API çağrısı olmadan sorgulanabilir
+    snapshot_id = None
+    try:
+        snapshot_id = serp_store.SerpStore().save_snapshot(keyword, organic_results, fetched_at=fetched_at, cell=cell)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ SERP anlık görüntüsü kaydedilemedi: {str(e)}")
+
+    # Rakip karşılaştırması aynı yanıtı yeniden kullanır, ikinci bir API çağrısı gerekmez
+    results = [
+        {
+            "position": result.get("position"),
+            "link": result.get("link", ""),
+            "title": result.get("title", ""),
+            "snippet": result.get("snippet", "")
         }
-        response = requests.get("https://serpapi.com/search", params=params)
-        data = response.json()
-
-        # Organik sonuçlarda domain arama
-        organic_results = data.get("organic_results", [])
-        for result in organic_results:
-            link = result.get("link", "")
-            if domain in link:
-                rank = result.get("position", None)
-                return {
-                    "keyword": keyword,
-                    "domain": domain,
-                    "rank": rank
-                }
+        for result in organic_results
+    ]
+    return {"organic_results": results, "fetched_at": fetched_at}, snapshot_id
+
+def get_serp_ranks(keyword, domains, fresh=False):
+    """
+    Tek SERP çağrısıyla birden fazla domain'in sıralamasını getirir.
+    Domain'ler kayıt edilebilir alan adına göre eşleşir; 'blog.example.com' veya
+    'example.com/tr' gibi alt alan adı / yol kapsamları desteklenir.
+    fresh=True ise önbellek atlanır. Hata sonucundaki request_sent, API'ye istek
+    gidip gitmediğini (devre kesici / süre bütçesi) belirtir.
+    """
+    try:
+        results, snapshot_id = search_organic(keyword, max_age=0 if fresh else None)
+        ranks = DomainMatcher(domains).ranks(results)
+        return {
+            "keyword": keyword,
+            "ranks": {domain: match[0] if match else None for domain, match in ranks.items()},
+            "snapshot_id": snapshot_id,
+            "organic_results": results
+        }
+
+    except Exception as e:
+        return {"error": str(e), "request_sent": not isinstance(e, resilience.REQUEST_NOT_SENT_ERRORS)}
+
+def get_serp_rank(keyword, domain, fresh=False):
+    """
+    Belirtilen keyword için Google'da domain'in sıralamasını getirir.
+    SerpAPI kullanır. fresh=True ise (ör. planlı yenileme) önbellek atlanır.
+    """
+    try:
+        results, snapshot_id = search_organic(keyword, max_age=0 if fresh else None)
+
+        # Organik sonuçlarda domain arama (kayıt edilebilir alan adına göre, alt dize değil)
+        match = DomainMatcher([domain]).ranks(results).get(domain.strip())
+        if match:
+            return {
+                "keyword": keyword,
+                "domain": domain,
+                "rank": match[0],
+                "snapshot_id": snapshot_id,
+                "organic_results": results
+            }
         # Bulunamazsa
         return {
             "keyword": keyword,
             "domain": domain,
             "rank": None,
-            "message": "Domain ilk sayfada bulunamadı."
+            "message": "Domain ilk sayfada bulunamadı.",
+            "snapshot_id": snapshot_id,
+            "organic_results": results
         }
 
     except Exception as e:
         return {"error": str(e)}
-
-
@@ -0,0 +1,508 @@
+import os
+import sys
+import json
+import time
+import zlib
+import socket
+import sqlite3
+import hashlib
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from urllib.parse import urlparse, unquote
+from contextlib import closing
+
+import metrics
+
+# Sayfa, SERP, PageSpeed, Gemini, link ve görsel denetimi sonuçları için ortak önbellek.
+# SEO_CACHE_BACKEND=memory|disk|redis|off; birden fazla replika için redis (veya ortak diskte disk)
+BACKEND_ENV = "SEO_CACHE_BACKEND"
+DEFAULT_BACKEND = "memory"
+# redis://[:parola@]host:port/db
+URL_ENV = "SEO_CACHE_URL"
+DEFAULT_URL = "redis://127.0.0.1:6379/0"
+PATH_ENV = "SEO_CACHE_PATH"
+DEFAULT_PATH = "seo_cache.db"
+MAX_ITEMS_ENV = "SEO_CACHE_MAX_ITEMS"
+DEFAULT_MAX_ITEMS = 1024
+# Süreç içi önbellekteki (sıkıştırılmış) değerlerin toplam boyut sınırı; sayfa yanıtları büyük olabilir
+MAX_BYTES_ENV = "SEO_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Alan başına saklama süresi (saniye); SEO_CACHE_TTLS="page=900,serp=21600" ile değiştirilebilir, 0 = kapalı
+TTLS_ENV = "SEO_CACHE_TTLS"
+DEFAULT_TTLS = {
+    "page": 15 * 60,
+    "serp": 6 * 3600,
+    "pagespeed": 12 * 3600,
+    "gemini": 24 * 3600,
+    "link": 24 * 3600,
+    "image": 24 * 3600,
+}
+
+KEY_PREFIX = "seo:"
+# Bu boyutun üzerindeki değerler sıkıştırılarak saklanır
+COMPRESS_MIN_BYTES = 1024
+# Önbelleğe yazılmayacak kadar büyük değerler (ör. çok büyük sayfalar)
+MAX_VALUE_BYTES = 4 * 1024 * 1024
+# Uzak önbellek yavaşsa analiz beklemesin
+SOCKET_TIMEOUT = 1.0
+
+_backend = None
+_backend_lock = threading.Lock()
+# Aynı süreçte aynı anahtarı hesaplayan tek iş parçacığı olur, diğerleri sonucu bekler
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+
+class CacheError(Exception):
+    """Önbellek sunucusunun hata yanıtı veya bozuk protokol verisi"""
+
+
+def cache_ttls():
+    ttls = dict(DEFAULT_TTLS)
+    for item in os.getenv(TTLS_ENV, "").split(","):
+        name, _, value = item.partition("=")
+        try:
+            ttls[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return ttls
+
+
+def cache_key(namespace, parts):
+    """Alan adı ve anahtar parçalarından sabit uzunlukta önbellek anahtarı üretir"""
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{namespace}:{digest[:32]}"
+
+
+def encode(value):
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data, 1)
+    return b"j" + data
+
+
+def decode(data):
+    if data[:1] == b"z":
+        return json.loads(zlib.decompress(data[1:]))
+    return json.loads(data[1:])
+
+
+class MemoryBackend:
+    """
+    Süreç içi LRU önbellek (tek replika veya yerel yedek). Hem kayıt sayısı hem de
+    değerlerin toplam bayt boyutu sınırlanır; aşıldığında en eski kullanılanlar atılır.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_items=DEFAULT_MAX_ITEMS, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remove(self, key):
+        _, value = self._items.pop(key)
+        self.size_bytes -= len(value)
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            if len(value) > self.max_bytes:
+                return
+            self._items[key] = (time.time() + ttl if ttl else None, value)
+            self.size_bytes += len(value)
+            while len(self._items) > self.max_items or self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._items)))
+
+    def delete(self, key):
+        with self._lock:
+            if key not in self._items:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskBackend:
+    """SQLite dosyasında tutulan önbellek; aynı diski paylaşan süreçler ortak kullanır"""
+
+    name = "disk"
+    # Her bu kadar yazmada bir süresi dolan kayıtlar temizlenir
+    PURGE_EVERY = 200
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv(PATH_ENV, DEFAULT_PATH)
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return closing(conn)
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return bytes(row[0])
+
+    def set(self, key, value, ttl=None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl if ttl else None),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, key):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount > 0
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+
+
+class RedisBackend:
+    """
+    Redis protokolü (RESP) konuşan sunucuya bağlanan önbellek; replikalar arasında paylaşılır.
+    Ek bağımlılık gerektirmez; her iş parçacığı kendi bağlantısını kullanır.
+    """
+
+    name = "redis"
+
+    def __init__(self, url=None):
+        parsed = urlparse(url or os.getenv(URL_ENV, DEFAULT_URL))
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip("/") or 0)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=SOCKET_TIMEOUT)
+            conn = (sock, sock.makefile("rb"))
+            if self.password:
+                _execute(conn, "AUTH", self.password)
+            if self.db:
+                _execute(conn, "SELECT", self.db)
+            self._local.conn = conn
+        return conn
+
+    def command(self, *args):
+        try:
+            return _execute(self._connection(), *args)
+        except (OSError, CacheError):
+            # Yarım kalmış yanıt bağlantıda kalmasın; sonraki çağrı yeniden bağlanır
+            conn = getattr(self._local, "conn", None)
+            self._local.conn = None
+            if conn is not None:
+                conn[0].close()
+            raise
+
+    def get(self, key):
+        return self.command("GET", key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.command("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self.command("SET", key, value)
+
+    def delete(self, key):
+        return self.command("DEL", key) > 0
+
+    def clear(self):
+        self.command("FLUSHDB")
+
+
+def _encode_command(args):
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise CacheError("Önbellek bağlantısı beklenmedik şekilde kapandı")
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b"+":
+        return body.decode("utf-8")
+    if prefix == b"-":
+        raise CacheError(body.decode("utf-8", "replace"))
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = reader.read(length + 2)
+        if len(data) != length + 2:
+            raise CacheError("Önbellek yanıtı eksik")
+        return data[:-2]
+    if prefix == b"*":
+        count = int(body)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise CacheError(f"Bilinmeyen RESP yanıtı: {line[:20]!r}")
+
+
+def _execute(conn, *args):
+    sock, reader = conn
+    sock.sendall(_encode_command(args))
+    return _read_reply(reader)
+
+
+def create_backend(name=None):
+    """Ayara göre önbellek arka ucunu oluşturur; 'off' için None döner"""
+    name = (name or os.getenv(BACKEND_ENV, DEFAULT_BACKEND)).strip().lower()
+    if name in ("off", "none", ""):
+        return None
+    if name == "memory":
+        try:
+            max_items = int(os.getenv(MAX_ITEMS_ENV, DEFAULT_MAX_ITEMS))
+        except ValueError:
+            max_items = DEFAULT_MAX_ITEMS
+        try:
+            max_bytes = int(os.getenv(MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+        except ValueError:
+            max_bytes = DEFAULT_MAX_BYTES
+        return MemoryBackend(max_items, max_bytes)
+    if name == "disk":
+        return DiskBackend()
+    if name == "redis":
+        return RedisBackend()
+    raise ValueError(f"Bilinmeyen önbellek türü: {name}")
+
+
+def get_backend():
+    """Süreç genelinde paylaşılan önbellek arka ucu (ilk kullanımda oluşturulur)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend = create_backend()
+            _backend = False if backend is None else backend
+        # Boş MemoryBackend __len__ nedeniyle False sayılır; kapalı olup olmadığı kimlikle denetlenir
+        return None if _backend is False else _backend
+
+
+def configure(backend):
+    """Arka ucu programatik olarak değiştirir ('memory', 'disk', 'redis', 'off' veya bir nesne)"""
+    global _backend
+    with _backend_lock:
+        backend = create_backend(backend) if isinstance(backend, str) else backend
+        _backend = False if backend is None else backend
+
+
+def _load(backend, key):
+    try:
+        data = backend.get(key)
+        return None if data is None else decode(data)
+    except (OSError, sqlite3.Error, CacheError, ValueError, zlib.error) as e:
+        metrics.inc("seo_cache_errors_total", backend=backend.name, error=type(e).__name__)
+        return None
+
+
+def _store(backend, key, value, ttl):
+    try:
+        data = encode(value)
+        if len(data) <= MAX_VALUE_BYTES:
+            backend.set(key, data, ttl)
+    except (OSError, sqlite3.Error, CacheError, TypeError, ValueError) as e:
+        metrics.inc("seo_cache_errors_total", backend=backend.name, error=type(e).__name__)
+
+
+def _acquire_key_lock(key):
+    with _key_locks_lock:
+        entry = _key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    entry[0].acquire()
+    return entry
+
+
+def _release_key_lock(key, entry):
+    entry[0].release()
+    with _key_locks_lock:
+        entry[1] -= 1
+        if entry[1] == 0:
+            _key_locks.pop(key, None)
+
+
+def cached(namespace, parts, compute, should_cache=None, dump=None, load=None, fresh=False):
+    """
+    namespace/parts anahtarıyla önbellekte sonuç varsa onu, yoksa compute() sonucunu döndürür.
+    should_cache(sonuç) False ise (ör. hata yanıtları) sonuç saklanmaz; compute'un fırlattığı
+    hatalar da saklanmaz. dump/load JSON'a yazılamayan değerleri (ör. HTTP yanıtı) çevirir.
+    fresh=True ise önbellekteki sonuç kullanılmaz; compute() çağrılır ve sonuç önbelleği yeniler.
+    İsabet/ıskalama metrics.record_cache(namespace, ...) ile kaydedilir.
+    """
+    backend = get_backend()
+    ttl = cache_ttls().get(namespace, 0)
+    if backend is None or ttl <= 0:
+        return compute()
+
+    key = cache_key(namespace, parts)
+    value = None if fresh else _load(backend, key)
+    if value is None:
+        entry = _acquire_key_lock(key)
+        try:
+            # Kilidi beklerken başka bir iş parçacığı sonucu yazmış olabilir
+            value = None if fresh else _load(backend, key)
+            if value is None:
+                metrics.record_cache(namespace, False)
+                result = compute()
+                if should_cache is None or should_cache(result):
+                    _store(backend, key, dump(result) if dump else result, ttl)
+                return result
+        finally:
+            _release_key_lock(key, entry)
+
+    metrics.record_cache(namespace, True)
+    return load(value) if load else value
+
+
+def is_success(result):
+    """Hata içermeyen araç sonuçları saklanır"""
+    return isinstance(result, dict) and "error" not in result
+
+
+# --- yerel Redis yerine geçen test sunucusu -----------------------------------
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """RESP komutlarının önbellek için gereken alt kümesini bellekteki sözlük üzerinde yanıtlar"""
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            try:
+                args = self._read_command()
+            except (CacheError, ValueError):
+                self.wfile.write(b"-ERR protocol error\r\n")
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            command = args[0].decode("utf-8", "replace").upper()
+            if command == "QUIT":
+                self.wfile.write(b"+OK\r\n")
+                return
+            self.wfile.write(self._dispatch(store, command, args[1:]))
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # redis-cli / telnet ile yazılan satır komutları
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            header = self.rfile.readline()
+            if not header.startswith(b"$"):
+                raise CacheError("bulk string bekleniyordu")
+            length = int(header[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _dispatch(self, store, command, args):
+        if command == "PING":
+            return b"+PONG\r\n"
+        if command in ("AUTH", "SELECT"):
+            return b"+OK\r\n"
+        if command == "GET" and len(args) == 1:
+            value = store.get(args[0])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "SET" and len(args) >= 2:
+            ttl = None
+            options = [arg.upper() for arg in args[2:]]
+            if len(options) >= 2 and options[0] in (b"EX", b"PX"):
+                ttl = int(options[1]) / (1 if options[0] == b"EX" else 1000)
+            store.set(args[0], args[1], ttl)
+            return b"+OK\r\n"
+        if command in ("DEL", "EXISTS") and args:
+            if command == "DEL":
+                count = sum(store.delete(key) for key in args)
+            else:
+                count = sum(store.get(key) is not None for key in args)
+            return b":%d\r\n" % count
+        if command in ("FLUSHDB", "FLUSHALL"):
+            store.clear()
+            return b"+OK\r\n"
+        if command == "DBSIZE":
+            return b":%d\r\n" % len(store)
+        if command == "COMMAND":
+            return b"*0\r\n"
+        return f"-ERR unknown command '{command}'\r\n".encode("utf-8")
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    """Testler ve tek makinede çoklu replika denemesi için Redis yerine geçen küçük sunucu"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, max_items=100000):
+        self.store = MemoryBackend(max_items)
+        super().__init__(address, _RespHandler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paylaşılan SEO önbelleği")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Yerel Redis protokolü sunucusu başlat")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=6379)
+    serve.add_argument("--max-items", type=int, default=100000)
+    sub.add_parser("clear", help="Yapılandırılmış önbelleği temizle")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = RespServer((args.host, args.port), args.max_items)
+        sys.stdout.write(f"🗄️ Önbellek sunucusu: redis://{args.host}:{args.port}/0\n")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+    else:
+        backend = get_backend()
+        if backend is not None:
+            backend.clear()
+        sys.stdout.write("✅ Önbellek temizlendi\n")
@@ -0,0 +1,39 @@
+from keyword_matcher import compile_keywords, turkish_casefold
+
+
+def test_english_text_matches_regardless_of_case():
+    counts = compile_keywords(["instagram", "SEO tips", "site"]).count(
+        "Instagram ads. instagram. SEO TIPS for your SITE and site"
+    )
+    assert counts == {"instagram": 2, "SEO tips": 1, "site": 2}
+
+
+def test_capitalized_keyword_matches_lowercase_text():
+    assert compile_keywords(["Instagram"]).count("instagram INSTAGRAM") == {"Instagram": 2}
+
+
+def test_dotted_and_dotless_i_fold_together():
+    assert turkish_casefold("IŞIK") == turkish_casefold("ışık") == turkish_casefold("Işık")
+    assert turkish_casefold("İSTANBUL") == turkish_casefold("istanbul")
+    assert compile_keywords(["ışık"]).count("IŞIK ışığı ışıklar") == {"ışık": 2}
+    assert compile_keywords(["istanbul"]).count("İSTANBUL İstanbul'da") == {"istanbul": 2}
+
+
+def test_inflected_forms_count_for_root_keyword():
+    scan = compile_keywords(["seo analiz"]).scan("SEO analizi ve seo analizlerinden bahsettik. SEO ANALİZİ")
+    assert scan["seo analiz"]["count"] == 3
+
+
+def test_different_words_sharing_a_prefix_do_not_match():
+    assert compile_keywords(["data"]).count("date") == {"data": 0}
+    assert compile_keywords(["date"]).count("data") == {"date": 0}
+    assert compile_keywords(["kale"]).count("kalın") == {"kale": 0}
+    assert compile_keywords(["kalın"]).count("kale") == {"kalın": 0}
+    assert compile_keywords(["bilgi"]).count("bilge") == {"bilgi": 0}
+    assert compile_keywords(["bilge"]).count("bilgi") == {"bilge": 0}
+
+
+def test_suffixes_are_stripped_only_down_to_the_keyword():
+    assert compile_keywords(["kale"]).count("kale kalesi kaleler kaleye") == {"kale": 4}
+    assert compile_keywords(["bilgi"]).count("bilgiler bilgisi bilgiyi") == {"bilgi": 3}
+    assert compile_keywords(["data"]).count("datalar datası") == {"data": 2}
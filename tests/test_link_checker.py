@@ -0,0 +1,35 @@
+import link_checker
+import recommendations
+import resilience
+
+
+def test_normalize_url_keeps_query_pairs_as_written():
+    url = "https://Example.com:443/a?utm_source=x&b&c=%20d&e=f%2Fg#top"
+    assert link_checker.normalize_url(url) == "https://example.com/a?b&c=%20d&e=f%2Fg"
+    assert link_checker.normalize_url("https://example.com?fbclid=1") == "https://example.com/"
+
+
+def test_links_not_requested_before_deadline_are_not_broken():
+    urls = ["https://example.com/a", "https://example.org/b"]
+    with resilience.deadline_scope(resilience.Deadline(0)):
+        results = link_checker.check_links(urls)
+    summary = link_checker.summarize(results, page_host="example.com")
+
+    assert summary["broken_count"] == 0
+    assert summary["broken"] == []
+    assert summary["unchecked_count"] == 2
+    assert summary["checked"] == 0
+    assert {entry["error"] for entry in summary["unchecked"]} == {"DeadlineExceeded"}
+
+    findings, _ = recommendations._link_rules({"links": summary})
+    assert findings == []
+
+
+def test_open_breaker_marks_links_unchecked(monkeypatch):
+    def reject(method, api, url, **kwargs):
+        raise resilience.CircuitOpenError(f"{api} geçici olarak devre dışı")
+
+    monkeypatch.setattr(link_checker.http_client, "request", reject)
+    summary = link_checker.summarize(link_checker.check_links(["https://down.example/x"]))
+    assert summary["broken_count"] == 0
+    assert summary["unchecked"] == [{"url": "https://down.example/x", "error": "CircuitOpenError"}]
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+import requests
+
+import cassette
+import http_client
+import resilience
+
+
+@pytest.fixture
+def half_open_breaker(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    breaker = resilience.get_breaker("serpapi")
+    breaker.state = "open"
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    return breaker
+
+
+def test_cassette_miss_ends_half_open_trial(monkeypatch, half_open_breaker):
+    def miss(method, url, **kwargs):
+        raise cassette.CassetteMissError(url)
+
+    monkeypatch.setattr(requests, "request", miss)
+    with pytest.raises(cassette.CassetteMissError):
+        http_client.get("serpapi", "https://serpapi.com/search")
+
+    assert half_open_breaker.state == "half_open"
+    assert half_open_breaker.allow()
+
+
+def test_timeout_after_deadline_is_not_a_breaker_failure(monkeypatch, half_open_breaker):
+    deadline = resilience.Deadline(0.05)
+
+    def slow(method, url, **kwargs):
+        time.sleep(0.1)
+        raise requests.Timeout(url)
+
+    monkeypatch.setattr(requests, "request", slow)
+    with resilience.deadline_scope(deadline), pytest.raises(requests.Timeout):
+        http_client.get("serpapi", "https://serpapi.com/search")
+
+    assert half_open_breaker.failures == 0
+    assert half_open_breaker.allow()
+
+
+def test_service_error_reopens_half_open_breaker(monkeypatch, half_open_breaker):
+    def refuse(method, url, **kwargs):
+        raise requests.ConnectionError(url)
+
+    monkeypatch.setattr(requests, "request", refuse)
+    with pytest.raises(requests.ConnectionError):
+        http_client.get("serpapi", "https://serpapi.com/search")
+
+    assert half_open_breaker.state == "open"
+    assert not resilience.counts_as_failure(resilience.DeadlineExceeded("bitti"))
@@ -0,0 +1,30 @@
+import shared_cache
+
+
+def test_memory_backend_evicts_least_recently_used_by_size():
+    backend = shared_cache.MemoryBackend(max_items=100, max_bytes=10)
+    backend.set("a", b"1234")
+    backend.set("b", b"1234")
+    assert backend.get("a") == b"1234"
+    backend.set("c", b"1234")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1234"
+    assert backend.get("c") == b"1234"
+    assert backend.size_bytes == 8
+
+
+def test_memory_backend_skips_values_over_byte_budget():
+    backend = shared_cache.MemoryBackend(max_items=100, max_bytes=10)
+    backend.set("a", b"1234")
+    backend.set("a", b"x" * 11)
+    assert backend.get("a") is None
+    assert backend.size_bytes == 0
+
+
+def test_empty_memory_backend_still_caches(monkeypatch):
+    monkeypatch.setattr(shared_cache, "_backend", shared_cache.MemoryBackend())
+    calls = []
+    for _ in range(2):
+        shared_cache.cached("serp", ["kw"], lambda: calls.append(1) or {"ok": True})
+    assert calls == [1]
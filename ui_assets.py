@@ -0,0 +1,81 @@
+import os
+import gzip
+import hashlib
+import mimetypes
+from functools import lru_cache
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Arayüzün CSS ve HTML parçalarının bulunduğu klasör
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# Gradio kendi dosyaları için /static ve /assets yollarını kullanır
+STATIC_ROUTE = "/ui-static"
+# İçerik sürümü URL'de olduğu için tarayıcı dosyayı bir yıl önbellekte tutabilir
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Bu boyutun altındaki dosyaları sıkıştırmaya değmez
+MIN_GZIP_SIZE = 1024
+
+
+class StaticAsset:
+    """Bir kez okunup sıkıştırılan ve bellekte tutulan statik dosya"""
+
+    def __init__(self, name):
+        path = os.path.realpath(os.path.join(STATIC_DIR, name))
+        if not path.startswith(os.path.realpath(STATIC_DIR) + os.sep) or not os.path.isfile(path):
+            raise FileNotFoundError(name)
+        with open(path, "rb") as f:
+            self.content = f.read()
+        self.name = name
+        self.version = hashlib.sha1(self.content).hexdigest()[:10]
+        self.etag = f'"{self.version}"'
+        media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.media_type = f"{media_type}; charset=utf-8" if media_type.startswith("text/") else media_type
+        self.gzipped = gzip.compress(self.content, compresslevel=9, mtime=0) if len(self.content) >= MIN_GZIP_SIZE else None
+
+
+@lru_cache(maxsize=None)
+def load(name):
+    return StaticAsset(name)
+
+
+def fragment(name):
+    """
+    static/fragments altındaki bir HTML parçasını (önbellekten) metin olarak döndürür.
+    Parçalar gr.Markdown içeriği olarak sayfa yapılandırmasına gömülür; /ui-static üzerinden
+    ayrıca indirilmez. Sürümlü URL ve ETag ile yalnızca stylesheet_tag() ile bağlanan CSS sunulur.
+    """
+    return load(f"fragments/{name}").content.decode("utf-8")
+
+
+def asset_url(name):
+    """İçerik sürümünü içeren, uzun süre önbelleklenebilir URL"""
+    return f"{STATIC_ROUTE}/{name}?v={load(name).version}"
+
+
+def stylesheet_tag(name):
+    """Blocks head'ine eklenecek <link rel="stylesheet"> etiketi"""
+    return f'<link rel="stylesheet" href="{asset_url(name)}">'
+
+
+def asset_response(request: Request, name: str):
+    """Statik dosyayı ETag, uzun önbellek başlığı ve (destekleniyorsa) gzip ile döndürür"""
+    try:
+        asset = load(name)
+    except (FileNotFoundError, OSError):
+        return Response(status_code=404)
+
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": asset.etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == asset.etag:
+        return Response(status_code=304, headers=headers)
+
+    body = asset.content
+    if asset.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        body = asset.gzipped
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=asset.media_type, headers=headers)
+
+
+def register(app):
+    """FastAPI uygulamasına /ui-static/<dosya> yolunu ekler (Gradio mount edilmeden önce çağrılmalı)"""
+    app.add_api_route(f"{STATIC_ROUTE}/{{name:path}}", asset_response, methods=["GET"])